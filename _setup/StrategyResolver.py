@@ -8,6 +8,10 @@ console = Console()
 
 
 class StrategyResolver(StrategyCoreResolver):
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.snapTokens = None
+
     def get_strategy_destinations(self):
         """
         Track balances for all strategy implementations
@@ -22,24 +26,28 @@ class StrategyResolver(StrategyCoreResolver):
             "badgerTree": sett.badgerTree(),
         }
 
+    def get_snap_tokens(self):
+        """
+        Reward token addresses tracked by add_balances_snap
+        They are constants on the strategy, so they are only fetched once
+        """
+        if self.snapTokens is None:
+            strategy = self.manager.strategy
+            self.snapTokens = {
+                "aura": interface.IERC20(strategy.AURA()),
+                "auraBal": interface.IERC20(strategy.AURABAL()),
+                "bAuraBal": interface.IERC20(strategy.BAURABAL()),
+                "graviAura": interface.IERC20(strategy.GRAVIAURA()),
+            }
+        return self.snapTokens
+
     def add_balances_snap(self, calls, entities):
         super().add_balances_snap(calls, entities)
-        strategy = self.manager.strategy
-
-        aura = interface.IERC20(strategy.AURA())
-        auraBal = interface.IERC20(strategy.AURABAL())  # want
 
-        bAuraBal = interface.IERC20(strategy.BAURABAL())
-        graviAura = interface.IERC20(strategy.GRAVIAURA())
-
-        calls = self.add_entity_balances_for_tokens(calls, "aura", aura, entities)
-        calls = self.add_entity_balances_for_tokens(calls, "auraBal", auraBal, entities)
-        calls = self.add_entity_balances_for_tokens(
-            calls, "bAuraBal", bAuraBal, entities
-        )
-        calls = self.add_entity_balances_for_tokens(
-            calls, "graviAura", graviAura, entities
-        )
+        for tokenKey, token in self.get_snap_tokens().items():
+            calls = self.add_entity_balances_for_tokens(
+                calls, tokenKey, token, entities
+            )
 
         return calls
 
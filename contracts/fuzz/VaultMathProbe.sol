@@ -0,0 +1,227 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import {IERC20Upgradeable} from "@openzeppelin-contracts-upgradeable/token/ERC20/IERC20Upgradeable.sol";
+
+interface IProbedVault {
+    function treasury() external view returns (address);
+
+    function strategist() external view returns (address);
+
+    function balance() external view returns (uint256);
+
+    function totalSupply() external view returns (uint256);
+
+    function balanceOf(address) external view returns (uint256);
+
+    function getPricePerFullShare() external view returns (uint256);
+
+    function decimals() external view returns (uint8);
+
+    function lastHarvestedAt() external view returns (uint256);
+
+    function deposit(uint256 _amount) external;
+
+    function withdraw(uint256 _shares) external;
+
+    function reportHarvest(uint256 _harvestedAmount) external;
+
+    function setPerformanceFeeGovernance(uint256 _fee) external;
+
+    function setPerformanceFeeStrategist(uint256 _fee) external;
+
+    function setWithdrawalFee(uint256 _fee) external;
+
+    function setManagementFee(uint256 _fee) external;
+}
+
+/// @title Runs one deposit / harvest / withdraw scenario against TheVault
+/// @notice Test-only, never deployed: eth_call'ed with its runtime code injected
+///         at the vault's strategy address (so it may reportHarvest), with the
+///         vault's governance overridden to it (so it may set fees) and a want
+///         balance overridden for it. Every eth_call starts from the same state.
+/// @dev Stateless on purpose, the storage at its address is the strategy's.
+///      Field order matches helpers/vault_fuzz.py
+contract VaultMathProbe {
+    uint256 public constant MAX_BPS = 10_000;
+
+    uint256 public constant STEP_SETUP = 1;
+    uint256 public constant STEP_INITIAL_DEPOSIT = 2;
+    uint256 public constant STEP_DEPOSIT = 3;
+    uint256 public constant STEP_HARVEST = 4;
+    uint256 public constant STEP_WITHDRAW = 5;
+
+    struct Scenario {
+        uint256 initialDeposit;
+        uint256 deposit;
+        uint256 harvestGain;
+        uint256 withdrawBps; // Of the probe's shares
+        uint256 performanceFeeGovernance;
+        uint256 performanceFeeStrategist;
+        uint256 withdrawalFee;
+        uint256 managementFee;
+    }
+
+    struct Observation {
+        uint256 failedStep; // 0 if every step went through
+        // Deposit
+        uint256 depositSupplyBefore;
+        uint256 depositBalanceBefore;
+        uint256 depositShares;
+        // Harvest
+        uint256 harvestSupplyBefore;
+        uint256 harvestBalanceBefore;
+        uint256 harvestDuration;
+        uint256 treasuryShares;
+        uint256 strategistShares;
+        // Withdraw
+        uint256 withdrawShares;
+        uint256 withdrawSupplyBefore;
+        uint256 withdrawBalanceBefore;
+        uint256 withdrawPricePerFullShare;
+        uint256 decimals;
+        uint256 wantReceived;
+        uint256 withdrawFeeShares;
+    }
+
+    /// @dev Strategy view the vault needs for balance(), all want stays in the vault
+    function balanceOf() external pure returns (uint256) {
+        return 0;
+    }
+
+    function run(
+        IProbedVault vault,
+        IERC20Upgradeable want,
+        Scenario calldata scenario
+    ) external returns (Observation memory observation) {
+        if (!_setup(vault, want, scenario)) {
+            observation.failedStep = STEP_SETUP;
+            return observation;
+        }
+
+        try vault.deposit(scenario.initialDeposit) {} catch {
+            observation.failedStep = STEP_INITIAL_DEPOSIT;
+            return observation;
+        }
+
+        if (!_deposit(vault, scenario, observation)) {
+            observation.failedStep = STEP_DEPOSIT;
+            return observation;
+        }
+        if (!_harvest(vault, want, scenario, observation)) {
+            observation.failedStep = STEP_HARVEST;
+            return observation;
+        }
+        if (!_withdraw(vault, want, scenario, observation)) {
+            observation.failedStep = STEP_WITHDRAW;
+        }
+    }
+
+    function _setup(
+        IProbedVault vault,
+        IERC20Upgradeable want,
+        Scenario calldata scenario
+    ) internal returns (bool) {
+        want.approve(address(vault), uint256(-1));
+        try
+            vault.setPerformanceFeeGovernance(
+                scenario.performanceFeeGovernance
+            )
+        {} catch {
+            return false;
+        }
+        try
+            vault.setPerformanceFeeStrategist(
+                scenario.performanceFeeStrategist
+            )
+        {} catch {
+            return false;
+        }
+        try vault.setWithdrawalFee(scenario.withdrawalFee) {} catch {
+            return false;
+        }
+        try vault.setManagementFee(scenario.managementFee) {} catch {
+            return false;
+        }
+        return true;
+    }
+
+    function _deposit(
+        IProbedVault vault,
+        Scenario calldata scenario,
+        Observation memory observation
+    ) internal returns (bool) {
+        observation.depositSupplyBefore = vault.totalSupply();
+        observation.depositBalanceBefore = vault.balance();
+        uint256 sharesBefore = vault.balanceOf(address(this));
+
+        try vault.deposit(scenario.deposit) {} catch {
+            return false;
+        }
+        observation.depositShares =
+            vault.balanceOf(address(this)) -
+            sharesBefore;
+        return true;
+    }
+
+    function _harvest(
+        IProbedVault vault,
+        IERC20Upgradeable want,
+        Scenario calldata scenario,
+        Observation memory observation
+    ) internal returns (bool) {
+        address treasury = vault.treasury();
+        address strategist = vault.strategist();
+        uint256 treasuryBefore = vault.balanceOf(treasury);
+        uint256 strategistBefore = vault.balanceOf(strategist);
+
+        observation.harvestSupplyBefore = vault.totalSupply();
+        observation.harvestBalanceBefore = vault.balance();
+        observation.harvestDuration = block.timestamp - vault.lastHarvestedAt();
+
+        want.transfer(address(vault), scenario.harvestGain);
+        try vault.reportHarvest(scenario.harvestGain) {} catch {
+            return false;
+        }
+
+        observation.treasuryShares = vault.balanceOf(treasury) - treasuryBefore;
+        observation.strategistShares =
+            vault.balanceOf(strategist) -
+            strategistBefore;
+        return true;
+    }
+
+    function _withdraw(
+        IProbedVault vault,
+        IERC20Upgradeable want,
+        Scenario calldata scenario,
+        Observation memory observation
+    ) internal returns (bool) {
+        address treasury = vault.treasury();
+        uint256 treasuryBefore = vault.balanceOf(treasury);
+        uint256 wantBefore = want.balanceOf(address(this));
+
+        uint256 shares = (vault.balanceOf(address(this)) *
+            scenario.withdrawBps) / MAX_BPS;
+        if (shares == 0) {
+            shares = 1;
+        }
+        observation.withdrawShares = shares;
+        observation.withdrawSupplyBefore = vault.totalSupply();
+        observation.withdrawBalanceBefore = vault.balance();
+        observation.withdrawPricePerFullShare = vault.getPricePerFullShare();
+        observation.decimals = vault.decimals();
+
+        try vault.withdraw(shares) {} catch {
+            return false;
+        }
+
+        observation.wantReceived = want.balanceOf(address(this)) - wantBefore;
+        observation.withdrawFeeShares =
+            vault.balanceOf(treasury) -
+            treasuryBefore;
+        return true;
+    }
+}
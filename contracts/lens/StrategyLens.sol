@@ -0,0 +1,179 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import {SafeMathUpgradeable} from "@openzeppelin-contracts-upgradeable/math/SafeMathUpgradeable.sol";
+
+import {IAuraToken} from "../../interfaces/aura/IAuraToken.sol";
+import {IBaseRewardPool} from "../../interfaces/aura/IBaseRewardPool.sol";
+
+interface ILensVault {
+    function balance() external view returns (uint256);
+
+    function available() external view returns (uint256);
+
+    function getPricePerFullShare() external view returns (uint256);
+
+    function decimals() external view returns (uint8);
+
+    function totalSupply() external view returns (uint256);
+
+    function withdrawalFee() external view returns (uint256);
+
+    function managementFee() external view returns (uint256);
+
+    function lastHarvestedAt() external view returns (uint256);
+
+    function performanceFeeGovernance() external view returns (uint256);
+
+    function performanceFeeStrategist() external view returns (uint256);
+}
+
+interface ILensStrategy {
+    function vault() external view returns (address);
+
+    function want() external view returns (address);
+
+    function balanceOfPool() external view returns (uint256);
+
+    function balanceOfWant() external view returns (uint256);
+
+    function balanceOf() external view returns (uint256);
+
+    function baseRewardPool() external view returns (IBaseRewardPool);
+
+    function balEthBptToAuraBalMinOutBps() external view returns (uint256);
+}
+
+/// @title Read-only view of StrategyAuraStaking + TheVault state
+/// @notice Never deployed in production, meant to be eth_call'ed, either deployed
+///         on a fork or as code injected with a state override
+/// @dev Field order matches helpers/snapshot/lens.py
+contract StrategyLens {
+    using SafeMathUpgradeable for uint256;
+
+    IAuraToken public constant AURA =
+        IAuraToken(0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF);
+
+    struct State {
+        address strategy;
+        address sett;
+        address want;
+        // Sett
+        uint256 balance;
+        uint256 available;
+        uint256 pricePerFullShare;
+        uint256 decimals;
+        uint256 totalSupply;
+        uint256 withdrawalFee;
+        uint256 managementFee;
+        uint256 lastHarvestedAt;
+        uint256 performanceFeeGovernance;
+        uint256 performanceFeeStrategist;
+        // Strategy
+        uint256 balanceOfPool;
+        uint256 balanceOfWant;
+        uint256 balanceOf;
+        uint256 balEarned;
+        uint256 auraEarned;
+        uint256 balEthBptToAuraBalMinOutBps;
+    }
+
+    /// @dev AURA's mint schedule, read once for every strategy
+    struct AuraSchedule {
+        uint256 emissionsMinted;
+        uint256 reductionPerCliff;
+        uint256 totalCliffs;
+        uint256 maxSupply;
+    }
+
+    function getStates(address[] calldata strategies)
+        external
+        view
+        returns (uint256 blockNumber, State[] memory states)
+    {
+        AuraSchedule memory schedule = getAuraSchedule();
+
+        states = new State[](strategies.length);
+        for (uint256 i = 0; i < strategies.length; ++i) {
+            State memory state = states[i];
+            state.strategy = strategies[i];
+            _readSett(state);
+            _readStrategy(state, schedule);
+        }
+        blockNumber = block.number;
+    }
+
+    function getAuraSchedule()
+        public
+        view
+        returns (AuraSchedule memory schedule)
+    {
+        schedule.emissionsMinted = AURA.totalSupply() - AURA.INIT_MINT_AMOUNT();
+        schedule.reductionPerCliff = AURA.reductionPerCliff();
+        schedule.totalCliffs = AURA.totalCliffs();
+        schedule.maxSupply = AURA.EMISSIONS_MAX_SUPPLY();
+    }
+
+    /// @dev Same as StrategyAuraStaking.getMintableAuraRewards
+    function getMintableAuraRewards(
+        AuraSchedule memory schedule,
+        uint256 _balAmount
+    ) public pure returns (uint256 amount) {
+        uint256 cliff = schedule.emissionsMinted.div(
+            schedule.reductionPerCliff
+        );
+
+        if (cliff < schedule.totalCliffs) {
+            uint256 reduction = schedule
+                .totalCliffs
+                .sub(cliff)
+                .mul(5)
+                .div(2)
+                .add(700);
+            amount = _balAmount.mul(reduction).div(schedule.totalCliffs);
+
+            uint256 amtTillMax = schedule.maxSupply.sub(
+                schedule.emissionsMinted
+            );
+            if (amount > amtTillMax) {
+                amount = amtTillMax;
+            }
+        }
+    }
+
+    function _readSett(State memory state) internal view {
+        ILensStrategy strategy = ILensStrategy(state.strategy);
+        ILensVault sett = ILensVault(strategy.vault());
+
+        state.sett = address(sett);
+        state.want = strategy.want();
+        state.balance = sett.balance();
+        state.available = sett.available();
+        state.pricePerFullShare = sett.getPricePerFullShare();
+        state.decimals = sett.decimals();
+        state.totalSupply = sett.totalSupply();
+        state.withdrawalFee = sett.withdrawalFee();
+        state.managementFee = sett.managementFee();
+        state.lastHarvestedAt = sett.lastHarvestedAt();
+        state.performanceFeeGovernance = sett.performanceFeeGovernance();
+        state.performanceFeeStrategist = sett.performanceFeeStrategist();
+    }
+
+    function _readStrategy(State memory state, AuraSchedule memory schedule)
+        internal
+        view
+    {
+        ILensStrategy strategy = ILensStrategy(state.strategy);
+
+        state.balanceOfPool = strategy.balanceOfPool();
+        state.balanceOfWant = strategy.balanceOfWant();
+        // balanceOfWant + balanceOfPool, without calling them again
+        state.balanceOf = state.balanceOfWant.add(state.balanceOfPool);
+        state.balEarned = strategy.baseRewardPool().earned(state.strategy);
+        state.auraEarned = getMintableAuraRewards(schedule, state.balEarned);
+        state.balEthBptToAuraBalMinOutBps = strategy
+            .balEthBptToAuraBalMinOutBps();
+    }
+}
@@ -0,0 +1,83 @@
+from brownie import chain
+from rich.console import Console
+
+from helpers.SnapshotManager import SnapshotManager
+from helpers.snapshot.fleet import FleetPlan
+
+console = Console()
+
+
+class FleetSnapshotManager:
+    """
+    Snapshots several (sett, strategy) pairs at once
+    Every vault keeps its own SnapshotManager (entities, plan, history, resolver),
+    their plans are merged so the whole fleet is read in one set of chunked multicalls
+    """
+
+    def __init__(self, managers, cache=None):
+        """
+        managers is a list of SnapshotManagers, keyed by their key
+        """
+        self.managers = {manager.key: manager for manager in managers}
+        self.cache = cache
+        self.plan = None
+
+    @classmethod
+    def from_vaults(cls, vaults, cache=None, **kwargs):
+        """
+        vaults is a {key: (sett, strategy)} dict, kwargs go to every SnapshotManager
+        """
+        return cls(
+            [
+                SnapshotManager(sett, strategy, key, cache=cache, **kwargs)
+                for key, (sett, strategy) in vaults.items()
+            ],
+            cache=cache,
+        )
+
+    def __getitem__(self, key):
+        return self.managers[key]
+
+    def addEntity(self, key, entity):
+        for manager in self.managers.values():
+            manager.addEntity(key, entity)
+
+    def get_plan(self, trackedUsers=None):
+        """
+        The merged plan, only rebuilt when a vault's plan changes
+        """
+        plans = {}
+        for key, manager in self.managers.items():
+            entities = manager.entities
+            if trackedUsers:
+                entities.update(trackedUsers)
+            plans[key] = manager.get_plan(entities)
+
+        if self.plan is None or not self.plan.matches(plans):
+            self.plan = FleetPlan(plans, cache=self.cache, label="fleet")
+        return self.plan
+
+    def snap(self, trackedUsers=None, block_identifier=None):
+        """
+        {key: Snap} of every vault, all read at the same block
+        Each snap is also kept in its vault's manager, as SnapshotManager.snap does
+        """
+        print("snap (fleet)")
+        if self.cache is not None and block_identifier is None:
+            # Only reads pinned to a block can be cached
+            block_identifier = chain.height
+
+        snaps = self.get_plan(trackedUsers)(block_identifier)
+        for key, snap in snaps.items():
+            self.managers[key].snaps[snap.block] = snap
+        return snaps
+
+    def printTable(self, snaps):
+        for key, snap in snaps.items():
+            self.managers[key].printTable(snap)
+
+    def printCompare(self, before, after):
+        return {
+            key: self.managers[key].printCompare(before[key], after[key])
+            for key in before
+        }
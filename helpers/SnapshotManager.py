@@ -1,26 +1,77 @@
+import os
+
 from brownie import *
 from tabulate import tabulate
 from rich.console import Console
-from helpers.multicall import Multicall
 from helpers.utils import val
+from helpers.tokens import token_registry
 
 from helpers.snapshot.snap import Snap
+from helpers.snapshot.plan import SnapshotPlan
+from helpers.snapshot.incremental import Touched, compare_snaps
+from helpers.snapshot.diff import SnapshotDiff
+from helpers.snapshot.archive import export_snaps
+from helpers.snapshot.history import SnapHistory
+from helpers.snapshot.sweep import SnapSeries, sweep, RETRIES
+from helpers.multicall.constants import MAX_CONCURRENCY
 
 from _setup.StrategyResolver import StrategyResolver
 
 console = Console()
 
+# Metrics denominated in a snapshot token, besides balances.<tokenKey>.<entityKey>
+TOKEN_UNITS = {
+    "sett.balance": "want",
+    "sett.available": "want",
+    "sett.totalSupply": "sett",
+    "strategy.balanceOf": "want",
+    "strategy.balanceOfPool": "want",
+    "strategy.balanceOfWant": "want",
+}
+# Fixed point, whatever the want's decimals
+PPFS_DECIMALS = 18
+
 
 class SnapshotManager:
-    def __init__(self, sett, strategy, key):
+    def __init__(
+        self,
+        sett,
+        strategy,
+        key,
+        cache=None,
+        incremental=False,
+        strict=None,
+        verbose=True,
+        history=None,
+    ):
+        """
+        cache is an optional ResultCache, pass the same one to several managers
+        to share their reads
+
+        incremental after-snapshots only re-read what the transaction's logs say
+        could have changed, strict (default: SNAPSHOT_STRICT env var) also takes a
+        full snapshot and asserts both match, for CI
+
+        verbose=False skips rendering printCompare tables
+
+        history is the SnapHistory snaps are kept in, pass one with a retention
+        for long runs (default: unbounded)
+        """
         self.key = key
+        self.verbose = verbose
+        self.lastDiff = None
+        self.cache = cache
+        self.incremental = incremental
+        self.strict = bool(os.getenv("SNAPSHOT_STRICT")) if strict is None else strict
         self.sett = sett
         self.strategy = strategy
         self.want = interface.IERC20Detailed(self.sett.token())
         self.resolver = self.init_resolver(self.strategy.getName())
-        self.snaps = {}
+        self.snaps = SnapHistory() if history is None else history
         self.settSnaps = {}
         self.entities = {}
+        self.plan = None
+        self.units = {}
 
         assert self.want == self.strategy.want()
 
@@ -43,27 +94,125 @@ class SnapshotManager:
         calls = self.resolver.add_strategy_snap(calls, entities=entities)
         return calls
 
-    def snap(self, trackedUsers=None):
+    def get_plan(self, entities):
+        """
+        Returns the snapshot plan for entities, only rebuilt when they change
+        """
+        if self.plan is None or not self.plan.matches(entities):
+            self.plan = SnapshotPlan(
+                self.add_snap_calls(entities),
+                entities,
+                cache=self.cache,
+                label=self.key,
+            )
+            self.units = self.get_units(self.plan)
+        return self.plan
+
+    def get_units(self, plan):
+        """
+        Decimals of every token-denominated key of the plan
+        Token metadata for the whole plan is fetched in one multicall, once per chain
+        """
+        token_registry.load(plan.tokens.values())
+        units = {}
+        for key in plan.schema.keys:
+            parts = key.split(".")
+            if parts[0] == "balances":
+                tokenKey = parts[1]
+            else:
+                tokenKey = TOKEN_UNITS.get(key)
+            if tokenKey in plan.tokens:
+                units[key] = token_registry.decimals(plan.tokens[tokenKey])
+        units["sett.getPricePerFullShare"] = PPFS_DECIMALS
+        return units
+
+    def snap(self, trackedUsers=None, block_identifier=None):
+        """
+        Reads every tracked value at block_identifier (default latest)
+        The snap is labelled with the block the data was actually read at
+        """
         print("snap")
-        snapBlock = chain.height
         entities = self.entities
 
         if trackedUsers:
             for key, user in trackedUsers.items():
                 entities[key] = user
 
-        calls = self.add_snap_calls(entities)
-        multi = Multicall(calls)
-        # multi.printCalls()
+        if self.cache is not None and block_identifier is None:
+            # Only reads pinned to a block can be cached
+            block_identifier = chain.height
 
-        data = multi()
-        self.snaps[snapBlock] = Snap(
-            data,
-            snapBlock,
-            [x[0] for x in entities.items()],
-        )
+        plan = self.get_plan(entities)
+        # plan.multicall.printCalls()
+
+        snap = plan(block_identifier)
+        self.snaps[snap.block] = snap
+
+        return snap
 
-        return self.snaps[snapBlock]
+    def snapAfter(self, before, tx, trackedUsers=None):
+        """
+        Snapshot after tx, incremental from before when enabled
+        """
+        if not self.incremental:
+            return self.snap(trackedUsers)
+
+        entities = self.entities
+        if trackedUsers:
+            for key, user in trackedUsers.items():
+                entities[key] = user
+
+        plan = self.get_plan(entities)
+        if before.schema is not plan.schema:
+            # Entities changed since before, nothing to copy from
+            return self.snap(trackedUsers)
+
+        print("snap (incremental)")
+        after = plan.update(before, Touched(tx), tx.block_number)
+        if self.strict:
+            mismatches = compare_snaps(plan(after.block), after)
+            assert not mismatches, "Incremental snap is stale for {}".format(mismatches)
+
+        self.snaps[after.block] = after
+        return after
+
+    def sweep(
+        self,
+        start,
+        end,
+        step=1,
+        path=None,
+        trackedUsers=None,
+        max_workers=MAX_CONCURRENCY,
+        retries=RETRIES,
+    ):
+        """
+        Snapshots every step blocks from start to end (inclusive) into a SnapSeries
+        Needs an archive node for blocks before the fork
+        With a path, progress is saved as it goes and a rerun resumes from it
+        """
+        entities = dict(self.entities)
+        if trackedUsers:
+            entities.update(trackedUsers)
+
+        plan = self.get_plan(entities)
+        series = SnapSeries(plan.schema.keys, list(entities), path)
+        try:
+            return sweep(
+                plan,
+                range(start, end + 1, step),
+                series,
+                max_workers=max_workers,
+                retries=retries,
+            )
+        finally:
+            series.close()
+
+    def exportSnaps(self, path):
+        """
+        Saves every snap taken so far, in block order, see helpers.snapshot.archive
+        """
+        export_snaps([self.snaps[block] for block in sorted(self.snaps)], path)
 
     def addEntity(self, key, entity):
         self.entities[key] = entity
@@ -77,7 +226,7 @@ class SnapshotManager:
         trackedUsers = {"user": user}
         before = self.snap(trackedUsers)
         tx = self.strategy.tend(overrides)
-        after = self.snap(trackedUsers)
+        after = self.snapAfter(before, tx, trackedUsers)
         if confirm:
             self.resolver.confirm_tend(before, after, tx)
 
@@ -86,7 +235,7 @@ class SnapshotManager:
         trackedUsers = {"user": user}
         before = self.snap(trackedUsers)
         tx = self.strategy.harvest(overrides)
-        after = self.snap(trackedUsers)
+        after = self.snapAfter(before, tx, trackedUsers)
         if confirm:
             self.resolver.confirm_harvest(before, after, tx)
 
@@ -94,8 +243,8 @@ class SnapshotManager:
         user = overrides["from"].address
         trackedUsers = {"user": user}
         before = self.snap(trackedUsers)
-        self.sett.deposit(amount, overrides)
-        after = self.snap(trackedUsers)
+        tx = self.sett.deposit(amount, overrides)
+        after = self.snapAfter(before, tx, trackedUsers)
 
         if confirm:
             self.resolver.confirm_deposit(
@@ -107,8 +256,8 @@ class SnapshotManager:
         trackedUsers = {"user": user}
         userBalance = self.want.balanceOf(user)
         before = self.snap(trackedUsers)
-        self.sett.depositAll(overrides)
-        after = self.snap(trackedUsers)
+        tx = self.sett.depositAll(overrides)
+        after = self.snapAfter(before, tx, trackedUsers)
         if confirm:
             self.resolver.confirm_deposit(
                 before, after, {"user": user, "amount": userBalance}
@@ -118,8 +267,8 @@ class SnapshotManager:
         user = overrides["from"].address
         trackedUsers = {"user": user}
         before = self.snap(trackedUsers)
-        self.sett.earn(overrides)
-        after = self.snap(trackedUsers)
+        tx = self.sett.earn(overrides)
+        after = self.snapAfter(before, tx, trackedUsers)
         if confirm:
             self.resolver.confirm_earn(before, after, {"user": user})
 
@@ -128,7 +277,7 @@ class SnapshotManager:
         trackedUsers = {"user": user}
         before = self.snap(trackedUsers)
         tx = self.sett.withdraw(amount, overrides)
-        after = self.snap(trackedUsers)
+        after = self.snapAfter(before, tx, trackedUsers)
         if confirm:
             self.resolver.confirm_withdraw(
                 before, after, {"user": user, "amount": amount}, tx
@@ -140,7 +289,7 @@ class SnapshotManager:
         userBalance = self.sett.balanceOf(user)
         before = self.snap(trackedUsers)
         tx = self.sett.withdraw(userBalance, overrides)
-        after = self.snap(trackedUsers)
+        after = self.snapAfter(before, tx, trackedUsers)
 
         if confirm:
             self.resolver.confirm_withdraw(
@@ -148,18 +297,12 @@ class SnapshotManager:
             )
 
     def format(self, key, value):
-        if type(value) is int:
-            if "stakingRewards.staked" or "stakingRewards.earned" in key:
-                return val(value)
-            # Ether-scaled balances
-            # TODO: Handle based on token decimals
-            if (
-                "balance" in key
-                or key == "sett.available"
-                or key == "sett.getPricePerFullShare"
-                or key == "sett.totalSupply"
-            ):
-                return val(value)
+        """
+        Token amounts in units of their token's decimals, no RPC involved
+        """
+        decimals = self.units.get(key)
+        if type(value) is int and decimals is not None:
+            return val(value, decimals)
         return value
 
     def diff(self, a, b):
@@ -168,36 +311,28 @@ class SnapshotManager:
         else:
             return "-"
 
+    def compare(self, before: Snap, after: Snap):
+        """
+        SnapshotDiff of two snaps, computed once per pair
+        """
+        key = (id(before), id(after))
+        if self.lastDiff is None or self.lastDiff[0] != key:
+            self.lastDiff = (key, SnapshotDiff(before, after))
+        return self.lastDiff[1]
+
     def printCompare(self, before: Snap, after: Snap):
         # self.printPermissions()
-        table = []
+        diff = self.compare(before, after)
+        if not self.verbose:
+            return diff
+
         console.print(
             "[green]=== Compare: {} Sett {} -> {} ===[/green]".format(
                 self.key, before.block, after.block
             )
         )
-
-        for key, item in before.data.items():
-
-            a = item
-            b = after.get(key)
-
-            # Don't add items that don't change
-            if a != b:
-                table.append(
-                    [
-                        key,
-                        self.format(key, a),
-                        self.format(key, b),
-                        self.format(key, self.diff(a, b)),
-                    ]
-                )
-
-        print(
-            tabulate(
-                table, headers=["metric", "before", "after", "diff"], tablefmt="grid"
-            )
-        )
+        print(diff.render(self.format))
+        return diff
 
     def printPermissions(self):
         # Accounts
@@ -446,18 +446,14 @@ class StrategyCoreResolver:
         shares_management = fees.shares_management
         shares_perf_strategist = fees.shares_perf_strategist
 
-        delta_strategist = after.balances("sett", "strategist") - before.balances(
-            "sett", "strategist"
-        )
-
-        assert delta_strategist == shares_perf_strategist
+        diff = self.manager.compare(before, after)
 
-        delta_treasury = after.balances("sett", "treasury") - before.balances(
-            "sett", "treasury"
+        assert diff.delta("balances.sett.strategist") == shares_perf_strategist
+        assert (
+            diff.delta("balances.sett.treasury")
+            == shares_perf_treasury + shares_management
         )
 
-        assert delta_treasury == shares_perf_treasury + shares_management
-
     def confirm_tend(self, before, after, tx):
         """
         Tend Should;
@@ -0,0 +1,113 @@
+from collections import namedtuple
+
+import numpy as np
+from brownie import chain
+
+from helpers.multicall import Call, Multicall, as_wei, func
+from helpers.multicall.call import checksum
+from helpers.shares_math_batch import add, div, mul, sub, to_array
+
+"""
+  Python port of StrategyAuraStaking.getMintableAuraRewards
+
+  The AURA minted per BAL only depends on AURA's totalSupply and on constants
+  of the token: AuraEmissions reads the constants once per chain and then only
+  totalSupply. get_mintable_aura_rewards is exact and vectorized over BAL
+  amounts and supplies, project_emissions follows the schedule across cliffs
+"""
+
+AURA = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+
+CONSTANTS = [
+    "INIT_MINT_AMOUNT",
+    "reductionPerCliff",
+    "totalCliffs",
+    "EMISSIONS_MAX_SUPPLY",
+]
+
+AuraSchedule = namedtuple(
+    "AuraSchedule",
+    ["init_mint_amount", "reduction_per_cliff", "total_cliffs", "emissions_max_supply"],
+)
+
+
+def get_mintable_aura_rewards(bal_amount, total_supply, schedule):
+    """
+    AURA minted for bal_amount of BAL rewards at an AURA total_supply, floor
+    division as in Solidity. Both can be arrays, broadcast against each other
+    NOTE: Only correct if AURA.minterMinted() == 0, as in the contract
+    """
+    bal_amount, total_supply = np.broadcast_arrays(
+        to_array(bal_amount), to_array(total_supply)
+    )
+    ## Scalars as 1-d arrays, 0-d object arrays decay to ints in arithmetic
+    shape = bal_amount.shape
+    bal_amount, total_supply = np.atleast_1d(bal_amount, total_supply)
+    total_cliffs = to_array(schedule.total_cliffs)
+
+    emissions_minted = sub(total_supply, to_array(schedule.init_mint_amount))
+    cliff = div(emissions_minted, to_array(schedule.reduction_per_cliff))
+    in_schedule = cliff < schedule.total_cliffs
+
+    ## (totalCliffs - cliff) * 5 / 2 + 700, clamped to 0 cliffs left past the last one
+    cliffs_left = sub(total_cliffs, np.minimum(cliff, total_cliffs))
+    reduction = add(div(mul(cliffs_left, to_array(5)), to_array(2)), to_array(700))
+    amount = div(mul(bal_amount, reduction), total_cliffs)
+
+    amount_till_max = sub(to_array(schedule.emissions_max_supply), emissions_minted)
+    return np.where(in_schedule, np.minimum(amount, amount_till_max), 0).reshape(shape)
+
+
+def project_emissions(bal_per_period, periods, total_supply, schedule):
+    """
+    AURA minted in each of periods harvests of bal_per_period BAL, starting at
+    total_supply. Rows are periods, columns the bal_per_period scenarios
+    """
+    bal_per_period = to_array(bal_per_period)
+    supply = np.broadcast_to(to_array(total_supply), bal_per_period.shape)
+    minted = []
+    for _ in range(periods):
+        amount = get_mintable_aura_rewards(bal_per_period, supply, schedule)
+        minted.append(amount)
+        supply = add(to_array(supply), to_array(amount))
+    return np.array(minted)
+
+
+class AuraEmissions:
+    """
+    emissions = AuraEmissions()
+    aura = emissions.mintable(bal)  ## Same as strategy.getMintableAuraRewards(bal)
+    """
+
+    ## Constants of each (chain id, AURA), shared by every instance
+    schedules = {}
+
+    def __init__(self, aura=AURA):
+        self.aura = checksum(getattr(aura, "address", aura))
+
+    def schedule(self):
+        """
+        AuraSchedule, read in one multicall the first time on each chain
+        """
+        key = (chain.id, self.aura)
+        if key not in self.schedules:
+            calls = [
+                Call(self.aura, [name + "()(uint256)"], [[name, as_wei]])
+                for name in CONSTANTS
+            ]
+            data = Multicall(calls, label="aura")()
+            self.schedules[key] = AuraSchedule(*(data[name] for name in CONSTANTS))
+        return self.schedules[key]
+
+    def total_supply(self, block_identifier=None):
+        return Call(self.aura, [func.erc20.totalSupply])(None, block_identifier)
+
+    def mintable(self, bal_amount, total_supply=None, block_identifier=None):
+        """
+        AURA minted for bal_amount, at total_supply or else at AURA's supply at block_identifier
+        An int for scalar arguments, else an array
+        """
+        if total_supply is None:
+            total_supply = self.total_supply(block_identifier)
+        amount = get_mintable_aura_rewards(bal_amount, total_supply, self.schedule())
+        return int(amount) if amount.ndim == 0 else amount
@@ -0,0 +1,119 @@
+import numpy as np
+
+"""
+  Balancer V2 pool math, vectorized with numpy
+
+  Same formulas as WeightedMath.sol and StableMath.sol, in float64 instead of
+  18 decimals fixed point: results are estimates in wei, within float precision
+  (and Balancer's own rounding, a few wei) of what the pools return
+  Every argument can be an array, or a scalar broadcast against the arrays
+  Fees are fractions (getSwapFeePercentage / 1e18), weights sum to 1
+"""
+
+## StableMath gives up after as many Newton iterations
+MAX_ITERATIONS = 255
+## Relative change below which the Newton iterations stop
+TOLERANCE = 1e-15
+
+
+def as_floats(value):
+    return np.asarray(value, dtype=np.float64)
+
+
+def bpt_out_given_exact_token_in(
+    balance_in, weight_in, amount_in, total_supply, swap_fee
+):
+    """
+    BPT minted by an EXACT_TOKENS_IN_FOR_BPT_OUT join of a single token into a weighted pool
+    """
+    balance_in = as_floats(balance_in)
+    weight_in = as_floats(weight_in)
+    amount_in = as_floats(amount_in)
+
+    ## Only the part of amount_in not matching the pool's weights is swapped, and charged the fee
+    taxable = amount_in * (1 - weight_in)
+    amount_in_without_fee = amount_in - taxable * as_floats(swap_fee)
+
+    ## total_supply * ((1 + x / balance) ** weight - 1), precise for small x too
+    invariant_growth = np.expm1(
+        weight_in * np.log1p(amount_in_without_fee / balance_in)
+    )
+    return as_floats(total_supply) * invariant_growth
+
+
+def newton(step, start):
+    """
+    Iterates step from start, each value stops at its own convergence so that
+    it comes out the same whether computed alone or in a batch
+    """
+    value = np.asarray(start, dtype=np.float64)
+    done = np.zeros(value.shape, dtype=bool)
+    for _ in range(MAX_ITERATIONS):
+        following = step(value)
+        converged = np.abs(following - value) <= TOLERANCE * following
+        value = np.where(done, value, following)
+        done = done | converged
+        if done.all():
+            break
+    return value
+
+
+def stable_invariant(amp, balances):
+    """
+    D of a stable pool, balances has one row per token
+    amp is A (getAmplificationParameter's value / precision)
+    """
+    balances = as_floats(balances)
+    n = len(balances)
+    amp_times_total = as_floats(amp) * n
+    total = balances.sum(axis=0)
+
+    def step(invariant):
+        d_p = invariant
+        for balance in balances:
+            d_p = d_p * invariant / (balance * n)
+        return (
+            (amp_times_total * total + d_p * n)
+            * invariant
+            / ((amp_times_total - 1) * invariant + (n + 1) * d_p)
+        )
+
+    return newton(step, total)
+
+
+def stable_balance_given_invariant(amp, balances, invariant, index):
+    """
+    Balance of token index that keeps the invariant, given the other balances
+    """
+    balances = as_floats(balances)
+    n = len(balances)
+    amp_times_total = as_floats(amp) * n
+
+    others = [balance for i, balance in enumerate(balances) if i != index]
+    total = sum(others)
+    ## c = D ** (n + 1) / (A * n * n ** n * prod(other balances))
+    c = invariant / amp_times_total
+    for balance in others:
+        c = c * invariant / (balance * n)
+    c = c * invariant / n
+    b = total + invariant / amp_times_total
+
+    return newton(
+        lambda balance: (balance * balance + c) / (2 * balance + b - invariant),
+        (invariant * invariant + c) / (invariant + b),
+    )
+
+
+def stable_out_given_in(amp, balances, index_in, index_out, amount_in, swap_fee):
+    """
+    Token out of a GIVEN_IN swap through a stable pool
+    """
+    balances = [as_floats(balance) for balance in balances]
+    amount_in = as_floats(amount_in) * (1 - as_floats(swap_fee))
+    shape = np.broadcast(*balances, amount_in).shape
+    balances = np.array([np.broadcast_to(balance, shape) for balance in balances])
+
+    invariant = stable_invariant(amp, balances)
+    balances[index_in] = balances[index_in] + amount_in
+    balance_out = stable_balance_given_invariant(amp, balances, invariant, index_out)
+    return np.maximum(balances[index_out] - balance_out, 0)
@@ -0,0 +1,60 @@
+from _setup.config import (
+    WANT,
+    PID,
+    PERFORMANCE_FEE_GOVERNANCE,
+    PERFORMANCE_FEE_STRATEGIST,
+    WITHDRAWAL_FEE,
+    MANAGEMENT_FEE,
+)
+
+"""
+  The vault and strategy of _setup/config.py, deployed and wired up on a dev
+  chain: shared by tests/conftest.py and the scripts that need a fresh vault
+"""
+
+
+def deploy_vault(
+    deployer,
+    governance=None,
+    keeper=None,
+    guardian=None,
+    treasury=None,
+    strategist=None,
+    badgerTree=None,
+    want=WANT,
+):
+    """
+    Deploys a TheVault and its StrategyAuraStaking, returns (vault, strategy)
+    Roles left out are the deployer's
+    """
+    # Contract containers only exist once the brownie project is loaded
+    from brownie import StrategyAuraStaking, TheVault
+
+    governance = governance or deployer
+    vault = TheVault.deploy({"from": deployer})
+    vault.initialize(
+        want,
+        governance,
+        keeper or deployer,
+        guardian or deployer,
+        treasury or deployer,
+        strategist or deployer,
+        badgerTree or deployer,
+        "",
+        "",
+        [
+            PERFORMANCE_FEE_GOVERNANCE,
+            PERFORMANCE_FEE_STRATEGIST,
+            WITHDRAWAL_FEE,
+            MANAGEMENT_FEE,
+        ],
+        {"from": deployer},
+    )
+    # NOTE: TheVault starts unpaused
+
+    strategy = StrategyAuraStaking.deploy({"from": deployer})
+    strategy.initialize(vault, PID)
+    # NOTE: Strategy starts unpaused
+
+    vault.setStrategy(strategy, {"from": governance})
+    return vault, strategy
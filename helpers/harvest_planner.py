@@ -0,0 +1,262 @@
+import csv
+import json
+from collections import namedtuple
+
+import numpy as np
+from brownie import web3
+from dotmap import DotMap
+from tabulate import tabulate
+
+from helpers.aura_emissions import get_mintable_aura_rewards
+from helpers.harvest_sim import HarvestSnapshot, load_harvest_snapshot, simulate
+from helpers.multicall import Call, Multicall, as_wei, func
+from helpers.multicall.call import checksum
+from helpers.shares_math import MAX_BPS, SECS_PER_YEAR
+
+"""
+  Harvest cadence planning for a fleet of StrategyAuraStaking vaults
+
+  Every vault is evaluated at every candidate interval, over a gas price
+  history, with two policies:
+  - fixed: harvest every interval, whatever the gas price
+  - threshold: harvest once per interval, at the first gas price at most the
+    median of the interval before, or at the end of the interval. Only prices
+    already seen are used, as the keeper would
+  The rewards of each harvest come from helpers.harvest_sim, so slippage and
+  minOut reverts of large harvests count. Net yield per year is what the tree
+  receives, minus the gas, minus the yield the rewards miss while unharvested
+  The management fee is charged pro rata of time at every harvest, it does not
+  depend on the cadence and is only reported
+"""
+
+## Gas of one harvest() when none is given
+HARVEST_GAS = 1_200_000
+## Candidate harvest intervals
+INTERVAL_HOURS = (1, 2, 4, 6, 8, 12, 24, 36, 48, 72, 96, 168, 240, 336, 504, 720)
+POLICIES = ("fixed", "threshold")
+
+VaultInputs = namedtuple(
+    "VaultInputs",
+    [
+        "name",
+        "snapshot",  ## HarvestSnapshot, its bal is the BAL pending now
+        "bal_per_second",
+        "harvest_gas",
+        "management_fee",
+        "balance",  ## Of the vault, in want
+    ],
+)
+
+
+def load_vault_inputs(strategy, harvest_gas=HARVEST_GAS, block_identifier=None):
+    """
+    VaultInputs of a strategy, BAL accrued since the vault's last harvest sets the rate
+    """
+    snapshot = load_harvest_snapshot(strategy, block_identifier)
+    address = checksum(getattr(strategy, "address", strategy))
+    vault = checksum(Call(address, ["vault()(address)"])(None, snapshot.block))
+    data = Multicall(
+        [
+            Call(vault, [func.sett.lastHarvestedAt], [["lastHarvestedAt", as_wei]]),
+            Call(vault, [func.sett.managementFee], [["managementFee", as_wei]]),
+            Call(vault, [func.sett.balance], [["balance", as_wei]]),
+        ],
+        block_identifier=snapshot.block,
+        label="harvest_planner",
+    )()
+    elapsed = web3.eth.get_block(snapshot.block)["timestamp"] - data["lastHarvestedAt"]
+
+    return VaultInputs(
+        name=address,
+        snapshot=snapshot,
+        bal_per_second=snapshot.bal / elapsed if elapsed > 0 else 0.0,
+        harvest_gas=harvest_gas,
+        management_fee=data["managementFee"],
+        balance=data["balance"],
+    )
+
+
+def load_gas_prices(path, step):
+    """
+    Gas prices in wei every step seconds, from a csv of (timestamp, gas price in gwei) rows
+    Each step takes the last price seen at or before it
+    """
+    with open(path) as file:
+        rows = sorted(
+            (int(row[0]), float(row[1]))
+            for row in csv.reader(file)
+            if row and row[0].isdigit()
+        )
+    timestamps, gwei = (np.array(column) for column in zip(*rows))
+    steps = np.arange(timestamps[0], timestamps[-1] + 1, step)
+    return gwei[np.searchsorted(timestamps, steps, side="right") - 1] * 10 ** 9
+
+
+def gas_per_harvest(gas_prices, windows):
+    """
+    For each window (in steps) and policy: the sum of the gas prices paid over
+    the history and the number of harvests. Also the threshold for the next
+    harvest of each window, the median of the latest one
+    """
+    total = np.zeros((len(windows), len(POLICIES)))
+    thresholds = np.zeros(len(windows))
+    harvests = np.zeros(len(windows))
+    for k, window in enumerate(windows):
+        count = len(gas_prices) // window
+        prices = gas_prices[: count * window].reshape(count, window)
+        medians = np.median(prices, axis=1)
+        ## The first interval has no median before it, it harvests right away
+        threshold = np.concatenate([[np.inf], medians[:-1]])
+        below = prices <= threshold[:, None]
+        below[:, -1] = True
+        paid = prices[np.arange(count), below.argmax(axis=1)]
+
+        total[k] = prices[:, 0].sum(), paid.sum()
+        thresholds[k] = medians[-1]
+        harvests[k] = count
+    return total, thresholds, harvests
+
+
+def stack_snapshots(snapshots):
+    """
+    One HarvestSnapshot of (vaults, 1) arrays, broadcast against per-interval values
+    """
+    return HarvestSnapshot(
+        *(
+            np.array([float(value) for value in values])[:, None]
+            for values in zip(*snapshots)
+        )
+    )
+
+
+def plan_harvests(
+    vaults,
+    gas_prices,
+    step,
+    prices,
+    aura_supply,
+    aura_schedule,
+    compound_apr=0.0,
+    interval_hours=INTERVAL_HOURS,
+):
+    """
+    Best cadence of each vault, as report rows, and net yields per year (in ETH
+    wei) of every vault, interval and policy
+      gas_prices: wei per gas every step seconds, e.g. a year of them
+      prices: ETH per bauraBAL and per graviAURA
+      aura_supply, aura_schedule: AURA's totalSupply and AuraSchedule, for the
+        AURA minted with the BAL
+      compound_apr: yield of the harvested tokens, missed until they are harvested
+    """
+    gas_prices = np.asarray(gas_prices, dtype=np.float64)
+    if step <= 0 or gas_prices.ndim != 1:
+        raise ValueError("Expected a positive step and a 1-d gas price history")
+    intervals = np.array(
+        [
+            hours * 3600
+            for hours in interval_hours
+            if step <= hours * 3600 <= len(gas_prices) * step
+        ],
+        dtype=np.int64,
+    )
+    if len(intervals) == 0:
+        raise ValueError(
+            "No interval fits between the {}s step and the {}s gas price "
+            "history".format(step, len(gas_prices) * step)
+        )
+    misaligned = intervals[intervals % step != 0]
+    if len(misaligned):
+        raise ValueError(
+            "Intervals of {} hours are not multiples of the {}s step".format(
+                (misaligned // 3600).tolist(), step
+            )
+        )
+    windows = intervals // step
+    gas_total, thresholds, harvests = gas_per_harvest(gas_prices, windows)
+    per_year = SECS_PER_YEAR / (len(gas_prices) * step)
+
+    ## Rewards of one harvest, for every vault (rows) and interval (columns)
+    rates = np.array([vault.bal_per_second for vault in vaults], dtype=np.float64)
+    bal = np.floor(rates[:, None] * intervals[None, :])
+    bal_wei = np.array([int(amount) for amount in bal.flat], dtype=object)
+    aura = get_mintable_aura_rewards(
+        bal_wei.reshape(bal.shape), aura_supply, aura_schedule
+    )
+    snapshot = stack_snapshots([vault.snapshot for vault in vaults])
+    result = simulate(
+        snapshot._replace(bal=bal, aura=np.asarray(aura, dtype=np.float64))
+    )
+
+    price_baurabal, price_graviaura = prices
+    value = (
+        result.tree_baurabal * price_baurabal + result.tree_graviaura * price_graviaura
+    )
+    gross = value * harvests[None, :] * per_year
+    ## On average rewards wait half an interval before earning compound_apr
+    delay = gross * compound_apr * intervals[None, :] / 2 / SECS_PER_YEAR
+
+    gas_used = np.array([vault.harvest_gas for vault in vaults], dtype=np.float64)
+    gas = gas_used[:, None, None] * gas_total[None, :, :] * per_year
+    net = (gross - delay)[:, :, None] - gas
+    ## Harvests that would revert on minOut never pay out
+    net = np.where(result.reverts[:, :, None], -np.inf, net)
+
+    rows = []
+    for v, vault in enumerate(vaults):
+        k, p = np.unravel_index(np.argmax(net[v]), net[v].shape)
+        pending = float(vault.snapshot.bal)
+        due = (bal[v, k] - pending) / rates[v] if rates[v] > 0 else np.inf
+        management_fee = vault.balance * vault.management_fee // MAX_BPS
+        rows.append(
+            DotMap(
+                vault=vault.name,
+                interval_hours=int(intervals[k] // 3600),
+                policy=POLICIES[p],
+                harvests_per_year=float(harvests[k] * per_year),
+                bal_per_harvest=float(bal[v, k]),
+                headroom_bps=float(result.headroom_bps[v, k]),
+                gross_eth=float(gross[v, k]) / 1e18,
+                gas_eth=float(gas[v, k, p]) / 1e18,
+                net_eth=float(net[v, k, p]) / 1e18,
+                ## False when every cadence reverts on minOut
+                feasible=bool(np.isfinite(net[v, k, p])),
+                ## The keeper harvests once due, with the threshold policy when gas is at most this
+                due_in_hours=max(float(due), 0.0) / 3600,
+                max_gas_gwei=(
+                    float(thresholds[k]) / 1e9 if POLICIES[p] == "threshold" else None
+                ),
+                management_fee_want_per_year=management_fee,
+            )
+        )
+    return rows, net
+
+
+def print_report(rows):
+    keys = [
+        "vault",
+        "interval_hours",
+        "policy",
+        "harvests_per_year",
+        "headroom_bps",
+        "gross_eth",
+        "gas_eth",
+        "net_eth",
+        "feasible",
+        "due_in_hours",
+        "max_gas_gwei",
+    ]
+    print(
+        tabulate(
+            [[row[key] for key in keys] for row in rows],
+            headers=keys,
+            floatfmt=",.4f",
+        )
+    )
+
+
+def write_report(rows, path):
+    """
+    The rows as a JSON list, for the keeper
+    """
+    with open(path, "w") as file:
+        json.dump([row.toDict() for row in rows], file, indent=2)
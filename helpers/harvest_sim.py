@@ -0,0 +1,280 @@
+from collections import namedtuple
+
+import numpy as np
+from dotmap import DotMap
+
+from helpers import balancer_math
+from helpers.multicall import Call, Multicall, as_wei, func
+from helpers.multicall.call import checksum
+from helpers.multicall.functions import as_original
+from helpers.shares_math import MAX_BPS
+
+"""
+  Offline simulation of StrategyAuraStaking._harvest
+
+  load_harvest_snapshot reads, in one multicall, everything the harvest route
+  depends on: the rewards to claim, the Balancer pools, the bauraBAL and
+  graviAURA vaults and the fees of the strategy's vault
+  simulate replays the route on a snapshot with numpy:
+    BAL  --> BAL/ETH BPT (joinPool) --> auraBAL (swap) --> bauraBAL (deposit)
+    AURA --> graviAURA (deposit)
+  Any field of the snapshot can be an array of what-if values, e.g. with the
+  AURA minted for each BAL amount from helpers.aura_emissions:
+    bal = [i * 10**19 for i in range(10_000)]
+    simulate(snapshot._replace(bal=bal, aura=AuraEmissions().mintable(bal)))
+"""
+
+## Constants of StrategyAuraStaking
+BALANCER_VAULT = "0xBA12222222228d8Ba445958a75a0704d566BF2C8"
+BAL = "0xba100000625a3754423978a60c9317c58a424e3D"
+AURA = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+AURABAL = "0x616e8BfA43F920657B3497DBf40D6b1A02D4608d"
+BALETH_BPT = "0x5c6Ee304399DBdB9C8Ef030aB642B10820DB8F56"
+GRAVIAURA = "0xBA485b556399123261a5F9c95d413B4f93107407"
+BAURABAL = "0x37d9D2C6035b744849C15F1BFEE8F268a20fCBd8"
+BAL_ETH_POOL_ID = "0x5c6ee304399dbdb9c8ef030ab642b10820db8f56000200000000000000000014"
+AURABAL_BALETH_BPT_POOL_ID = (
+    "0x3dd0843a028c86e0b760b1a76929d1c5ef93a2dd000200000000000000000249"
+)
+
+## A pool's address is the first 20 bytes of its id
+AURABAL_POOL = checksum(AURABAL_BALETH_BPT_POOL_ID[:42])
+
+## Balancer fees and weights are 18 decimals fixed point
+ONE = 10 ** 18
+
+GET_POOL_TOKENS = "getPoolTokens(bytes32)(address[],uint256[],uint256)"
+REWARDS = "balanceOfRewards()((address,uint256)[])"
+
+HarvestSnapshot = namedtuple(
+    "HarvestSnapshot",
+    [
+        "block",
+        ## Claimed by getReward, plus what the strategy already holds
+        "bal",
+        "aura",
+        "bpt",
+        ## BAL/ETH 80/20 weighted pool
+        "bal_eth_bal",
+        "bal_eth_bal_weight",
+        "bal_eth_supply",
+        "bal_eth_swap_fee",
+        ## auraBAL / BAL/ETH BPT stable pool
+        "aurabal_pool_bpt",
+        "aurabal_pool_aurabal",
+        "aurabal_pool_amp",
+        "aurabal_pool_swap_fee",
+        ## Badger vaults the rewards are deposited into
+        "baurabal_balance",
+        "baurabal_supply",
+        "baurabal_held",
+        "graviaura_balance",
+        "graviaura_supply",
+        "graviaura_held",
+        ## Strategy and vault settings
+        "min_out_bps",
+        "performance_fee_governance",
+        "performance_fee_strategist",
+    ],
+)
+
+
+def pool_tokens_call(name, pool_id):
+    return Call(
+        BALANCER_VAULT,
+        [GET_POOL_TOKENS, bytes.fromhex(pool_id[2:])],
+        [
+            [name + ".tokens", as_original],
+            [name + ".balances", as_original],
+            [name + ".lastChangeBlock", None],
+        ],
+    )
+
+
+def load_harvest_snapshot(strategy, block_identifier=None):
+    """
+    HarvestSnapshot of a StrategyAuraStaking, read in one multicall
+    """
+    address = checksum(getattr(strategy, "address", strategy))
+    vault = checksum(Call(address, ["vault()(address)"])(None, block_identifier))
+
+    def balance_of(token, name):
+        return Call(token, [func.erc20.balanceOf, address], [[name, as_wei]])
+
+    def vault_calls(token, name):
+        return [
+            Call(token, [func.sett.balance], [[name + ".balance", as_wei]]),
+            Call(token, [func.erc20.totalSupply], [[name + ".supply", as_wei]]),
+            balance_of(token, name + ".held"),
+        ]
+
+    calls = [
+        Call(address, [REWARDS], [["strategy.rewards", as_original]]),
+        Call(
+            address,
+            ["balEthBptToAuraBalMinOutBps()(uint256)"],
+            [["strategy.minOutBps", as_wei]],
+        ),
+        balance_of(BAL, "strategy.bal"),
+        balance_of(AURA, "strategy.aura"),
+        balance_of(BALETH_BPT, "strategy.bpt"),
+        pool_tokens_call("balEth", BAL_ETH_POOL_ID),
+        Call(
+            BALETH_BPT,
+            ["getNormalizedWeights()(uint256[])"],
+            [["balEth.weights", as_original]],
+        ),
+        Call(BALETH_BPT, [func.erc20.totalSupply], [["balEth.supply", as_wei]]),
+        Call(
+            BALETH_BPT,
+            ["getSwapFeePercentage()(uint256)"],
+            [["balEth.swapFee", as_wei]],
+        ),
+        pool_tokens_call("auraBal", AURABAL_BALETH_BPT_POOL_ID),
+        Call(
+            AURABAL_POOL,
+            ["getAmplificationParameter()(uint256,bool,uint256)"],
+            [
+                ["auraBal.amp", None],
+                ["auraBal.ampUpdating", None],
+                ["auraBal.ampPrecision", None],
+            ],
+        ),
+        Call(
+            AURABAL_POOL,
+            ["getSwapFeePercentage()(uint256)"],
+            [["auraBal.swapFee", as_wei]],
+        ),
+        *vault_calls(BAURABAL, "bauraBal"),
+        *vault_calls(GRAVIAURA, "graviAura"),
+        Call(
+            vault,
+            [func.sett.performanceFeeGovernance],
+            [["vault.performanceFeeGovernance", as_wei]],
+        ),
+        Call(
+            vault,
+            [func.sett.performanceFeeStrategist],
+            [["vault.performanceFeeStrategist", as_wei]],
+        ),
+    ]
+    multi = Multicall(calls, block_identifier=block_identifier, label="harvest_sim")
+    data = multi()
+
+    (_, bal_earned), (_, aura_earned) = data["strategy.rewards"]
+    bal_eth = dict(zip(map(checksum, data["balEth.tokens"]), data["balEth.balances"]))
+    bal_index = [checksum(token) for token in data["balEth.tokens"]].index(
+        checksum(BAL)
+    )
+    aurabal = dict(zip(map(checksum, data["auraBal.tokens"]), data["auraBal.balances"]))
+
+    return HarvestSnapshot(
+        block=multi.block,
+        bal=bal_earned + data["strategy.bal"],
+        aura=aura_earned + data["strategy.aura"],
+        bpt=data["strategy.bpt"],
+        bal_eth_bal=bal_eth[checksum(BAL)],
+        bal_eth_bal_weight=data["balEth.weights"][bal_index] / ONE,
+        bal_eth_supply=data["balEth.supply"],
+        bal_eth_swap_fee=data["balEth.swapFee"] / ONE,
+        aurabal_pool_bpt=aurabal[checksum(BALETH_BPT)],
+        aurabal_pool_aurabal=aurabal[checksum(AURABAL)],
+        aurabal_pool_amp=data["auraBal.amp"] / data["auraBal.ampPrecision"],
+        aurabal_pool_swap_fee=data["auraBal.swapFee"] / ONE,
+        baurabal_balance=data["bauraBal.balance"],
+        baurabal_supply=data["bauraBal.supply"],
+        baurabal_held=data["bauraBal.held"],
+        graviaura_balance=data["graviAura.balance"],
+        graviaura_supply=data["graviAura.supply"],
+        graviaura_held=data["graviAura.held"],
+        min_out_bps=data["strategy.minOutBps"],
+        performance_fee_governance=data["vault.performanceFeeGovernance"],
+        performance_fee_strategist=data["vault.performanceFeeStrategist"],
+    )
+
+
+def deposit_shares(amount, balance, supply):
+    """
+    Shares minted by a Badger vault deposit, 1:1 into an empty vault
+    """
+    amount, balance, supply = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (amount, balance, supply))
+    )
+    empty = supply == 0
+    return np.floor(
+        np.where(empty, amount, amount * supply / np.where(empty, 1, balance))
+    )
+
+
+def simulate(snapshot):
+    """
+    Expected outcome of harvest() on snapshot, as arrays in wei (float64):
+      bpt_out, aurabal_out: the joinPool and swap outputs
+      min_out: the swap's minimum out, reverts: swaps that would not reach it
+      headroom_bps: aurabal_out per BPT swapped over balEthBptToAuraBalMinOutBps
+      harvested_baurabal, harvested_graviaura: the Harvested / TreeDistribution
+        amounts before the vault's fees
+      tree_baurabal, tree_graviaura: what TreeDistribution sends to the tree
+    """
+    s = snapshot
+    bal = np.asarray(s.bal, dtype=np.float64)
+
+    ## BAL --> BAL/ETH BPT, the join is skipped without BAL
+    joined = balancer_math.bpt_out_given_exact_token_in(
+        s.bal_eth_bal, s.bal_eth_bal_weight, bal, s.bal_eth_supply, s.bal_eth_swap_fee
+    )
+    bpt_out = np.floor(np.where(bal > 0, joined, 0))
+    bpt = bpt_out + np.asarray(s.bpt, dtype=np.float64)
+
+    ## BAL/ETH BPT --> auraBAL, index 0 is the BPT (pool tokens are sorted by address)
+    swapped = balancer_math.stable_out_given_in(
+        s.aurabal_pool_amp,
+        [s.aurabal_pool_bpt, s.aurabal_pool_aurabal],
+        0,
+        1,
+        bpt,
+        s.aurabal_pool_swap_fee,
+    )
+    aurabal_out = np.floor(np.where(bal > 0, swapped, 0))
+    min_out = np.floor(bpt * np.asarray(s.min_out_bps) / MAX_BPS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        headroom_bps = np.where(
+            bpt > 0, aurabal_out * MAX_BPS / bpt - s.min_out_bps, np.inf
+        )
+
+    ## auraBAL --> bauraBAL, AURA --> graviAURA
+    harvested_baurabal = np.where(
+        bal > 0,
+        deposit_shares(aurabal_out, s.baurabal_balance, s.baurabal_supply)
+        + np.asarray(s.baurabal_held, dtype=np.float64),
+        0,
+    )
+    aura = np.asarray(s.aura, dtype=np.float64)
+    harvested_graviaura = np.where(
+        aura > 0,
+        deposit_shares(aura, s.graviaura_balance, s.graviaura_supply)
+        + np.asarray(s.graviaura_held, dtype=np.float64),
+        0,
+    )
+
+    result = DotMap(
+        bpt_out=bpt_out,
+        aurabal_out=aurabal_out,
+        min_out=min_out,
+        headroom=aurabal_out - min_out,
+        headroom_bps=headroom_bps,
+        reverts=(bal > 0) & (aurabal_out < min_out),
+        harvested_baurabal=harvested_baurabal,
+        harvested_graviaura=harvested_graviaura,
+    )
+
+    ## The vault takes its performance fees out of each token, the rest goes to the tree
+    for token in ["baurabal", "graviaura"]:
+        harvested = result["harvested_" + token]
+        governance = np.floor(harvested * s.performance_fee_governance / MAX_BPS)
+        strategist = np.floor(harvested * s.performance_fee_strategist / MAX_BPS)
+        result["fee_governance_" + token] = governance
+        result["fee_strategist_" + token] = strategist
+        result["tree_" + token] = harvested - governance - strategist
+
+    return result
@@ -5,6 +5,17 @@ https://github.com/banteg/multicall.py
 __version__ = "0.1.1"
 
 from helpers.multicall.signature import Signature
-from helpers.multicall.call import Call
-from helpers.multicall.multicall import Multicall
+from helpers.multicall.call import Call, CallFailure
+from helpers.multicall.cache import ResultCache
+from helpers.multicall.stats import MulticallStats, multicall_stats
+from helpers.multicall.multicall import CallReverted, Multicall
 from helpers.multicall.functions import func, as_wei
+
+
+def __getattr__(name):
+    # AsyncMulticall needs aiohttp and web3's async API, only imported when used
+    if name == "AsyncMulticall":
+        from helpers.multicall.async_multicall import AsyncMulticall
+
+        return AsyncMulticall
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,179 @@
+import asyncio
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import List
+
+from aiohttp import ClientError, ClientSession, TCPConnector
+from brownie import web3
+from web3 import Web3, AsyncHTTPProvider
+from web3.eth import AsyncEth
+
+from helpers.multicall import Call
+from helpers.multicall.multicall import Multicall, BATCH_ERRORS
+from helpers.multicall.constants import MAX_CONCURRENCY, AGGREGATE_TRANSPORT
+
+ASYNC_BATCH_ERRORS = BATCH_ERRORS + (ClientError, asyncio.TimeoutError)
+
+
+class SessionProvider(AsyncHTTPProvider):
+    """
+    AsyncHTTPProvider that posts through its own session. web3's providers
+    share one cached session per endpoint and thread, so a connection closing
+    it would break every other connection to the same endpoint
+    """
+
+    def __init__(self, endpoint_uri, session, request_kwargs=None):
+        super().__init__(endpoint_uri, request_kwargs)
+        self.session = session
+
+    async def make_request(self, method, params):
+        data = self.encode_rpc_request(method, params)
+        async with self.session.post(
+            self.endpoint_uri, data=data, **self.get_request_kwargs()
+        ) as response:
+            response.raise_for_status()
+            return self.decode_rpc_response(await response.read())
+
+
+@asynccontextmanager
+async def connection(endpoint_uri=None, max_connections=MAX_CONCURRENCY):
+    """
+    Async web3 for endpoint_uri (default: brownie's) over its own pooled HTTP
+    session, closed on exit. Pass it as w3 to share the pool between
+    AsyncMulticalls:
+        async with connection() as w3:
+            await asyncio.gather(AsyncMulticall(a, w3=w3)(), AsyncMulticall(b, w3=w3)())
+    """
+    endpoint_uri = endpoint_uri or web3.provider.endpoint_uri
+    connector = TCPConnector(limit=max_connections)
+    async with ClientSession(connector=connector) as session:
+        provider = SessionProvider(endpoint_uri, session)
+        yield Web3(provider, modules={"eth": (AsyncEth,)}, middlewares=[])
+
+
+class AsyncMulticall(Multicall):
+    """
+    Multicall that dispatches its batches concurrently on an async provider
+    Returns the same result as Multicall for the same calls:
+        data = await AsyncMulticall(calls)()
+    Batches always go through the aggregator contract, w3 is an async web3 from
+    connection(), by default each invocation opens its own
+    """
+
+    def __init__(
+        self,
+        calls: List[Call],
+        w3=None,
+        max_concurrency=MAX_CONCURRENCY,
+        **kwargs,
+    ):
+        super().__init__(calls, **kwargs)
+        self.w3 = w3
+        self.max_concurrency = max_concurrency
+
+    async def aggregate(self, address, calls, block_identifier):
+        aggregate, args = self.aggregator(address, calls)
+        metrics = self.metrics
+        self.round_trips += 1
+        metrics["round_trips"] += 1
+
+        start = perf_counter()
+        tx = {"to": aggregate.target, "data": aggregate.signature.encode_data(args)}
+        metrics["encode_seconds"] += perf_counter() - start
+        metrics["calldata_bytes"] += len(tx["data"])
+
+        # Summed over concurrent batches, can exceed the wall time
+        start = perf_counter()
+        output = await self.w3.eth.call(tx, block_identifier or "latest")
+        metrics["rpc_seconds"] += perf_counter() - start
+        metrics["response_bytes"] += len(output)
+        if self.estimate_gas:
+            metrics["gas"] += await self.w3.eth.estimate_gas(tx, block_identifier)
+
+        start = perf_counter()
+        decoded = self.unpack(aggregate.decode_output(output))
+        metrics["decode_seconds"] += perf_counter() - start
+        return decoded
+
+    async def fetch_batch(self, semaphore, address, batch, block_identifier):
+        try:
+            async with semaphore:
+                self.block, data = await self.aggregate(
+                    address, batch, block_identifier
+                )
+            return data
+        except ASYNC_BATCH_ERRORS:
+            if len(batch) == 1:
+                if self.require_success:
+                    raise
+                return [(False, b"")]
+
+        half = len(batch) // 2
+        halves = await asyncio.gather(
+            self.fetch_batch(semaphore, address, batch[:half], block_identifier),
+            self.fetch_batch(semaphore, address, batch[half:], block_identifier),
+        )
+        return halves[0] + halves[1]
+
+    async def fetch(self, calls):
+        """
+        Returns the (success, output) pair of every call, in order
+        """
+        if self.w3 is None:
+            # Without a w3 to share, the connection only lasts for this fetch
+            async with connection() as w3:
+                self.w3 = w3
+                try:
+                    return await self.fetch(calls)
+                finally:
+                    self.w3 = None
+
+        chain_id = await self.w3.eth.chain_id
+        address = self.address(chain_id)
+        self.metrics["transport"] = AGGREGATE_TRANSPORT
+
+        block_identifier = self.block_identifier
+        if self.cache is None or not self.cache.cacheable(block_identifier):
+            return await self.fetch_batches(address, calls, block_identifier)
+
+        self.block = block_identifier
+        block_hash = self.cache.block_hash(chain_id, block_identifier)
+        if block_hash is None:
+            block = await self.w3.eth.get_block(block_identifier)
+            block_hash = self.cache.remember_hash(
+                chain_id, block_identifier, block["hash"]
+            )
+        outputs, misses = self.lookup(chain_id, block_hash, calls)
+        if not misses:
+            return outputs
+        fetched = await self.fetch_batches(address, misses, block_identifier)
+        return self.fill(chain_id, block_hash, outputs, misses, fetched)
+
+    async def fetch_batches(self, address, calls, block_identifier):
+        """
+        Batches run concurrently, a batch that fails is bisected
+        """
+        if block_identifier is None:
+            # Batches, and the halves of a bisected one, have to read the same
+            # block to be consistent
+            block_identifier = await self.w3.eth.block_number
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *[
+                self.fetch_batch(semaphore, address, batch, block_identifier)
+                for batch in self.chunks(calls)
+            ]
+        )
+        return [output for data in results for output in data]
+
+    async def read(self, decode=None):
+        """
+        Same as Multicall.read, awaited
+        """
+        start = self.start_metrics()
+        try:
+            return self.decode(await self.fetch(self.unique), decode)
+        finally:
+            # Failed invocations are recorded too
+            self.record_metrics(start)
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+from threading import Lock
+
+from brownie.network.state import _revert_register
+
+from helpers.multicall.constants import RESULT_CACHE_SIZE
+
+
+class ResultCache:
+    """
+    LRU of raw call outputs keyed by (chainId, block hash, target, calldata)
+    Only reads pinned to a block number are cached, never "latest"
+    Share one instance between Multicalls (or SnapshotManagers) to reuse reads
+    Keying by hash keeps it valid across chain.revert() / chain.undo(), which
+    mine the same block numbers again with different state. The hash of each
+    block number is remembered until brownie reverts below it, so a read
+    served from the cache costs no round trip
+    Safe to share between threads
+    """
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hashes = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+        # brownie calls _revert / _reset when the local chain goes back
+        _revert_register(self)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def cacheable(block_identifier):
+        return isinstance(block_identifier, int) and not isinstance(
+            block_identifier, bool
+        )
+
+    def block_hash(self, chain_id, block):
+        """
+        Remembered hash of block, None if it has to be fetched
+        """
+        with self.lock:
+            return self.hashes.get((chain_id, block))
+
+    def remember_hash(self, chain_id, block, block_hash):
+        block_hash = bytes(block_hash)
+        with self.lock:
+            self.hashes[(chain_id, block)] = block_hash
+            while len(self.hashes) > self.maxsize:
+                self.hashes.popitem(last=False)
+        return block_hash
+
+    def _revert(self, height):
+        # Blocks above height will be mined again, with other hashes
+        with self.lock:
+            for key in [key for key in self.hashes if key[1] > height]:
+                del self.hashes[key]
+
+    def _reset(self):
+        with self.lock:
+            self.hashes.clear()
+
+    def lookup(self, chain_id, block_hash, calls):
+        """
+        Returns the cached output of every call (None when missing) and the
+        indexes of the calls that have to be fetched
+        """
+        outputs = []
+        missing = []
+        with self.lock:
+            for i, call in enumerate(calls):
+                key = (chain_id, block_hash, call.target, call.data)
+                output = self.entries.get(key)
+                if output is None:
+                    missing.append(i)
+                else:
+                    self.entries.move_to_end(key)
+                outputs.append(output)
+            self.misses += len(missing)
+            self.hits += len(calls) - len(missing)
+        return outputs, missing
+
+    def store(self, chain_id, block_hash, calls, outputs):
+        """
+        Caches the outputs of calls that succeeded
+        """
+        with self.lock:
+            for call, output in zip(calls, outputs):
+                if output[0]:
+                    key = (chain_id, block_hash, call.target, call.data)
+                    self.entries[key] = output
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hashes.clear()
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -1,23 +1,103 @@
 # Credit: https://github.com/banteg/multicall.py/blob/master/multicall/call.py
+from functools import lru_cache
+
 from eth_utils import to_checksum_address
 from brownie import web3
 from helpers.multicall import Signature
+from helpers.multicall.constants import CALLDATA_CACHE_SIZE
+
+
+class CallFailure:
+    """
+    Stands in for the value of a call that reverted inside a tryAggregate batch
+    """
+
+    __slots__ = ("target", "function", "args")
+
+    def __init__(self, call):
+        self.target = call.target
+        self.function = call.function
+        self.args = call.args
+
+    def __bool__(self):
+        return False
+
+    @property
+    def key(self):
+        return (self.target, self.function, self.args)
+
+    def __eq__(self, other):
+        return isinstance(other, CallFailure) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return "CallFailure({} {} {})".format(self.target, self.function, self.args)
+
+
+def freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+checksum = lru_cache(maxsize=CALLDATA_CACHE_SIZE)(to_checksum_address)
+
+
+@lru_cache(maxsize=CALLDATA_CACHE_SIZE)
+def encode_calldata(signature, args):
+    return signature.encode_data(args)
 
 
 class Call:
+    """
+    Immutable and hashable, the calldata is encoded once and shared by every
+    identical Call in the process
+    """
+
+    __slots__ = ("target", "function", "args", "signature", "returns", "data")
+
     def __init__(self, target, function, returns=None):
-        self.target = to_checksum_address(target)
         if isinstance(function, list):
-            self.function, *self.args = function
+            function, *args = function
+            args = freeze(args)
         else:
-            self.function = function
-            self.args = None
-        self.signature = Signature(self.function)
-        self.returns = returns
+            args = None
+        signature = Signature(function)
+
+        try:
+            data = encode_calldata(signature, args)
+        except TypeError:
+            # Unhashable arguments, encode without caching
+            data = signature.encode_data(args)
+
+        setattr_ = super().__setattr__
+        setattr_("target", checksum(target))
+        setattr_("function", function)
+        setattr_("args", args)
+        setattr_("signature", signature)
+        setattr_("returns", freeze(returns))
+        setattr_("data", data)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Call is immutable")
 
     @property
-    def data(self):
-        return self.signature.encode_data(self.args)
+    def key(self):
+        """
+        Calls with the same key return the same output
+        """
+        return (self.target, self.data)
+
+    def __eq__(self, other):
+        return isinstance(other, Call) and (self.key, self.returns) == (
+            other.key,
+            other.returns,
+        )
+
+    def __hash__(self):
+        return hash((self.key, self.returns))
 
     def decode_output(self, output):
         decoded = self.signature.decode_data(output)
@@ -29,8 +109,15 @@ class Call:
         else:
             return decoded if len(decoded) > 1 else decoded[0]
 
-    def __call__(self, args=None):
-        args = args or self.args
-        calldata = self.signature.encode_data(args)
-        output = web3.eth.call({"to": self.target, "data": calldata})
+    def failure(self):
+        failure = CallFailure(self)
+        if self.returns:
+            return {name: failure for name, _ in self.returns}
+        return failure
+
+    def __call__(self, args=None, block_identifier=None):
+        calldata = self.data if args is None else self.signature.encode_data(args)
+        output = web3.eth.call(
+            {"to": self.target, "data": calldata}, block_identifier or "latest"
+        )
         return self.decode_output(output)
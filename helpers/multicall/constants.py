@@ -29,3 +29,29 @@ MULTICALL_ADDRESSES = {
     Network.Arbitrum: "0x7A7443F8c577d537f1d8cD4a629d40a3148Dd7ee",
     Network.Hardhat: "0x7A7443F8c577d537f1d8cD4a629d40a3148Dd7ee",
 }
+
+# Upper bounds for a single aggregate eth_call, larger call lists are split
+MAX_CALLS_PER_BATCH = 500
+MAX_CALLDATA_BYTES = 128_000
+
+# Multicall3 is deployed at the same address on every network above and keeps
+# Multicall2's tryAggregate(bool,(address,bytes)[]) interface
+MULTICALL3_ADDRESSES = {
+    network: "0xcA11bde05977b3631167028862bE2a173976CA11" for network in Network
+}
+
+# Seconds a JSON-RPC batch waits for the node when the provider sets no timeout
+REQUEST_TIMEOUT = 10
+
+# Aggregates AsyncMulticall keeps in flight at once
+MAX_CONCURRENCY = 8
+
+# How a Multicall sends its calls to the node
+AGGREGATE_TRANSPORT = "aggregate"  # One eth_call to the multicall contract per batch
+RPC_BATCH_TRANSPORT = "rpc_batch"  # One JSON-RPC batch of plain eth_calls per batch
+
+# Distinct (signature, args) pairs whose calldata is kept encoded
+CALLDATA_CACHE_SIZE = 16_384
+
+# Call outputs kept by a ResultCache
+RESULT_CACHE_SIZE = 100_000
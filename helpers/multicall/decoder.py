@@ -0,0 +1,130 @@
+from functools import lru_cache
+
+from eth_abi.exceptions import InsufficientDataBytes, NonEmptyPaddingBytes
+
+from helpers.multicall.functions import as_wei, as_original
+
+WORD = 32
+
+# Handlers that return the value unchanged are skipped when decoding
+IDENTITY_HANDLERS = (as_wei, as_original)
+
+
+def decode_uint256(word):
+    return int.from_bytes(word, "big")
+
+
+def decode_bool(word):
+    value = int.from_bytes(word, "big")
+    if value > 1:
+        raise NonEmptyPaddingBytes(
+            "Boolean must be either 0x0 or 0x1.  Got: {}".format(bytes(word))
+        )
+    return bool(value)
+
+
+def decode_address(word):
+    if any(word[:12]):
+        raise NonEmptyPaddingBytes(
+            "Padding bytes were not empty: {}".format(bytes(word[:12]))
+        )
+    return "0x" + word[12:].hex()
+
+
+WORD_DECODERS = {
+    "uint256": decode_uint256,
+    "bool": decode_bool,
+    "address": decode_address,
+}
+
+
+@lru_cache(maxsize=None)
+def decoder_for(signature):
+    """
+    Returns a function decoding the output of signature into a tuple
+    Outputs made only of uint256, bool and address words are read straight
+    from a memoryview, anything else goes through the ABI decoder
+    """
+    types = signature.output_types[1:-1].split(",") if signature.output_types else []
+    if not types or not all(type_ in WORD_DECODERS for type_ in types):
+        return signature.decode_data
+
+    decoders = [WORD_DECODERS[type_] for type_ in types]
+    size = WORD * len(decoders)
+
+    def check(output):
+        if len(output) < size:
+            raise InsufficientDataBytes(
+                "Tried to read {} bytes.  Only got {} bytes".format(size, len(output))
+            )
+
+    if len(decoders) == 1:
+        # Most views return a single word
+        decoder = decoders[0]
+
+        def decode(output):
+            check(output)
+            return (decoder(memoryview(output)[:WORD]),)
+
+        return decode
+
+    def decode(output):
+        check(output)
+        view = memoryview(output)
+        return tuple(
+            decoder(view[i * WORD : (i + 1) * WORD])
+            for i, decoder in enumerate(decoders)
+        )
+
+    return decode
+
+
+class Decoder:
+    """
+    Decode layout of a Multicall, built once: the output slot, decoder
+    and result keys of every call in order
+    Decoding is then a single pass over the returned outputs
+    """
+
+    def __init__(self, calls, slots):
+        self.layout = []
+        for call, slot in zip(calls, slots):
+            if call.returns:
+                returns = tuple(
+                    (name, None if handler in IDENTITY_HANDLERS else handler)
+                    for name, handler in call.returns
+                )
+            else:
+                returns = None
+            self.layout.append((call, slot, decoder_for(call.signature), returns))
+        # Result keys in the order they are decoded
+        self.keys = list(
+            dict.fromkeys(
+                name
+                for _, _, _, returns in self.layout
+                if returns
+                for name, _ in returns
+            )
+        )
+
+    def __call__(self, outputs, require_success=True):
+        result = {}
+        for call, slot, decode, returns in self.layout:
+            success, output = outputs[slot]
+            values = None
+            if success:
+                try:
+                    values = decode(output)
+                except Exception:
+                    # Success with undecodable output, e.g. a call to an EOA
+                    if require_success:
+                        raise
+
+            if values is None:
+                result.update(call.failure())
+            elif returns is None:
+                result.update(values if len(values) > 1 else values[0])
+            else:
+                for (name, handler), value in zip(returns, values):
+                    result[name] = handler(value) if handler else value
+        return result
@@ -1,18 +1,99 @@
 # Credit: https://github.com/banteg/multicall.py/blob/master/multicall/multicall.py
+from functools import partial
+from time import perf_counter
 from typing import List
 
-from brownie import web3
+from brownie import chain, web3
+from requests.exceptions import Timeout
 
 from helpers.multicall import Call
-from helpers.multicall.constants import MULTICALL_ADDRESSES
+from helpers.multicall.constants import (
+    MULTICALL_ADDRESSES,
+    MULTICALL3_ADDRESSES,
+    MAX_CALLS_PER_BATCH,
+    MAX_CALLDATA_BYTES,
+    AGGREGATE_TRANSPORT,
+    RPC_BATCH_TRANSPORT,
+)
+from helpers.multicall.decoder import Decoder
+from helpers.multicall.rpc_batch import eth_call_batch
+from helpers.multicall.stats import multicall_stats, new_metrics
 from rich.console import Console
 
 console = Console()
 
+# Raised by the node when an aggregate reverts, runs out of gas or is too big to answer
+BATCH_ERRORS = (ValueError, Timeout)
+
+AGGREGATE = "aggregate((address,bytes)[])(uint256,bytes[])"
+TRY_BLOCK_AND_AGGREGATE = (
+    "tryBlockAndAggregate(bool,(address,bytes)[])(uint256,bytes32,(bool,bytes)[])"
+)
+
+
+class CallReverted(Exception):
+    """
+    A call of a require_success rpc_batch reverted, on its own: smaller
+    batches would revert the same way, so it isn't bisected
+    """
+
 
 class Multicall:
-    def __init__(self, calls: List[Call]):
+    # Whether each (chainId, multicall address) has code, shared by every instance
+    deployed = {}
+
+    def __init__(
+        self,
+        calls: List[Call],
+        max_calls_per_batch=MAX_CALLS_PER_BATCH,
+        max_calldata_bytes=MAX_CALLDATA_BYTES,
+        require_success=True,
+        block_identifier=None,
+        transport=None,
+        cache=None,
+        label=None,
+        stats=None,
+        estimate_gas=False,
+    ):
+        """
+        With require_success=False batches go through tryAggregate, and calls that
+        revert come back as CallFailure values instead of raising
+
+        block_identifier pins every batch to a block, defaults to latest
+        The block the data was read at is set on self.block after each call
+
+        transport is AGGREGATE_TRANSPORT or RPC_BATCH_TRANSPORT, by default the
+        aggregator is used on chains where the multicall contract is deployed
+
+        cache is an optional ResultCache, used for reads pinned to a block number
+
+        Metrics of the last invocation are in self.metrics, and are recorded under
+        label into stats (default: the process-wide multicall_stats)
+        estimate_gas adds an eth_estimateGas per aggregate to measure its gas
+        """
         self.calls = calls
+        # Identical calls are only sent once, slots maps each call to its output
+        self.unique = []
+        self.slots = []
+        seen = {}
+        for call in calls:
+            if call.key not in seen:
+                seen[call.key] = len(self.unique)
+                self.unique.append(call)
+            self.slots.append(seen[call.key])
+        self.decoder = Decoder(calls, self.slots)
+        self.require_success = require_success
+        self.block_identifier = block_identifier
+        self.block = None
+        self.transport = transport
+        self.cache = cache
+        self.max_calls_per_batch = max_calls_per_batch
+        self.max_calldata_bytes = max_calldata_bytes
+        self.round_trips = 0
+        self.label = label or "default"
+        self.stats = multicall_stats if stats is None else stats
+        self.estimate_gas = estimate_gas
+        self.metrics = None
 
     def printCalls(self):
         for call in self.calls:
@@ -20,14 +101,231 @@ class Multicall:
                 {"target": call.target, "function": call.function, "args": call.args}
             )
 
-    def __call__(self):
-        aggregate = Call(
-            MULTICALL_ADDRESSES[web3.eth.chainId],
-            "aggregate((address,bytes)[])(uint256,bytes[])",
+    def chunks(self, calls, max_calls=None):
+        """
+        Greedily packs calls into the fewest batches within both limits
+        max_calls overrides max_calls_per_batch
+        """
+        max_calls = max_calls or self.max_calls_per_batch
+        batch = []
+        size = 0
+        for call in calls:
+            length = len(call.data)
+            if batch and (
+                len(batch) >= max_calls or size + length > self.max_calldata_bytes
+            ):
+                yield batch
+                batch = []
+                size = 0
+            batch.append(call)
+            size += length
+        if batch:
+            yield batch
+
+    def address(self, chain_id):
+        if self.require_success:
+            return MULTICALL_ADDRESSES[chain_id]
+        return MULTICALL3_ADDRESSES[chain_id]
+
+    def has_aggregator(self, chain_id):
+        """
+        Whether the multicall contract is deployed, a fresh dev chain (e.g.
+        Hardhat's) has a known address but no code there
+        """
+        try:
+            address = self.address(chain_id)
+        except KeyError:
+            return False
+        key = (chain_id, address)
+        if key not in self.deployed:
+            self.deployed[key] = len(web3.eth.get_code(address)) > 0
+        return self.deployed[key]
+
+    def aggregator(self, address, calls):
+        """
+        Returns the aggregator Call for a batch and the arguments to call it with
+        """
+        args = [[call.target, call.data] for call in calls]
+        if self.require_success:
+            return Call(address, AGGREGATE), [args]
+        return Call(address, TRY_BLOCK_AND_AGGREGATE), [False, args]
+
+    def unpack(self, decoded):
+        """
+        Returns the block number and a (success, output) pair per call
+        """
+        if self.require_success:
+            block, outputs = decoded
+            return block, [(True, output) for output in outputs]
+        block, _, outputs = decoded
+        return block, outputs
+
+    def aggregate(self, address, calls, block_identifier):
+        aggregate, args = self.aggregator(address, calls)
+        metrics = self.metrics
+        self.round_trips += 1
+        metrics["round_trips"] += 1
+
+        start = perf_counter()
+        tx = {"to": aggregate.target, "data": aggregate.signature.encode_data(args)}
+        metrics["encode_seconds"] += perf_counter() - start
+        metrics["calldata_bytes"] += len(tx["data"])
+
+        start = perf_counter()
+        output = web3.eth.call(tx, block_identifier or "latest")
+        metrics["rpc_seconds"] += perf_counter() - start
+        metrics["response_bytes"] += len(output)
+        if self.estimate_gas:
+            metrics["gas"] += web3.eth.estimate_gas(tx, block_identifier)
+
+        start = perf_counter()
+        decoded = self.unpack(aggregate.decode_output(output))
+        metrics["decode_seconds"] += perf_counter() - start
+        return decoded
+
+    def rpc_batch(self, calls, block_identifier):
+        metrics = self.metrics
+        self.round_trips += 1
+        metrics["round_trips"] += 1
+        metrics["calldata_bytes"] += sum(len(call.data) for call in calls)
+
+        start = perf_counter()
+        outputs = eth_call_batch(web3.provider, calls, block_identifier)
+        metrics["rpc_seconds"] += perf_counter() - start
+        metrics["response_bytes"] += sum(
+            len(output) for success, output in outputs if success
         )
-        args = [[[call.target, call.data] for call in self.calls]]
-        block, outputs = aggregate(args)
-        result = {}
-        for call, output in zip(self.calls, outputs):
-            result.update(call.decode_output(output))
+
+        if self.require_success:
+            for call, (success, output) in zip(calls, outputs):
+                if not success:
+                    raise CallReverted(
+                        "{} {} reverted: {}".format(call.target, call.function, output)
+                    )
+        return block_identifier, outputs
+
+    def sender(self, chain_id, block_identifier):
+        """
+        Returns the function that sends a batch, and the block to pin batches to
+        """
+        transport = self.transport
+        if transport is None:
+            transport = (
+                AGGREGATE_TRANSPORT
+                if self.has_aggregator(chain_id)
+                else RPC_BATCH_TRANSPORT
+            )
+
+        self.metrics["transport"] = transport
+        if transport == AGGREGATE_TRANSPORT:
+            return partial(self.aggregate, self.address(chain_id)), block_identifier
+        if transport == RPC_BATCH_TRANSPORT:
+            # eth_call doesn't report its block, pin it to know what was read
+            if block_identifier is None:
+                block_identifier = web3.eth.block_number
+            return self.rpc_batch, block_identifier
+        raise ValueError("Unknown multicall transport {}".format(transport))
+
+    def fetch(self, calls):
+        """
+        Returns the (success, output) pair of every call, in order
+        """
+        chain_id = chain.id
+        send, block_identifier = self.sender(chain_id, self.block_identifier)
+        if self.cache is None or not self.cache.cacheable(block_identifier):
+            return self.fetch_batches(send, calls, block_identifier)
+
+        self.block = block_identifier
+        block_hash = self.cache.block_hash(chain_id, block_identifier)
+        if block_hash is None:
+            block = web3.eth.get_block(block_identifier)
+            block_hash = self.cache.remember_hash(
+                chain_id, block_identifier, block["hash"]
+            )
+        outputs, misses = self.lookup(chain_id, block_hash, calls)
+        if not misses:
+            return outputs
+        fetched = self.fetch_batches(send, misses, block_identifier)
+        return self.fill(chain_id, block_hash, outputs, misses, fetched)
+
+    def lookup(self, chain_id, block_hash, calls):
+        """
+        Cached outputs of calls (None where missing), and the calls to fetch
+        """
+        outputs, missing = self.cache.lookup(chain_id, block_hash, calls)
+        self.metrics["unique_calls"] = len(missing)
+        return outputs, [calls[i] for i in missing]
+
+    def fill(self, chain_id, block_hash, outputs, misses, fetched):
+        """
+        Caches the fetched outputs of misses and fills them in, in order
+        """
+        self.cache.store(chain_id, block_hash, misses, fetched)
+        fetched = iter(fetched)
+        return [next(fetched) if output is None else output for output in outputs]
+
+    def fetch_batches(self, send, calls, block_identifier):
+        """
+        Sends calls in as few batches as possible
+        A batch that fails is bisected, and the smaller size is kept for the rest
+        of this invocation
+        """
+        outputs = []
+        pending = calls
+        max_calls = self.max_calls_per_batch
+        while pending:
+            batch = next(self.chunks(pending, max_calls))
+            if block_identifier is None and len(batch) < len(pending):
+                # Several batches have to read the same block to be consistent
+                block_identifier = web3.eth.block_number
+            try:
+                self.block, data = send(batch, block_identifier)
+                outputs.extend(data)
+            except BATCH_ERRORS:
+                if len(batch) > 1:
+                    max_calls = len(batch) // 2
+                    continue
+                if self.require_success:
+                    raise
+                outputs.append((False, b""))
+            pending = pending[len(batch) :]
+        return outputs
+
+    def start_metrics(self):
+        self.metrics = new_metrics(self.label, self.transport)
+        self.metrics["calls"] = len(self.calls)
+        self.metrics["unique_calls"] = len(self.unique)
+        return perf_counter()
+
+    def record_metrics(self, start):
+        self.metrics["seconds"] = perf_counter() - start
+        self.metrics["block"] = self.block
+        self.stats.record(self.metrics)
+
+    def __call__(self):
+        return self.read()
+
+    def read(self, decode=None):
+        """
+        Fetches the calls and decodes their outputs into {key: value}, or with
+        decode(outputs) when given, e.g. to split them between several layouts
+        The invocation's metrics are recorded, decode time included
+        """
+        start = self.start_metrics()
+        try:
+            return self.decode(self.fetch(self.unique), decode)
+        finally:
+            # Failed invocations are recorded too
+            self.record_metrics(start)
+
+    def decode(self, outputs, decode=None):
+        """
+        Decodes the outputs of self.unique, timed into the metrics
+        """
+        start = perf_counter()
+        if decode is None:
+            result = self.decoder(outputs, self.require_success)
+        else:
+            result = decode(outputs)
+        self.metrics["decode_seconds"] += perf_counter() - start
         return result
@@ -0,0 +1,59 @@
+from eth_utils import to_hex
+from requests import Session
+from web3 import HTTPProvider
+
+from helpers.multicall.constants import REQUEST_TIMEOUT
+
+_session = Session()
+
+
+def format_block(block_identifier):
+    if isinstance(block_identifier, int):
+        return hex(block_identifier)
+    if isinstance(block_identifier, bytes):
+        return to_hex(block_identifier)
+    return block_identifier
+
+
+def eth_call_batch(provider, calls, block_identifier, state_override=None):
+    """
+    Sends every call as an eth_call in a single JSON-RPC batch request, with
+    provider's headers, auth and timeout (REQUEST_TIMEOUT if it sets none)
+    Providers that aren't HTTP (IPC, websocket) get the calls one by one
+    state_override, if any, applies to every call
+    Raises requests' Timeout when the node takes longer than the timeout
+    Returns a (success, output) pair per call, output is the error message on failure
+    """
+    block = format_block(block_identifier)
+    params = [block] if state_override is None else [block, state_override]
+    payload = [
+        {
+            "jsonrpc": "2.0",
+            "id": i,
+            "method": "eth_call",
+            "params": [{"to": call.target, "data": to_hex(call.data)}, *params],
+        }
+        for i, call in enumerate(calls)
+    ]
+    if isinstance(provider, HTTPProvider):
+        kwargs = provider.get_request_kwargs()
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        response = _session.post(provider.endpoint_uri, json=payload, **kwargs)
+        response.raise_for_status()
+        replies = response.json()
+    else:
+        replies = [
+            dict(provider.make_request(request["method"], request["params"]), id=i)
+            for i, request in enumerate(payload)
+        ]
+    if not isinstance(replies, list):
+        # Nodes answer a rejected batch with a single error object
+        raise ValueError(replies.get("error", replies))
+
+    outputs = [(False, "missing reply")] * len(calls)
+    for reply in replies:
+        if "result" in reply:
+            outputs[reply["id"]] = (True, bytes.fromhex(reply["result"][2:]))
+        else:
+            outputs[reply["id"]] = (False, reply["error"].get("message"))
+    return outputs
@@ -1,6 +1,7 @@
 # Credit: https://github.com/banteg/multicall.py/blob/master/multicall/signature.py
 
-from eth_abi import encode_single, decode_single
+from eth_abi.decoding import ContextFramesBytesIO
+from eth_abi.registry import registry
 from eth_utils import function_signature_to_4byte_selector
 
 
@@ -26,20 +27,33 @@ def parse_signature(signature):
 
 
 class Signature:
-    def __init__(self, signature):
+    """
+    Interned per signature string: parsing, the selector and the ABI codecs
+    are built once per process and shared by every Call using it
+    """
+
+    _interned = {}
+
+    def __new__(cls, signature):
+        interned = cls._interned.get(signature)
+        if interned is not None:
+            return interned
+
+        self = super().__new__(cls)
         self.signature = signature
         self.parts = parse_signature(signature)
         self.input_types = self.parts[1]
         self.output_types = self.parts[2]
         self.function = "".join(self.parts[:2])
         self.fourbyte = function_signature_to_4byte_selector(self.function)
+        self.encoder = registry.get_encoder(self.input_types)
+        self.decoder = registry.get_decoder(self.output_types)
+
+        cls._interned[signature] = self
+        return self
 
     def encode_data(self, args=None):
-        return (
-            self.fourbyte + encode_single(self.input_types, args)
-            if args
-            else self.fourbyte
-        )
+        return self.fourbyte + self.encoder(args) if args else self.fourbyte
 
     def decode_data(self, output):
-        return decode_single(self.output_types, output)
+        return self.decoder(ContextFramesBytesIO(output))
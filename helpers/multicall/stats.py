@@ -0,0 +1,100 @@
+import json
+from collections import defaultdict, deque
+from threading import Lock
+
+# Summed per invocation, and per label across invocations
+METRICS = (
+    "calls",
+    "unique_calls",
+    "round_trips",
+    "calldata_bytes",
+    "response_bytes",
+    "encode_seconds",
+    "rpc_seconds",
+    "decode_seconds",
+    "seconds",
+    "gas",
+)
+
+METRIC_HELP = {
+    "calls": "Calls requested",
+    "unique_calls": "Calls sent after deduplication and cache hits",
+    "round_trips": "Requests sent to the node",
+    "calldata_bytes": "Calldata bytes sent",
+    "response_bytes": "Response bytes received",
+    "encode_seconds": "Time spent encoding aggregates",
+    "rpc_seconds": "Time spent waiting on the node",
+    "decode_seconds": "Time spent decoding outputs",
+    "seconds": "Wall time of Multicall invocations",
+    "gas": "Gas used by aggregates, when estimated",
+}
+
+
+def new_metrics(label, transport):
+    metrics = dict.fromkeys(METRICS, 0)
+    metrics.update(label=label, transport=transport, block=None)
+    return metrics
+
+
+class MulticallStats:
+    """
+    Collects the metrics of every Multicall invocation
+    Records can be streamed to sink (any file-like object) as JSON lines,
+    totals per label are available as Prometheus text
+    Safe to share between threads
+    """
+
+    def __init__(self, history=1_000, sink=None):
+        self.records = deque(maxlen=history)
+        self.invocations = defaultdict(int)
+        self.totals = defaultdict(lambda: dict.fromkeys(METRICS, 0))
+        self.sink = sink
+        self.lock = Lock()
+
+    def record(self, metrics):
+        with self.lock:
+            self.records.append(metrics)
+            label = metrics["label"]
+            self.invocations[label] += 1
+            totals = self.totals[label]
+            for name in METRICS:
+                totals[name] += metrics[name]
+            if self.sink is not None:
+                self.sink.write(json.dumps(metrics, default=str) + "\n")
+
+    def reset(self):
+        with self.lock:
+            self.records.clear()
+            self.invocations.clear()
+            self.totals.clear()
+
+    def json_lines(self):
+        with self.lock:
+            records = list(self.records)
+        return "".join(json.dumps(metrics, default=str) + "\n" for metrics in records)
+
+    def prometheus(self, prefix="multicall"):
+        lines = [
+            "# HELP {}_invocations_total Multicall invocations".format(prefix),
+            "# TYPE {}_invocations_total counter".format(prefix),
+        ]
+        with self.lock:
+            invocations = dict(self.invocations)
+            totals = {label: dict(values) for label, values in self.totals.items()}
+
+        for label, count in invocations.items():
+            lines.append(
+                '{}_invocations_total{{label="{}"}} {}'.format(prefix, label, count)
+            )
+
+        for name in METRICS:
+            metric = "{}_{}_total".format(prefix, name)
+            lines.append("# HELP {} {}".format(metric, METRIC_HELP[name]))
+            lines.append("# TYPE {} counter".format(metric))
+            for label, values in totals.items():
+                lines.append('{}{{label="{}"}} {}'.format(metric, label, values[name]))
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide default, used by every Multicall not given its own
+multicall_stats = MulticallStats()
@@ -0,0 +1,257 @@
+import numpy as np
+from dotmap import DotMap
+
+from helpers.shares_math import MAX_BPS, SECS_PER_YEAR
+
+"""
+  Batch versions of helpers.shares_math: same names and arguments, but every
+  argument can be an array (or a scalar broadcast against the arrays), and every
+  result is an array of the same length
+
+  Results are exact integers with Solidity's floor division, the same as
+  calling the scalar functions once per scenario:
+  - Arrays are kept as uint64 while every intermediate value provably fits
+  - Anything larger (wei amounts times ppfs, ...) falls back to object arrays
+    of Python ints, still vectorized but never rounded
+"""
+
+UINT64_MAX = 2 ** 64 - 1
+
+
+def to_array(values):
+    """
+    uint64 array when every value fits, object array of Python ints otherwise
+    Arrays already in one of those forms are used as they are
+    """
+    array = np.asarray(values)
+    if not isinstance(values, np.ndarray) and array.dtype.kind not in "uiO":
+        ## e.g. [10 ** 19, 10 ** 18] is float64, build it from the ints instead
+        array = np.array(values, dtype=object)
+    if array.dtype == np.uint64:
+        return array
+    if array.dtype == object:
+        for value in array.flat:
+            if not isinstance(value, (int, np.integer)):
+                raise TypeError("Expected integers, got {}".format(type(value)))
+        if array.size and not ((array >= 0).all() and (array <= UINT64_MAX).all()):
+            return array
+        return array.astype(np.uint64)
+    if array.dtype.kind == "u":
+        return array.astype(np.uint64)
+    if array.dtype.kind == "i":
+        if array.size and array.min() < 0:
+            return array.astype(object)
+        return array.astype(np.uint64)
+    raise TypeError("Expected integers, got {}".format(array.dtype))
+
+
+def as_objects(array):
+    return array if array.dtype == object else array.astype(object)
+
+
+def objects(result):
+    """
+    Arithmetic on 0-d object arrays returns a Python int, keep it an array
+    """
+    return np.asarray(result, dtype=object)
+
+
+def fits(bound):
+    return bound <= UINT64_MAX
+
+
+def high(array):
+    """
+    Largest value of array, as a Python int
+    """
+    return int(array.max()) if array.size else 0
+
+
+def add(a, b):
+    if a.dtype != object and b.dtype != object and fits(high(a) + high(b)):
+        return a + b
+    return objects(as_objects(a) + as_objects(b))
+
+
+def sub(a, b):
+    # uint64 would wrap around where Solidity reverts (and Python goes negative)
+    if a.dtype != object and b.dtype != object and bool(np.all(a >= b)):
+        return a - b
+    return objects(as_objects(a) - as_objects(b))
+
+
+def mul(a, b):
+    if a.dtype != object and b.dtype != object and fits(high(a) * high(b)):
+        return a * b
+    return objects(as_objects(a) * as_objects(b))
+
+
+def div(a, b):
+    if a.dtype != object and b.dtype != object:
+        if not np.all(b):
+            raise ZeroDivisionError("integer division by zero")
+        return a // b
+    return objects(as_objects(a) // as_objects(b))
+
+
+def pow10(decimals):
+    if decimals.dtype != object and high(decimals) <= 19:
+        return np.power(np.uint64(10), decimals.astype(np.uint64))
+    return np.array([10 ** int(d) for d in decimals.flat], dtype=object).reshape(
+        decimals.shape
+    )
+
+
+def from_want_to_shares(
+    want_deposited, total_supply_before_deposit, balance_before_deposit
+):
+    """
+    Used to estimate how many shares you'll get for a deposit
+    """
+    return div(
+        mul(to_array(want_deposited), to_array(total_supply_before_deposit)),
+        to_array(balance_before_deposit),
+    )
+
+
+def from_shares_to_want(shares_to_burn, ppfs_before_withdraw, vault_decimals):
+    """
+    Used to estimate how much want you'll get for a withdrawal, by burning the shares (including fees)
+    """
+    return div(
+        mul(to_array(shares_to_burn), to_array(ppfs_before_withdraw)),
+        pow10(to_array(vault_decimals)),
+    )
+
+
+def get_withdrawal_fees_in_want(
+    shares_to_burn, ppfs_before_withdraw, vault_decimals, withdrawal_fee_bps
+):
+    """
+    Used to calculate the fees (in want) the treasury will receive when taking withdrawal fees
+    """
+    value = from_shares_to_want(shares_to_burn, ppfs_before_withdraw, vault_decimals)
+    return div(mul(value, to_array(withdrawal_fee_bps)), to_array(MAX_BPS))
+
+
+def get_withdrawal_fees_in_shares(
+    shares_to_burn,
+    ppfs_before_withdraw,
+    vault_decimals,
+    withdrawal_fee_bps,
+    total_supply_before_withdraw,
+    vault_balance_before_withdraw,
+):
+    """
+    Used to calculate the shares that will be issued for treasury when taking withdrawal fee during a withdrwal
+    """
+    expected_fee_in_want = get_withdrawal_fees_in_want(
+        shares_to_burn, ppfs_before_withdraw, vault_decimals, withdrawal_fee_bps
+    )
+    return from_want_to_shares(
+        expected_fee_in_want,
+        total_supply_before_withdraw,
+        vault_balance_before_withdraw,
+    )
+
+
+def get_performance_fees_want(total_harvest_gain, performance_fee):
+    """
+    Given the harvested Want returns the fee in want
+    """
+    return div(
+        mul(to_array(total_harvest_gain), to_array(performance_fee)),
+        to_array(MAX_BPS),
+    )
+
+
+def get_management_fees_want(total_assets, time_passed, management_fee):
+    """
+    Given the total assets, the time expired and the management fee, returns the management fee in want
+    """
+    fee = mul(
+        mul(to_array(management_fee), to_array(total_assets)), to_array(time_passed)
+    )
+    return div(div(fee, to_array(SECS_PER_YEAR)), to_array(MAX_BPS))
+
+
+def get_performance_fees_shares(
+    total_harvest_gain,
+    performance_fee,
+    total_supply_before_deposit,
+    balance_before_deposit,
+):
+    """
+    Given the harvested Want, and the vault state before the harvest
+    Returns the amount of shares that will be issued for that performance fee
+    """
+    total_harvest_gain = to_array(total_harvest_gain)
+    fee_in_want = get_performance_fees_want(total_harvest_gain, performance_fee)
+
+    ## NOTE: Assumes the fees are 50/50, as shares_math does
+    balance_at_harvest = sub(
+        add(to_array(balance_before_deposit), total_harvest_gain),
+        mul(fee_in_want, to_array(2)),
+    )
+    return from_want_to_shares(
+        fee_in_want, total_supply_before_deposit, balance_at_harvest
+    )
+
+
+def get_report_fees(
+    total_harvest_gain,
+    performance_fee_treasury,
+    performance_fee_strategist,
+    management_fee,
+    time_since_last_harvest,
+    total_supply_before_deposit,
+    balance_before_deposit,
+):
+    """
+    Given arrays of harvest info and vault settings
+    Returns arrays of the amount of shares issued for:
+    Perf fee to treasury
+    Management fee to treasury
+    Perf fee to Strategist
+    """
+    total_harvest_gain = to_array(total_harvest_gain)
+    balance_before_deposit = to_array(balance_before_deposit)
+    new_total_supply = to_array(total_supply_before_deposit)
+    balance = add(balance_before_deposit, total_harvest_gain)
+
+    fee_in_want_treasury = get_performance_fees_want(
+        total_harvest_gain, performance_fee_treasury
+    )
+    management_fee_in_want = get_management_fees_want(
+        balance_before_deposit, time_since_last_harvest, management_fee
+    )
+    fee_in_want_strategist = get_performance_fees_want(
+        total_harvest_gain, performance_fee_strategist
+    )
+
+    ## Get the shares
+    pool = sub(
+        sub(sub(balance, fee_in_want_treasury), management_fee_in_want),
+        fee_in_want_strategist,
+    )
+    shares_perf_treasury = from_want_to_shares(
+        fee_in_want_treasury, new_total_supply, pool
+    )
+    new_total_supply = add(new_total_supply, shares_perf_treasury)
+    pool = add(pool, fee_in_want_treasury)
+
+    shares_management = from_want_to_shares(
+        management_fee_in_want, new_total_supply, pool
+    )
+    new_total_supply = add(new_total_supply, shares_management)
+    pool = add(pool, management_fee_in_want)
+
+    shares_perf_strategist = from_want_to_shares(
+        fee_in_want_strategist, new_total_supply, pool
+    )
+
+    return DotMap(
+        shares_perf_treasury=shares_perf_treasury,
+        shares_management=shares_management,
+        shares_perf_strategist=shares_perf_strategist,
+    )
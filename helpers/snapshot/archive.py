@@ -0,0 +1,159 @@
+import json
+import os
+
+import numpy as np
+
+from helpers.multicall import CallFailure
+from helpers.snapshot.snap import Snap, SnapSchema, MISSING
+
+"""
+  Columnar on-disk archive of a sequence of Snaps
+
+  <path>/schema.json  keys, blocks, entity keys and non-numeric values
+  <path>/values.npy   uint8 [snaps, keys, 32], every value as a big-endian uint256 word
+  <path>/kinds.npy    uint8 [snaps, keys], how to read each word back
+
+  The arrays are memory-mapped on load, so only the snaps and columns that are
+  read get paged in
+"""
+
+VERSION = 1
+WORD = 32
+
+KIND_UINT = 0
+KIND_INT = 1  ## Two's complement
+KIND_BOOL = 2
+KIND_MISSING = 3
+KIND_FAILURE = 4  ## CallFailure, details in schema.json
+KIND_OBJECT = 5  ## Anything else (strings, arrays), JSON in schema.json
+
+
+def encode_value(value):
+    """
+    Returns the kind, the 32-byte word and the JSON side value of a snap value
+    """
+    if value is MISSING:
+        return KIND_MISSING, 0, None
+    if isinstance(value, CallFailure):
+        return KIND_FAILURE, 0, [value.target, value.function, value.args]
+    if isinstance(value, bool):
+        return KIND_BOOL, int(value), None
+    if isinstance(value, int) and 0 <= value < 2 ** 256:
+        return KIND_UINT, value, None
+    if isinstance(value, int) and -(2 ** 255) <= value < 0:
+        return KIND_INT, value + 2 ** 256, None
+    return KIND_OBJECT, 0, value
+
+
+def decode_value(kind, word, side):
+    if kind == KIND_UINT:
+        return int.from_bytes(word, "big")
+    if kind == KIND_INT:
+        return int.from_bytes(word, "big", signed=True)
+    if kind == KIND_BOOL:
+        return bool(word[-1])
+    if kind == KIND_MISSING:
+        return MISSING
+    if kind == KIND_FAILURE:
+        failure = CallFailure.__new__(CallFailure)
+        failure.target, failure.function, args = side
+        failure.args = tuple(args) if args is not None else None
+        return failure
+    return side
+
+
+def export_snaps(snaps, path):
+    """
+    Writes snaps (in order) to the archive directory at path
+    Snaps with different schemas are stored under the union of their keys
+    """
+    snaps = list(snaps)
+    keys = list(dict.fromkeys(key for snap in snaps for key in snap.data))
+    columns = {key: i for i, key in enumerate(keys)}
+
+    values = np.zeros((len(snaps), len(keys), WORD), dtype=np.uint8)
+    kinds = np.full((len(snaps), len(keys)), KIND_MISSING, dtype=np.uint8)
+    side = {}
+    for row, snap in enumerate(snaps):
+        for key, value in snap.data.items():
+            column = columns[key]
+            kind, word, extra = encode_value(value)
+            kinds[row, column] = kind
+            if word:
+                values[row, column] = np.frombuffer(
+                    word.to_bytes(WORD, "big"), np.uint8
+                )
+            if extra is not None:
+                side["{}:{}".format(row, column)] = extra
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "values.npy"), values)
+    np.save(os.path.join(path, "kinds.npy"), kinds)
+    with open(os.path.join(path, "schema.json"), "w") as f:
+        json.dump(
+            {
+                "version": VERSION,
+                "keys": keys,
+                "blocks": [snap.block for snap in snaps],
+                "entityKeys": [snap.entityKeys for snap in snaps],
+                "side": side,
+            },
+            f,
+            default=str,
+        )
+
+
+class SnapArchive:
+    """
+    Read-only view of an exported snap sequence
+    archive[i] rebuilds the i-th Snap, column(key) reads one metric across all snaps
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, "schema.json")) as f:
+            meta = json.load(f)
+        if meta["version"] != VERSION:
+            raise ValueError(
+                "Unsupported snap archive version {}".format(meta["version"])
+            )
+
+        self.keys = meta["keys"]
+        self.columns = {key: i for i, key in enumerate(self.keys)}
+        self.blocks = meta["blocks"]
+        self.entityKeys = meta["entityKeys"]
+        self.side = meta["side"]
+        self.schema = SnapSchema.for_keys(self.keys)
+        self.values = np.load(os.path.join(path, "values.npy"), mmap_mode="r")
+        self.kinds = np.load(os.path.join(path, "kinds.npy"), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def value(self, row, column):
+        return decode_value(
+            self.kinds[row, column],
+            self.values[row, column].tobytes(),
+            self.side.get("{}:{}".format(row, column)),
+        )
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        data = {key: self.value(row, column) for column, key in enumerate(self.keys)}
+        return Snap(
+            self.schema.pack(data), self.blocks[row], self.entityKeys[row], self.schema
+        )
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    def at_block(self, block):
+        return self[self.blocks.index(block)]
+
+    def column(self, key):
+        """
+        Values of key in every snap, in order
+        """
+        column = self.columns[key]
+        return [self.value(row, column) for row in range(len(self))]
@@ -0,0 +1,96 @@
+from tabulate import tabulate
+
+
+def delta(a, b):
+    if type(a) is int and type(b) is int:
+        return b - a
+    return None
+
+
+class SnapshotDiff:
+    """
+    Values that changed between two snaps, computed in one pass
+    Rows are (key, before, after, delta), delta is None for non-integer values
+    Nothing is formatted until render() is called
+    """
+
+    def __init__(self, before, after, rows=None):
+        self.before = before
+        self.after = after
+        self.rows = self.compute(before, after) if rows is None else rows
+        self.index = {row[0]: row for row in self.rows}
+
+    @staticmethod
+    def compute(before, after):
+        rows = []
+        if before.schema is after.schema:
+            # Same layout, walk both value lists side by side
+            schema = before.schema
+            a_values = before.values
+            b_values = after.values
+            for key, position in zip(schema.keys, schema.positions):
+                a = a_values[position]
+                b = b_values[position]
+                if a != b:
+                    rows.append((key, a, b, delta(a, b)))
+            items = before.extra.items()
+        else:
+            items = before.data.items()
+
+        after_data = after.data
+        for key, a in items:
+            b = after_data[key] if key in after_data else None
+            if a != b:
+                rows.append((key, a, b, delta(a, b)))
+        return rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def keys(self):
+        return list(self.index)
+
+    def delta(self, key):
+        """
+        Numeric change of key, 0 if it did not change
+        """
+        row = self.index.get(key)
+        return 0 if row is None else row[3]
+
+    def filter(self, prefix):
+        """
+        Diff of the keys starting with prefix, e.g. "balances.want." or "sett."
+        """
+        return SnapshotDiff(
+            self.before,
+            self.after,
+            [row for row in self.rows if row[0].startswith(prefix)],
+        )
+
+    def render(self, formatter=None):
+        """
+        Table of the changes, formatter(key, value) formats every cell
+        """
+        if formatter is None:
+            formatter = lambda key, value: value
+        table = [
+            [
+                key,
+                formatter(key, a),
+                formatter(key, b),
+                formatter(key, "-" if change is None else change),
+            ]
+            for key, a, b, change in self.rows
+        ]
+        return tabulate(
+            table, headers=["metric", "before", "after", "diff"], tablefmt="grid"
+        )
+
+    def __str__(self):
+        return self.render()
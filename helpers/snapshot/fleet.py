@@ -0,0 +1,48 @@
+from helpers.multicall import Multicall
+from helpers.multicall.decoder import Decoder
+from helpers.snapshot.snap import Snap
+
+
+class FleetPlan:
+    """
+    The snapshot plans of several vaults read as one:
+    calls shared between vaults (governance, treasury, badgerTree balances of the
+    same tokens...) are sent once, and everything goes out in the fewest chunks
+    Each vault's Snap is decoded from the shared outputs with its own schema
+    """
+
+    def __init__(self, plans, **multicall_kwargs):
+        self.plans = dict(plans)
+        calls = [call for plan in self.plans.values() for call in plan.calls]
+        self.multicall = Multicall(calls, require_success=False, **multicall_kwargs)
+
+        slots = {call.key: slot for slot, call in enumerate(self.multicall.unique)}
+        self.decoders = {
+            key: Decoder(plan.calls, [slots[call.key] for call in plan.calls])
+            for key, plan in self.plans.items()
+        }
+
+    def matches(self, plans):
+        return list(plans) == list(self.plans) and all(
+            plans[key] is plan for key, plan in self.plans.items()
+        )
+
+    def __call__(self, block_identifier=None):
+        """
+        {vaultKey: Snap}, all read at the same block
+        """
+        multi = self.multicall
+        multi.block_identifier = block_identifier
+
+        def decode(outputs):
+            return {
+                key: Snap(
+                    self.decoders[key](outputs, require_success=False),
+                    multi.block,
+                    list(plan.entities),
+                    plan.schema,
+                )
+                for key, plan in self.plans.items()
+            }
+
+        return multi.read(decode)
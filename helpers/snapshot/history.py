@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from helpers.snapshot.snap import Snap
+
+KEYFRAME_INTERVAL = 32
+
+
+class Segment:
+    """
+    A keyframe and the deltas of the snaps taken after it, in order
+    Each delta is a flat (position, value, position, value, ...) tuple of what
+    changed since the snap before
+    """
+
+    __slots__ = ("schema", "entityKeys", "keyframe", "deltas")
+
+    def __init__(self, snap, entityKeys):
+        self.schema = snap.schema
+        self.entityKeys = entityKeys
+        self.keyframe = tuple(snap.values)
+        self.deltas = []
+
+    def values(self, index):
+        """
+        Values of the index-th snap of the segment (0 is the keyframe)
+        """
+        values = list(self.keyframe)
+        for delta in self.deltas[:index]:
+            for i in range(0, len(delta), 2):
+                values[delta[i]] = delta[i + 1]
+        return values
+
+
+class SnapHistory(MutableMapping):
+    """
+    Snaps by block, the drop-in for a {block: Snap} dict that stays small
+
+    Every keyframe_interval-th snap is kept in full (a keyframe), the ones in
+    between only keep the values that changed since the snap before them, so
+    reading a block replays at most keyframe_interval small deltas
+
+    Retention: max_snaps keeps the newest snaps, max_age drops snaps more than
+    max_age blocks older than the newest one (None: unbounded). Newest is by
+    block number, snaps may be added in any order
+    """
+
+    def __init__(
+        self, max_snaps=None, max_age=None, keyframe_interval=KEYFRAME_INTERVAL
+    ):
+        self.max_snaps = max_snaps
+        self.max_age = max_age
+        self.keyframe_interval = keyframe_interval
+        # block -> (segment, index in segment, extra), in block order
+        self.entries = OrderedDict()
+        self.segment = None
+        self.last = None
+        self.entity_keys = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __contains__(self, block):
+        return block in self.entries
+
+    def __setitem__(self, block, snap):
+        entityKeys = tuple(snap.entityKeys)
+        entityKeys = self.entity_keys.setdefault(entityKeys, entityKeys)
+
+        segment = self.segment
+        if (
+            segment is None
+            or segment.schema is not snap.schema
+            or segment.entityKeys is not entityKeys
+            or len(segment.deltas) + 1 >= self.keyframe_interval
+        ):
+            segment = self.segment = Segment(snap, entityKeys)
+        else:
+            delta = []
+            for position, (value, last) in enumerate(zip(snap.values, self.last)):
+                if value is not last and value != last:
+                    delta += (position, value)
+            segment.deltas.append(tuple(delta))
+        self.last = tuple(snap.values)
+
+        entries = self.entries
+        entries.pop(block, None)
+        newest = next(reversed(entries), block)
+        entries[block] = (
+            segment,
+            len(segment.deltas),
+            dict(snap.extra) if snap.extra else None,
+        )
+        if block < newest:
+            # e.g. a backfill, keep the entries sorted so the ends are the
+            # oldest and newest blocks
+            self.entries = OrderedDict(sorted(entries.items()))
+        self.evict()
+
+    def evict(self):
+        entries = self.entries
+        if self.max_snaps is not None:
+            while len(entries) > self.max_snaps:
+                entries.popitem(last=False)
+        if self.max_age is not None and entries:
+            oldest = next(reversed(entries)) - self.max_age
+            while next(iter(entries)) < oldest:
+                entries.popitem(last=False)
+
+    def __getitem__(self, block):
+        segment, index, extra = self.entries[block]
+        snap = Snap(
+            segment.values(index), block, list(segment.entityKeys), segment.schema
+        )
+        if extra:
+            snap.extra.update(extra)
+        return snap
+
+    def __delitem__(self, block):
+        del self.entries[block]
+
+    def latest(self):
+        return self[next(reversed(self.entries))]
@@ -0,0 +1,51 @@
+from eth_utils import keccak
+
+TRANSFER_TOPIC = keccak(text="Transfer(address,address,uint256)")
+
+
+def topic_address(topic):
+    return "0x" + bytes(topic)[-20:].hex()
+
+
+class Touched:
+    """
+    What a transaction could have changed, read from its receipt logs:
+    contracts that emitted events (e.g. Harvested, TreeDistribution, fee setters)
+    and (token, account) pairs of ERC20 Transfers
+    Addresses are lowercased
+    """
+
+    def __init__(self, tx):
+        self.emitters = set()
+        self.transfers = set()
+        self.accounts = set()
+        for log in tx.logs:
+            emitter = log["address"].lower()
+            self.emitters.add(emitter)
+            topics = log["topics"]
+            if topics and bytes(topics[0]) == TRANSFER_TOPIC and len(topics) == 3:
+                for topic in topics[1:]:
+                    account = topic_address(topic)
+                    self.transfers.add((emitter, account))
+                    self.accounts.add(account)
+
+    def is_dirty(self, call, grid):
+        """
+        Could the output of call have changed?
+        grid calls are per (token, account) balances/shares, the account is their argument
+        """
+        target = call.target.lower()
+        if grid:
+            return (target, call.args[0].lower()) in self.transfers
+        return target in self.emitters or target in self.accounts
+
+
+def compare_snaps(expected, actual):
+    """
+    Returns the keys whose values differ between two snaps of the same schema
+    """
+    return [
+        key
+        for key, position in zip(expected.schema.keys, expected.schema.positions)
+        if expected.values[position] != actual.values[position]
+    ]
@@ -0,0 +1,113 @@
+from brownie import web3
+from eth_utils import add_0x_prefix
+
+from helpers.multicall import Signature
+from helpers.multicall.call import checksum
+from helpers.snapshot.snap import Snap
+
+"""
+  Python side of contracts/lens/StrategyLens.sol
+
+  One eth_call returns the sett and strategy state of any number of strategies.
+  The lens is either deployed (on a fork) or, without an address, its runtime
+  code is injected at LENS_ADDRESS with a state override, no deployment needed
+"""
+
+# Where the lens code is placed when called deployless
+LENS_ADDRESS = "0x1e45000000000000000000000000000000001e45"
+
+# Snap keys of the State struct fields after (strategy, sett, want), in order
+# The sett and strategy ones are the same as StrategyCoreResolver's
+STATE_KEYS = (
+    "sett.balance",
+    "sett.available",
+    "sett.getPricePerFullShare",
+    "sett.decimals",
+    "sett.totalSupply",
+    "sett.withdrawalFee",
+    "sett.managementFee",
+    "sett.lastHarvestedAt",
+    "sett.performanceFeeGovernance",
+    "sett.performanceFeeStrategist",
+    "strategy.balanceOfPool",
+    "strategy.balanceOfWant",
+    "strategy.balanceOf",
+    "strategy.rewards.bal",
+    "strategy.rewards.aura",
+    "strategy.balEthBptToAuraBalMinOutBps",
+)
+
+GET_STATES = Signature(
+    "getStates(address[])(uint256,(address,address,address,{})[])".format(
+        ",".join(["uint256"] * len(STATE_KEYS))
+    )
+)
+
+
+def lens_code():
+    """
+    Runtime bytecode of the compiled StrategyLens
+    """
+    # Contract containers only exist once the brownie project is loaded
+    from brownie import StrategyLens
+
+    return add_0x_prefix(StrategyLens._build["deployedBytecode"])
+
+
+def decode_states(output):
+    """
+    {strategy: Snap} from the output of getStates
+    """
+    block, states = GET_STATES.decode_data(output)
+    snaps = {}
+    for strategy, sett, want, *values in states:
+        data = {"strategy.vault": checksum(sett), "strategy.want": checksum(want)}
+        data.update(zip(STATE_KEYS, values))
+        snaps[checksum(strategy)] = Snap(data, block, [])
+    return snaps
+
+
+class StrategyLensReader:
+    """
+    Snaps of the sett + strategy state of many strategies, in one call:
+        snaps = StrategyLensReader(strategies)()
+    """
+
+    def __init__(self, strategies, lens=None, code=None):
+        """
+        lens is the address of a deployed StrategyLens, without it the lens is
+        called deployless with code (default: the compiled StrategyLens)
+        """
+        self.strategies = [
+            checksum(getattr(strategy, "address", strategy)) for strategy in strategies
+        ]
+        self.lens = lens
+        self.code = code
+        self.tx = None
+
+    def transaction(self):
+        if self.tx is None:
+            self.tx = {
+                "to": self.lens or LENS_ADDRESS,
+                "data": GET_STATES.encode_data([self.strategies]),
+            }
+        return self.tx
+
+    def state_override(self):
+        if self.lens is not None:
+            return None
+        if self.code is None:
+            self.code = lens_code()
+        return {LENS_ADDRESS: {"code": self.code}}
+
+    def estimate_gas(self, block_identifier=None):
+        """
+        Needs a deployed lens, eth_estimateGas takes no state override
+        """
+        return web3.eth.estimate_gas(self.transaction(), block_identifier)
+
+    def __call__(self, block_identifier=None):
+        output = web3.eth.call(
+            self.transaction(), block_identifier or "latest", self.state_override()
+        )
+        return decode_states(output)
@@ -0,0 +1,85 @@
+import copy
+
+from helpers.multicall import Multicall
+from helpers.snapshot.snap import Snap, SnapSchema, GRID_KINDS
+
+
+def is_grid(call):
+    """
+    Per (token, account) balances/shares call, the account is its only argument
+    """
+    return (
+        call.returns is not None
+        and len(call.returns) == 1
+        and call.returns[0][0].split(".")[0] in GRID_KINDS
+        and call.args is not None
+        and len(call.args) == 1
+    )
+
+
+class SnapshotPlan:
+    """
+    Everything a snapshot of one entity set needs, built once:
+    the calls, the Multicall with its dedupe and decode layout, and the Snap schema
+    Rebuild it only when the entities change
+    """
+
+    def __init__(self, calls, entities, **multicall_kwargs):
+        self.entities = dict(entities)
+        self.key = tuple(self.entities.items())
+        self.calls = calls
+        self.grid = [is_grid(call) for call in calls]
+        self.multicall_kwargs = multicall_kwargs
+        self.multicall = Multicall(calls, require_success=False, **multicall_kwargs)
+        self.schema = SnapSchema.for_keys(self.multicall.decoder.keys)
+        # {tokenKey: address} of the tokens balances are read for
+        self.tokens = {}
+        for call, grid in zip(calls, self.grid):
+            if grid:
+                kind, tokenKey, _ = call.returns[0][0].split(".")
+                if kind == "balances":
+                    self.tokens.setdefault(tokenKey, call.target)
+
+    def matches(self, entities):
+        return tuple(entities.items()) == self.key
+
+    def __call__(self, block_identifier=None):
+        multi = self.multicall
+        multi.block_identifier = block_identifier
+        data = multi()
+        return Snap(data, multi.block, list(self.entities), schema=self.schema)
+
+    def at_block(self, block_identifier):
+        """
+        Same as calling the plan, on a copy of its Multicall so several blocks
+        can be read from different threads at once
+        The copies share the plan's ResultCache and MulticallStats, both lock
+        """
+        multi = copy.copy(self.multicall)
+        multi.block_identifier = block_identifier
+        data = multi()
+        return Snap(data, multi.block, list(self.entities), schema=self.schema)
+
+    def update(self, before, touched, block_identifier=None):
+        """
+        Snap after a transaction that only re-reads the calls touched says could
+        have changed, every other value is copied from before
+        """
+        dirty = [
+            call
+            for call, grid in zip(self.calls, self.grid)
+            if touched.is_dirty(call, grid)
+        ]
+        values = list(before.values)
+        block = block_identifier
+        if dirty:
+            multi = Multicall(
+                dirty,
+                require_success=False,
+                block_identifier=block_identifier,
+                **self.multicall_kwargs,
+            )
+            for key, value in multi().items():
+                values[self.schema.index[key]] = value
+            block = multi.block
+        return Snap(values, block, list(self.entities), schema=self.schema)
@@ -1,21 +1,167 @@
+from collections.abc import MutableMapping
+
+# Per (token, account) metrics, keyed as "<kind>.<tokenKey>.<accountKey>"
+GRID_KINDS = ("balances", "shares")
+
+
+class Missing:
+    """
+    Fills grid cells no call was made for, e.g. shares of a non-DIGG token
+    """
+
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = Missing()
+
+
+class SnapSchema:
+    """
+    Interned layout shared by every Snap with the same keys
+    Values live in one list: a tokens x accounts grid per kind, then the
+    other metrics, so lookups are index arithmetic instead of string building
+    """
+
+    _interned = {}
+
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        self.tokens = {}
+        self.accounts = {}
+        metrics = []
+        cells = []
+        for key in self.keys:
+            parts = key.split(".")
+            if len(parts) == 3 and parts[0] in GRID_KINDS:
+                kind, token, account = parts
+                self.tokens.setdefault(token, len(self.tokens))
+                self.accounts.setdefault(account, len(self.accounts))
+                cells.append((key, GRID_KINDS.index(kind), token, account))
+            else:
+                metrics.append(key)
+
+        self.grid_size = len(self.tokens) * len(self.accounts)
+        self.index = {}
+        for key, kind, token, account in cells:
+            self.index[key] = self.cell(
+                kind, self.tokens[token], self.accounts[account]
+            )
+        offset = len(GRID_KINDS) * self.grid_size
+        for i, key in enumerate(metrics):
+            self.index[key] = offset + i
+        self.size = offset + len(metrics)
+        # Position in values of each key, in key order
+        self.positions = tuple(self.index[key] for key in self.keys)
+
+    @classmethod
+    def for_keys(cls, keys):
+        keys = tuple(keys)
+        schema = cls._interned.get(keys)
+        if schema is None:
+            schema = cls._interned[keys] = cls(keys)
+        return schema
+
+    def cell(self, kind, token_idx, account_idx):
+        return kind * self.grid_size + token_idx * len(self.accounts) + account_idx
+
+    def grid_index(self, kind, tokenKey, accountKey):
+        try:
+            return self.cell(kind, self.tokens[tokenKey], self.accounts[accountKey])
+        except KeyError:
+            raise KeyError("{}.{}.{}".format(GRID_KINDS[kind], tokenKey, accountKey))
+
+    def pack(self, data):
+        """
+        Lays out a {key: value} dict with these keys into a values list
+        """
+        values = [MISSING] * self.size
+        for key, position in zip(self.keys, self.positions):
+            values[position] = data[key]
+        return values
+
+
+class SnapData(MutableMapping):
+    """
+    Dict view of a Snap's values, keys set outside the schema are kept aside
+    """
+
+    def __init__(self, snap):
+        self.snap = snap
+
+    def __getitem__(self, key):
+        position = self.snap.schema.index.get(key)
+        if position is None:
+            return self.snap.extra[key]
+        return self.snap.values[position]
+
+    def __setitem__(self, key, value):
+        position = self.snap.schema.index.get(key)
+        if position is None:
+            self.snap.extra[key] = value
+        else:
+            self.snap.values[position] = value
+
+    def __delitem__(self, key):
+        del self.snap.extra[key]
+
+    def __contains__(self, key):
+        return key in self.snap.schema.index or key in self.snap.extra
+
+    def __iter__(self):
+        yield from self.snap.schema.keys
+        yield from self.snap.extra
+
+    def __len__(self):
+        return len(self.snap.schema.keys) + len(self.snap.extra)
+
+    def items(self):
+        values = self.snap.values
+        for key, position in zip(self.snap.schema.keys, self.snap.schema.positions):
+            yield key, values[position]
+        yield from self.snap.extra.items()
+
+
 class Snap:
-    def __init__(self, data, block, entityKeys):
-        self.data = data
+    __slots__ = ("schema", "values", "extra", "block", "entityKeys")
+
+    def __init__(self, data, block, entityKeys, schema=None):
+        """
+        data is a {key: value} dict, or a values list already laid out by schema
+        """
+        if schema is None:
+            schema = SnapSchema.for_keys(data.keys())
+        self.schema = schema
+        self.values = data if isinstance(data, list) else schema.pack(data)
+        self.extra = {}
         self.block = block
         self.entityKeys = entityKeys
 
+    @property
+    def data(self):
+        return SnapData(self)
+
     # ===== Getters =====
 
+    def cell(self, kind, tokenKey, accountKey):
+        value = self.values[self.schema.grid_index(kind, tokenKey, accountKey)]
+        if value is MISSING:
+            raise KeyError("{}.{}.{}".format(GRID_KINDS[kind], tokenKey, accountKey))
+        return value
+
     def balances(self, tokenKey, accountKey):
-        return self.data["balances." + tokenKey + "." + accountKey]
+        return self.cell(0, tokenKey, accountKey)
 
     def shares(self, tokenKey, accountKey):
-        return self.data["shares." + tokenKey + "." + accountKey]
+        return self.cell(1, tokenKey, accountKey)
 
     def get(self, key):
-        if key not in self.data.keys():
+        position = self.schema.index.get(key)
+        if position is not None:
+            return self.values[position]
+        if key not in self.extra:
             raise Exception("Key {} not found in snap data".format(key))
-        return self.data[key]
+        return self.extra[key]
 
     # ===== Setters =====
 
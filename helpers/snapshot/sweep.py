@@ -0,0 +1,174 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from requests.exceptions import RequestException
+
+from helpers.multicall.constants import MAX_CONCURRENCY
+from helpers.snapshot.snap import Snap, SnapSchema
+from helpers.snapshot.archive import KIND_UINT, WORD, encode_value, decode_value
+from helpers.snapshot.archive import export_snaps
+
+"""
+  Historical block-range sweeps
+
+  Every block is read with its own block-pinned multicall from the snapshot plan,
+  a bounded pool of workers keeps several blocks in flight.
+  Rows are streamed into a SnapSeries as they complete; given a path they are also
+  appended to a JSON lines file, and a sweep pointed at the same file skips the
+  blocks already in it
+"""
+
+# Node errors, rate limits and dropped connections, worth another attempt
+RETRY_ERRORS = (ValueError, RequestException)
+
+RETRIES = 3
+BACKOFF_SECONDS = 1
+
+
+def dump_value(value):
+    kind, word, side = encode_value(value)
+    if kind == KIND_UINT:
+        return word
+    return [kind, word, side]
+
+
+def load_value(value):
+    if isinstance(value, int):
+        return value
+    kind, word, side = value
+    return decode_value(kind, word.to_bytes(WORD, "big"), side)
+
+
+class SnapSeries:
+    """
+    Time-series of snaps of the same schema, one row per block
+    With a path, rows are persisted as they are added and reloaded on open
+    """
+
+    def __init__(self, keys, entityKeys, path=None):
+        self.schema = SnapSchema.for_keys(keys)
+        self.entityKeys = list(entityKeys)
+        self.rows = {}
+        self.path = path
+        self.file = None
+        if path is not None:
+            self.open(path)
+
+    def open(self, path):
+        header = {"keys": list(self.schema.keys), "entityKeys": self.entityKeys}
+        # An empty file, e.g. created ahead of the sweep, is a new one
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path) as f:
+                lines = f.read().split("\n")
+            if json.loads(lines[0]) != header:
+                raise ValueError(
+                    "Sweep file {} was written for other keys or entities".format(path)
+                )
+            for line in lines[1:]:
+                try:
+                    block, values = json.loads(line)
+                except ValueError:
+                    # Empty, or cut short by an interruption
+                    continue
+                self.rows[block] = [load_value(value) for value in values]
+            self.file = open(path, "a")
+            if lines[-1]:
+                self.file.write("\n")
+        else:
+            self.file = open(path, "w")
+            self.file.write(json.dumps(header) + "\n")
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __contains__(self, block):
+        return block in self.rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def blocks(self):
+        return sorted(self.rows)
+
+    def append(self, snap):
+        """
+        Adds the snap's values (in key order) as the row of its block
+        """
+        values = [snap.values[position] for position in self.schema.positions]
+        self.rows[snap.block] = values
+        if self.file is not None:
+            self.file.write(
+                json.dumps([snap.block, [dump_value(value) for value in values]]) + "\n"
+            )
+            self.file.flush()
+
+    def at_block(self, block):
+        return Snap(
+            self.schema.pack(dict(zip(self.schema.keys, self.rows[block]))),
+            block,
+            self.entityKeys,
+            self.schema,
+        )
+
+    def __iter__(self):
+        for block in self.blocks:
+            yield self.at_block(block)
+
+    def column(self, key):
+        """
+        (block, value) of key at every block, in block order
+        """
+        column = self.schema.keys.index(key)
+        return [(block, self.rows[block][column]) for block in self.blocks]
+
+    def export(self, path):
+        """
+        Writes the series as a columnar snap archive, see helpers.snapshot.archive
+        """
+        export_snaps(self, path)
+
+
+def read_block(plan, block, retries=RETRIES, backoff=BACKOFF_SECONDS):
+    """
+    Snap of the plan at block, retried with exponential backoff
+    """
+    for attempt in range(retries + 1):
+        try:
+            return plan.at_block(block)
+        except RETRY_ERRORS:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def sweep(
+    plan,
+    blocks,
+    series,
+    max_workers=MAX_CONCURRENCY,
+    retries=RETRIES,
+    backoff=BACKOFF_SECONDS,
+):
+    """
+    Reads the plan at every block not in series yet, at most max_workers at a time
+    Rows land in series as they complete, so an interrupted sweep keeps its progress
+    """
+    pending = [block for block in blocks if block not in series]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(read_block, plan, block, retries, backoff) for block in pending
+        ]
+        try:
+            for future in as_completed(futures):
+                series.append(future.result())
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return series
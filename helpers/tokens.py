@@ -0,0 +1,96 @@
+from collections import namedtuple
+
+from brownie import chain
+
+from helpers.multicall import Call, CallFailure, Multicall, as_wei, func
+from helpers.multicall.call import checksum
+from helpers.multicall.functions import as_original
+
+# Decimals of tokens that don't implement decimals()
+DEFAULT_DECIMALS = 18
+
+TokenMetadata = namedtuple("TokenMetadata", ["address", "decimals", "symbol", "name"])
+
+
+def token_address(token):
+    """
+    Checksummed address of an address string or a brownie Contract
+    """
+    return checksum(getattr(token, "address", token))
+
+
+class TokenRegistry:
+    """
+    decimals, symbol and name of ERC20s, fetched once per chain and token
+    load() reads any number of tokens in one multicall
+    """
+
+    def __init__(self):
+        self.tokens = {}
+
+    def __contains__(self, address):
+        return (chain.id, token_address(address)) in self.tokens
+
+    def load(self, addresses):
+        """
+        Fetches the metadata of every address not known yet
+        """
+        chain_id = chain.id
+        missing = list(
+            dict.fromkeys(
+                token_address(address)
+                for address in addresses
+                if (chain_id, token_address(address)) not in self.tokens
+            )
+        )
+        if not missing:
+            return
+
+        calls = []
+        for address in missing:
+            calls.append(
+                Call(address, [func.erc20.decimals], [[address + ".decimals", as_wei]])
+            )
+            calls.append(
+                Call(
+                    address,
+                    [func.erc20.symbol],
+                    [[address + ".symbol", as_original]],
+                )
+            )
+            calls.append(
+                Call(address, [func.erc20.name], [[address + ".name", as_original]])
+            )
+        data = Multicall(calls, require_success=False, label="tokens")()
+
+        for address in missing:
+            decimals, symbol, name = (
+                data[address + ".decimals"],
+                data[address + ".symbol"],
+                data[address + ".name"],
+            )
+            self.tokens[(chain_id, address)] = TokenMetadata(
+                address,
+                DEFAULT_DECIMALS if isinstance(decimals, CallFailure) else decimals,
+                # e.g. bytes32 symbols, they fail to decode as strings
+                address if isinstance(symbol, CallFailure) else symbol,
+                address if isinstance(name, CallFailure) else name,
+            )
+
+    def get(self, address):
+        key = (chain.id, token_address(address))
+        if key not in self.tokens:
+            self.load([address])
+        return self.tokens[key]
+
+    def decimals(self, address):
+        return self.get(address).decimals
+
+    def symbol(self, address):
+        return self.get(address).symbol
+
+    def clear(self):
+        self.tokens.clear()
+
+
+token_registry = TokenRegistry()
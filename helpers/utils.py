@@ -1,3 +1,6 @@
+from helpers.tokens import token_registry
+
+
 # Assert approximate integer
 def approx(actual, expected, percentage_threshold):
     print(actual, expected, percentage_threshold)
@@ -13,6 +16,6 @@ def val(amount=0, decimals=18, token=None):
     # return "{:,.0f}".format(amount)
     # If no token specified, use decimals
     if token:
-        decimals = interface.IERC20Detailed(token).decimals()
+        decimals = token_registry.decimals(token)
 
     return "{:,.18f}".format(amount / 10 ** decimals)
@@ -0,0 +1,433 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from brownie import web3
+from eth_abi import encode_single
+from eth_utils import add_0x_prefix, keccak, to_hex
+from tabulate import tabulate
+
+from helpers import shares_math_batch
+from helpers.multicall import Signature
+from helpers.multicall.constants import MAX_CONCURRENCY
+from helpers.multicall.rpc_batch import eth_call_batch
+from helpers.shares_math import MAX_BPS
+
+"""
+  Differential fuzzing of helpers.shares_math against TheVault
+
+  Every scenario is a fee setup, a deposit, a harvest and a withdrawal, run by
+  contracts/fuzz/VaultMathProbe.sol inside an eth_call on the dev chain:
+  the probe's code is injected at the vault's strategy address and the vault's
+  governance is overridden to it, so no transaction is ever sent and every
+  scenario starts from the same state. Scenarios go out as JSON-RPC batches of
+  eth_calls, the expected values are computed with shares_math_batch
+"""
+
+SCENARIO_FIELDS = (
+    "initialDeposit",
+    "deposit",
+    "harvestGain",
+    "withdrawBps",
+    "performanceFeeGovernance",
+    "performanceFeeStrategist",
+    "withdrawalFee",
+    "managementFee",
+)
+OBSERVATION_FIELDS = (
+    "failedStep",
+    "depositSupplyBefore",
+    "depositBalanceBefore",
+    "depositShares",
+    "harvestSupplyBefore",
+    "harvestBalanceBefore",
+    "harvestDuration",
+    "treasuryShares",
+    "strategistShares",
+    "withdrawShares",
+    "withdrawSupplyBefore",
+    "withdrawBalanceBefore",
+    "withdrawPricePerFullShare",
+    "decimals",
+    "wantReceived",
+    "withdrawFeeShares",
+)
+STEPS = ("setup", "initial deposit", "deposit", "harvest", "withdraw")
+
+RUN = Signature(
+    "run(address,address,({}))({})".format(
+        ",".join(["uint256"] * len(SCENARIO_FIELDS)),
+        ",".join(["uint256"] * len(OBSERVATION_FIELDS)),
+    )
+)
+
+GOVERNANCE = Signature("governance()(address)")
+BALANCE_OF = Signature("balanceOf(address)(uint256)")
+
+BATCH_SIZE = 500
+## Amounts are mantissa * 10**exponent, from dust to far beyond any real vault
+MAX_AMOUNT_EXPONENT = 27
+## Want balance given to the probe, enough for any scenario
+PROBE_WANT = 2 ** 200
+## Storage slots searched for the vault's governance and the want's balances
+MAX_SLOT = 256
+
+ProbeCall = namedtuple("ProbeCall", ["target", "data"])
+
+
+def probe_code():
+    """
+    Runtime bytecode of the compiled VaultMathProbe
+    """
+    # Contract containers only exist once the brownie project is loaded
+    from brownie import VaultMathProbe
+
+    return add_0x_prefix(VaultMathProbe._build["deployedBytecode"])
+
+
+def word(value):
+    return to_hex(encode_single("uint256", value))
+
+
+def mapping_slots(key, slot):
+    """
+    Storage slot of mapping[key] for a mapping at slot, as laid out by Solidity and by Vyper
+    """
+    key, slot = encode_single("address", key), encode_single("uint256", slot)
+    return [to_hex(keccak(key + slot)), to_hex(keccak(slot + key))]
+
+
+def find_slot(target, data, candidates, value):
+    """
+    First of the candidate storage slots of target that, overridden with value,
+    makes the eth_call of data on target return value
+    """
+    expected = encode_single("uint256", value)
+    for slot in candidates:
+        override = {target: {"stateDiff": {slot: word(value)}}}
+        output = web3.eth.call({"to": target, "data": to_hex(data)}, "latest", override)
+        if bytes(output) == expected:
+            return slot
+    raise ValueError("No storage slot of {} found for {}".format(target, to_hex(data)))
+
+
+def generate_scenarios(
+    rng, count, max_performance_fee, max_withdrawal_fee, max_management_fee
+):
+    """
+    {field: object array of Python ints}, count random scenarios within the vault's fee bounds
+    """
+
+    def amounts():
+        exponent = rng.integers(0, MAX_AMOUNT_EXPONENT + 1, count)
+        mantissa = rng.integers(1, 10_000, count)
+        return np.array(
+            [int(m) * 10 ** int(e) for m, e in zip(mantissa, exponent)], dtype=object
+        )
+
+    def fees(maximum):
+        return rng.integers(0, maximum + 1, count).astype(object)
+
+    scenarios = {
+        "initialDeposit": amounts(),
+        "deposit": amounts(),
+        "harvestGain": amounts(),
+        "withdrawBps": rng.integers(1, MAX_BPS + 1, count).astype(object),
+        "performanceFeeGovernance": fees(max_performance_fee),
+        "performanceFeeStrategist": fees(max_performance_fee),
+        "withdrawalFee": fees(max_withdrawal_fee),
+        "managementFee": fees(max_management_fee),
+    }
+
+    ## A quarter with the 50/50 split, no management fee, that get_performance_fees_shares assumes
+    split = rng.random(count) < 0.25
+    scenarios["performanceFeeStrategist"][split] = scenarios[
+        "performanceFeeGovernance"
+    ][split]
+    scenarios["managementFee"][split] = 0
+    return scenarios
+
+
+class FuzzReport:
+    """
+    Per check: scenarios compared, mismatches, largest difference and the index
+    of the first mismatching scenario, to reproduce it with
+    """
+
+    def __init__(self):
+        self.cases = 0
+        self.reverted = dict.fromkeys(STEPS, 0)
+        self.checks = {}
+
+    def add(self, name, expected, actual, rows):
+        """
+        expected and actual values of the scenarios at rows (indexes in the current round)
+        """
+        check = self.checks.setdefault(
+            name, {"compared": 0, "mismatches": 0, "max_diff": 0, "example": None}
+        )
+        diff = np.asarray(actual, dtype=object) - np.asarray(expected, dtype=object)
+        mismatches = np.flatnonzero(diff != 0)
+
+        check["compared"] += len(rows)
+        check["mismatches"] += len(mismatches)
+        if len(mismatches):
+            largest = max(abs(int(d)) for d in diff[mismatches])
+            check["max_diff"] = max(check["max_diff"], largest)
+            if check["example"] is None:
+                check["example"] = self.cases + int(rows[mismatches[0]])
+
+    def mismatches(self, name):
+        return self.checks[name]["mismatches"]
+
+    def table(self):
+        return [
+            [
+                name,
+                check["compared"],
+                check["mismatches"],
+                check["max_diff"],
+                check["example"],
+            ]
+            for name, check in self.checks.items()
+        ]
+
+    def __str__(self):
+        reverted = ", ".join(
+            "{} at {}".format(count, step)
+            for step, count in self.reverted.items()
+            if count
+        )
+        return "{}\n{} scenarios, reverted: {}".format(
+            tabulate(
+                self.table(),
+                headers=["check", "compared", "mismatches", "max diff", "example"],
+            ),
+            self.cases,
+            reverted or "none",
+        )
+
+
+class VaultFuzzer:
+    """
+    Runs random scenarios against a vault and its strategy on the dev chain:
+        report = VaultFuzzer(vault, strategy).fuzz(100_000)
+    """
+
+    def __init__(
+        self,
+        vault,
+        strategy,
+        batch_size=BATCH_SIZE,
+        max_workers=MAX_CONCURRENCY,
+        code=None,
+    ):
+        """
+        code is the probe's runtime code (default: the compiled VaultMathProbe)
+        """
+        self.vault = vault.address
+        self.strategy = strategy.address
+        self.want = vault.token()
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.code = code or probe_code()
+        if vault.strategist() == vault.treasury():
+            raise ValueError("Treasury and strategist fees can't be told apart")
+
+        self.fee_bounds = (
+            vault.maxPerformanceFee(),
+            vault.maxWithdrawalFee(),
+            vault.maxManagementFee(),
+        )
+        self.state_override = self.build_state_override()
+
+    def build_state_override(self):
+        """
+        Probe code at the strategy, which becomes the vault's governance and holds PROBE_WANT
+        """
+        strategy = int(self.strategy, 16)
+
+        ## Only slots holding the current governance can be its slot
+        governance = web3.eth.call(
+            {"to": self.vault, "data": to_hex(GOVERNANCE.encode_data())}
+        )
+        candidates = [
+            word(slot)
+            for slot in range(MAX_SLOT)
+            if bytes(web3.eth.get_storage_at(self.vault, slot)) == bytes(governance)
+        ]
+        governance_slot = find_slot(
+            self.vault, GOVERNANCE.encode_data(), candidates, strategy
+        )
+
+        candidates = [
+            mapped
+            for slot in range(MAX_SLOT)
+            for mapped in mapping_slots(self.strategy, slot)
+        ]
+        balance_slot = find_slot(
+            self.want, BALANCE_OF.encode_data([self.strategy]), candidates, PROBE_WANT
+        )
+
+        return {
+            self.strategy: {"code": self.code},
+            self.vault: {"stateDiff": {governance_slot: word(strategy)}},
+            self.want: {"stateDiff": {balance_slot: word(PROBE_WANT)}},
+        }
+
+    def run(self, scenarios, block_identifier):
+        """
+        Observation tuples of the scenarios, one JSON-RPC batch per batch_size of them
+        """
+        calls = [
+            ProbeCall(self.strategy, RUN.encode_data([self.vault, self.want, scenario]))
+            for scenario in zip(*(scenarios[field] for field in SCENARIO_FIELDS))
+        ]
+        batches = [
+            calls[start : start + self.batch_size]
+            for start in range(0, len(calls), self.batch_size)
+        ]
+
+        def send(batch):
+            return eth_call_batch(
+                web3.provider, batch, block_identifier, self.state_override
+            )
+
+        observations = []
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            for outputs in executor.map(send, batches):
+                for success, output in outputs:
+                    # The probe catches every revert of the vault, this is the node failing
+                    if not success:
+                        raise ValueError(output)
+                    observations.append(RUN.decode_data(output))
+        return observations
+
+    def check(self, report, scenarios, observations):
+        """
+        Adds the observations of one round, versus shares_math_batch, to report
+        """
+        observed = {
+            field: np.array(
+                [observation[i] for observation in observations], dtype=object
+            )
+            for i, field in enumerate(OBSERVATION_FIELDS)
+        }
+        failed = observed["failedStep"]
+        for i, step in enumerate(STEPS):
+            report.reverted[step] += int(np.count_nonzero(failed == i + 1))
+
+        def rows_after(step):
+            return np.flatnonzero((failed == 0) | (failed > STEPS.index(step) + 1))
+
+        def columns(rows, *fields):
+            return [
+                (scenarios[field] if field in scenarios else observed[field])[rows]
+                for field in fields
+            ]
+
+        rows = rows_after("deposit")
+        if len(rows):
+            deposit, supply, balance, shares = columns(
+                rows,
+                "deposit",
+                "depositSupplyBefore",
+                "depositBalanceBefore",
+                "depositShares",
+            )
+            report.add(
+                "deposit shares",
+                shares_math_batch.from_want_to_shares(deposit, supply, balance),
+                shares,
+                rows,
+            )
+
+        rows = rows_after("harvest")
+        if len(rows):
+            args = columns(
+                rows,
+                "harvestGain",
+                "performanceFeeGovernance",
+                "performanceFeeStrategist",
+                "managementFee",
+                "harvestDuration",
+                "harvestSupplyBefore",
+                "harvestBalanceBefore",
+            )
+            treasury, strategist = columns(rows, "treasuryShares", "strategistShares")
+            fees = shares_math_batch.get_report_fees(*args)
+            report.add(
+                "harvest treasury shares",
+                shares_math_batch.add(
+                    fees.shares_perf_treasury, fees.shares_management
+                ),
+                treasury,
+                rows,
+            )
+            report.add(
+                "harvest strategist shares",
+                fees.shares_perf_strategist,
+                strategist,
+                rows,
+            )
+
+            (
+                gain,
+                governance_fee,
+                strategist_fee,
+                management_fee,
+                _,
+                supply,
+                balance,
+            ) = args
+            split = (governance_fee == strategist_fee) & (management_fee == 0)
+            report.add(
+                "performance fee shares (50/50)",
+                shares_math_batch.get_performance_fees_shares(
+                    gain[split], governance_fee[split], supply[split], balance[split]
+                ),
+                treasury[split],
+                rows[split],
+            )
+
+        rows = rows_after("withdraw")
+        if len(rows):
+            args = columns(
+                rows,
+                "withdrawShares",
+                "withdrawPricePerFullShare",
+                "decimals",
+                "withdrawalFee",
+                "withdrawSupplyBefore",
+                "withdrawBalanceBefore",
+            )
+            received, fee_shares = columns(rows, "wantReceived", "withdrawFeeShares")
+            value = shares_math_batch.from_shares_to_want(*args[:3])
+            fee = shares_math_batch.get_withdrawal_fees_in_want(*args[:4])
+            report.add(
+                "withdraw want", shares_math_batch.sub(value, fee), received, rows
+            )
+            report.add(
+                "withdraw fee shares",
+                shares_math_batch.get_withdrawal_fees_in_shares(*args),
+                fee_shares,
+                rows,
+            )
+
+        report.cases += len(observations)
+
+    def fuzz(self, count, seed=0, block_identifier=None):
+        """
+        FuzzReport of count scenarios, all run on the same block
+        Rounds of batch_size * max_workers scenarios keep memory flat
+        """
+        rng = np.random.default_rng(seed)
+        block = web3.eth.block_number if block_identifier is None else block_identifier
+        report = FuzzReport()
+        round_size = self.batch_size * self.max_workers
+        while report.cases < count:
+            scenarios = generate_scenarios(
+                rng, min(round_size, count - report.cases), *self.fee_bounds
+            )
+            self.check(report, scenarios, self.run(scenarios, block))
+        return report
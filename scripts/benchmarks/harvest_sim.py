@@ -0,0 +1,55 @@
+import time
+
+import numpy as np
+from brownie import accounts
+from tabulate import tabulate
+from rich.console import Console
+
+from helpers.deploy import deploy_vault
+from helpers.harvest_sim import load_harvest_snapshot, simulate
+
+console = Console()
+
+SCENARIO_COUNTS = [1, 1_000, 10_000, 100_000]
+## Scenarios run one by one, for the comparison
+SCALAR_SCENARIOS = 1_000
+
+
+def main():
+    """
+    What-if harvests per second: snapshot once, then simulate BAL amounts in batch
+    Run with: brownie run benchmarks/harvest_sim
+    """
+    _, strategy = deploy_vault(accounts[0])
+
+    start = time.perf_counter()
+    snapshot = load_harvest_snapshot(strategy)
+    load = time.perf_counter() - start
+
+    table = []
+    for count in SCENARIO_COUNTS:
+        bal = np.geomspace(1e15, 1e24, count)
+        what_if = snapshot._replace(bal=bal, aura=bal * 3)
+
+        start = time.perf_counter()
+        result = simulate(what_if)
+        seconds = time.perf_counter() - start
+        table.append(
+            [count, seconds * 1000, count / seconds, int(result.reverts.sum())]
+        )
+
+    start = time.perf_counter()
+    for bal in np.geomspace(1e15, 1e24, SCALAR_SCENARIOS):
+        simulate(snapshot._replace(bal=bal, aura=bal * 3))
+    scalar = time.perf_counter() - start
+
+    console.print("[green]=== Harvest simulator ===[/green]")
+    print("Snapshot read in {:.3f} s at block {}".format(load, snapshot.block))
+    print("One by one: {:,.0f} scenarios / s".format(SCALAR_SCENARIOS / scalar))
+    print(
+        tabulate(
+            table,
+            headers=["scenarios", "ms", "scenarios / s", "reverts"],
+            floatfmt=",.1f",
+        )
+    )
@@ -0,0 +1,108 @@
+import time
+
+from brownie import StrategyLens, accounts
+from tabulate import tabulate
+from rich.console import Console
+
+from helpers.deploy import deploy_vault
+from helpers.multicall import Call, Multicall, as_wei, func
+from helpers.multicall.functions import as_original
+from helpers.snapshot.lens import StrategyLensReader
+
+console = Console()
+
+STRATEGY_COUNTS = [1, 4, 16]
+RUNS = 20
+
+REWARDS = "balanceOfRewards()((address,uint256)[])"
+MIN_OUT_BPS = "balEthBptToAuraBalMinOutBps()(uint256)"
+
+
+def build_calls(vault, strategy):
+    """
+    The same state through individual calls, as add_sett_snap + add_strategy_snap
+    """
+    calls = []
+    for name in [
+        "balance",
+        "available",
+        "getPricePerFullShare",
+        "totalSupply",
+        "withdrawalFee",
+        "managementFee",
+        "lastHarvestedAt",
+        "performanceFeeGovernance",
+        "performanceFeeStrategist",
+    ]:
+        calls.append(
+            Call(
+                vault.address, [func.sett[name]], [[vault.address + "." + name, as_wei]]
+            )
+        )
+    calls.append(
+        Call(
+            vault.address,
+            [func.erc20.decimals],
+            [[vault.address + ".decimals", as_wei]],
+        )
+    )
+    for name in ["balanceOfPool", "balanceOfWant", "balanceOf"]:
+        calls.append(
+            Call(
+                strategy.address,
+                [func.strategy[name]],
+                [[strategy.address + "." + name, as_wei]],
+            )
+        )
+    calls.append(
+        Call(
+            strategy.address, [REWARDS], [[strategy.address + ".rewards", as_original]]
+        )
+    )
+    calls.append(
+        Call(strategy.address, [MIN_OUT_BPS], [[strategy.address + ".minOut", as_wei]])
+    )
+    return calls
+
+
+def timed(read):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        read()
+    return (time.perf_counter() - start) / RUNS
+
+
+def main():
+    """
+    Gas and latency of StrategyLens versus the multicall path, per number of strategies
+    Run with: brownie run benchmarks/lens_vs_multicall
+    """
+    deployer = accounts[0]
+    lens = StrategyLens.deploy({"from": deployer})
+    deployments = [deploy_vault(deployer) for _ in range(max(STRATEGY_COUNTS))]
+
+    table = []
+    for count in STRATEGY_COUNTS:
+        pairs = deployments[:count]
+        calls = [
+            call for vault, strategy in pairs for call in build_calls(vault, strategy)
+        ]
+
+        seconds = timed(Multicall(calls))
+        multi = Multicall(calls, estimate_gas=True)
+        multi()
+        table.append(["multicall", count, len(calls), multi.metrics["gas"], seconds])
+
+        reader = StrategyLensReader(
+            [strategy for _, strategy in pairs], lens=lens.address
+        )
+        seconds = timed(reader)
+        table.append(["lens", count, 1, reader.estimate_gas(), seconds])
+
+    console.print("[green]=== Lens vs multicall ===[/green]")
+    print(
+        tabulate(
+            table,
+            headers=["path", "strategies", "calls", "gas", "seconds / read"],
+        )
+    )
@@ -0,0 +1,65 @@
+import time
+
+from brownie import accounts
+from tabulate import tabulate
+from rich.console import Console
+
+from helpers.harvest_sim import AURA, AURABAL, BAL, BALETH_BPT, BAURABAL, GRAVIAURA
+from helpers.multicall import Call, Multicall, as_wei, func
+
+console = Console()
+
+ENTITY_COUNTS = [10, 100, 1_000, 5_000]
+## As many distinct tokens as StrategyResolver.add_balances_snap, so no call is deduped
+TOKENS = [BAL, AURA, AURABAL, BALETH_BPT, BAURABAL, GRAVIAURA]
+
+
+def build_calls(entities):
+    calls = []
+    for i, token in enumerate(TOKENS):
+        for j, entity in enumerate(entities):
+            calls.append(
+                Call(
+                    token,
+                    [func.erc20.balanceOf, entity],
+                    [["balances.{}.{}".format(i, j), as_wei]],
+                )
+            )
+    return calls
+
+
+def main():
+    """
+    Round trips and wall time of a balances snapshot versus the number of tracked entities
+    Run with: brownie run benchmarks/multicall_chunking
+    """
+    table = []
+
+    for count in ENTITY_COUNTS:
+        entities = [accounts.add().address for _ in range(count)]
+        calls = build_calls(entities)
+
+        multi = Multicall(calls)
+        start = time.perf_counter()
+        multi()
+        elapsed = time.perf_counter() - start
+
+        ## Below max_calls_per_batch when batches had to be bisected
+        calls_per_trip = multi.metrics["unique_calls"] / multi.round_trips
+        table.append(
+            [count, len(multi.unique), multi.round_trips, calls_per_trip, elapsed]
+        )
+
+    console.print("[green]=== Multicall chunking ===[/green]")
+    print(
+        tabulate(
+            table,
+            headers=[
+                "entities",
+                "calls",
+                "round trips",
+                "calls per round trip",
+                "seconds",
+            ],
+        )
+    )
@@ -0,0 +1,67 @@
+import time
+
+from eth_abi import encode_single
+from tabulate import tabulate
+from rich.console import Console
+
+from helpers.multicall import Call, as_wei, func
+from helpers.multicall.decoder import Decoder
+
+console = Console()
+
+CALL_COUNTS = [100, 1_000, 10_000]
+REPEATS = 20
+TARGET = "0x37d9D2C6035b744849C15F1BFEE8F268a20fCBd8"
+
+
+def build(count):
+    calls = []
+    outputs = []
+    for i in range(count):
+        account = "0x{:040x}".format(i + 1)
+        calls.append(
+            Call(
+                TARGET,
+                [func.erc20.balanceOf, account],
+                [["balances.bAuraBal.{}".format(i), as_wei]],
+            )
+        )
+        outputs.append((True, encode_single("uint256", i * 10 ** 18)))
+    return calls, outputs
+
+
+def per_call(calls, outputs):
+    """
+    Decoding the way Multicall did before the bulk decoder
+    """
+    result = {}
+    for call, (_, output) in zip(calls, outputs):
+        result.update(call.decode_output(output))
+    return result
+
+
+def measure(fn, *args):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn(*args)
+    return (time.perf_counter() - start) / REPEATS, result
+
+
+def main():
+    """
+    Per-call ABI decoding versus the flat bulk decoder
+    Run with: brownie run benchmarks/multicall_decoding
+    """
+    table = []
+    for count in CALL_COUNTS:
+        calls, outputs = build(count)
+        decoder = Decoder(calls, range(count))
+
+        before, expected = measure(per_call, calls, outputs)
+        after, result = measure(decoder, outputs)
+        assert result == expected
+
+        table.append([count, before * 1000, after * 1000, before / after])
+
+    console.print("[green]=== Multicall decoding ===[/green]")
+    print(tabulate(table, headers=["calls", "per call ms", "bulk ms", "speedup"]))
@@ -0,0 +1,49 @@
+import time
+
+from brownie import accounts, interface
+from tabulate import tabulate
+from rich.console import Console
+
+from _setup.config import WANT
+from helpers.multicall import Call, Multicall, as_wei, func
+from helpers.multicall.constants import AGGREGATE_TRANSPORT, RPC_BATCH_TRANSPORT
+
+console = Console()
+
+ENTITY_COUNTS = [10, 100, 1_000]
+REPEATS = 5
+
+
+def measure(calls, transport):
+    elapsed = 0
+    for _ in range(REPEATS):
+        multi = Multicall(calls, transport=transport)
+        start = time.perf_counter()
+        multi()
+        elapsed += time.perf_counter() - start
+    return multi.round_trips, elapsed / REPEATS
+
+
+def main():
+    """
+    Aggregator contract versus JSON-RPC batch, on the local node
+    Run with: brownie run benchmarks/multicall_transports
+    """
+    token = interface.IERC20Detailed(WANT).address
+    table = []
+
+    for count in ENTITY_COUNTS:
+        calls = [
+            Call(
+                token,
+                [func.erc20.balanceOf, accounts.add().address],
+                [["balances.want.{}".format(i), as_wei]],
+            )
+            for i in range(count)
+        ]
+        for transport in [AGGREGATE_TRANSPORT, RPC_BATCH_TRANSPORT]:
+            round_trips, seconds = measure(calls, transport)
+            table.append([count, transport, round_trips, seconds])
+
+    console.print("[green]=== Multicall transports ===[/green]")
+    print(tabulate(table, headers=["calls", "transport", "round trips", "seconds"]))
@@ -0,0 +1,84 @@
+import random
+import time
+
+from tabulate import tabulate
+from rich.console import Console
+
+from helpers import shares_math, shares_math_batch
+
+console = Console()
+
+SCENARIOS = 100_000
+
+## Value ranges: "small" stays within uint64, "wei" needs the exact object path
+RANGES = {
+    "small": 10 ** 6,
+    "wei": 10 ** 24,
+}
+
+
+def build_scenarios(rng, amount):
+    """
+    get_report_fees arguments, as one list per argument
+    """
+    gain = [rng.randrange(1, amount) for _ in range(SCENARIOS)]
+    return [
+        gain,
+        [rng.randrange(0, 3_000) for _ in range(SCENARIOS)],  ## perf fee treasury
+        [rng.randrange(0, 1_000) for _ in range(SCENARIOS)],  ## perf fee strategist
+        [rng.randrange(0, 200) for _ in range(SCENARIOS)],  ## management fee
+        [rng.randrange(0, 30 * 86400) for _ in range(SCENARIOS)],  ## time passed
+        [rng.randrange(1, amount) for _ in range(SCENARIOS)],  ## supply
+        [g * 10 + rng.randrange(1, amount) for g in gain],  ## balance
+    ]
+
+
+def main():
+    """
+    Scenarios per second of get_report_fees, scalar loop versus batch
+    Run with: brownie run benchmarks/shares_math_batch
+    """
+    rng = random.Random(0)
+    table = []
+    for name, amount in RANGES.items():
+        args = build_scenarios(rng, amount)
+
+        start = time.perf_counter()
+        expected = [shares_math.get_report_fees(*scenario) for scenario in zip(*args)]
+        scalar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fees = shares_math_batch.get_report_fees(*args)
+        batch = time.perf_counter() - start
+
+        for key in [
+            "shares_perf_treasury",
+            "shares_management",
+            "shares_perf_strategist",
+        ]:
+            assert [int(value) for value in fees[key]] == [
+                result[key] for result in expected
+            ], key
+
+        table.append(
+            [
+                name,
+                str(fees.shares_perf_treasury.dtype),
+                SCENARIOS / scalar,
+                SCENARIOS / batch,
+                scalar / batch,
+            ]
+        )
+
+    console.print(
+        "[green]=== shares_math get_report_fees ({} scenarios) ===[/green]".format(
+            SCENARIOS
+        )
+    )
+    print(
+        tabulate(
+            table,
+            headers=["values", "dtype", "scalar / s", "batch / s", "speedup"],
+            floatfmt=",.1f",
+        )
+    )
@@ -0,0 +1,57 @@
+import time
+
+from eth_abi import encode_single, decode_single
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+from tabulate import tabulate
+from rich.console import Console
+
+from helpers.multicall import Call, as_wei, func
+from helpers.multicall.signature import parse_signature
+
+console = Console()
+
+ITERATIONS = 20_000
+TARGET = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+OUTPUT = (10 ** 18).to_bytes(32, "big")
+
+
+def uncached(signature, args):
+    """
+    Build, encode and decode the way Call and Signature did before interning
+    """
+    to_checksum_address(TARGET)
+    parts = parse_signature(signature)
+    fourbyte = function_signature_to_4byte_selector("".join(parts[:2]))
+    fourbyte + encode_single(parts[1], args)
+    return decode_single(parts[2], OUTPUT)
+
+
+def interned(signature, args):
+    call = Call(TARGET, [signature, *args], [["balance", as_wei]])
+    call.data
+    return call.decode_output(OUTPUT)
+
+
+def measure(fn):
+    args = [TARGET]
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn(func.erc20.balanceOf, args)
+    return ITERATIONS / (time.perf_counter() - start)
+
+
+def main():
+    """
+    Calls built, encoded and decoded per second, before and after Signature interning
+    Run with: brownie run benchmarks/signature_codecs
+    """
+    before = measure(uncached)
+    after = measure(interned)
+
+    console.print("[green]=== Signature codecs ===[/green]")
+    print(
+        tabulate(
+            [["uncached", before], ["interned", after], ["speedup", after / before]],
+            headers=["path", "calls / s"],
+        )
+    )
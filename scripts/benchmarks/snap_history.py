@@ -0,0 +1,75 @@
+import random
+import time
+import tracemalloc
+
+from tabulate import tabulate
+from rich.console import Console
+
+from helpers.snapshot.snap import Snap, SnapSchema
+from helpers.snapshot.history import SnapHistory
+
+console = Console()
+
+BLOCKS = 100_000
+TOKENS = ["want", "sett", "aura", "auraBal", "bAuraBal", "graviAura"]
+ENTITIES = ["sett", "strategy", "governance", "treasury", "strategist", "user"]
+METRICS = 12
+CHANGES_PER_BLOCK = 3  ## e.g. a transfer (2 balances) and the ppfs
+LOOKUPS = 10_000
+
+
+def build_keys():
+    keys = []
+    for token in TOKENS:
+        for entity in ENTITIES:
+            keys.append("balances.{}.{}".format(token, entity))
+    keys.extend("sett.metric{}".format(i) for i in range(METRICS))
+    return keys
+
+
+def run(store, schema):
+    """
+    Memory held by store after BLOCKS snaps, and time per random read
+    """
+    rng = random.Random(0)
+    values = [10 ** 24 + i for i in range(schema.size)]
+    tracemalloc.start()
+    for block in range(BLOCKS):
+        for _ in range(CHANGES_PER_BLOCK):
+            values[rng.randrange(schema.size)] = rng.getrandbits(80)
+        store[block] = Snap(list(values), block, ENTITIES, schema)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    blocks = list(store)
+    start = time.perf_counter()
+    for _ in range(LOOKUPS):
+        store[rng.choice(blocks)].get("sett.metric0")
+    elapsed = time.perf_counter() - start
+    return len(store), memory, elapsed / LOOKUPS
+
+
+def main():
+    """
+    Memory of {block: Snap} versus SnapHistory over a 100k-block run
+    Run with: brownie run benchmarks/snap_history
+    """
+    schema = SnapSchema.for_keys(build_keys())
+    stores = [
+        ("dict", {}),
+        ("history", SnapHistory()),
+        ("history, last 10k snaps", SnapHistory(max_snaps=10_000)),
+        ("history, last 1k blocks", SnapHistory(max_age=1_000)),
+    ]
+
+    table = []
+    for name, store in stores:
+        kept, memory, lookup = run(store, schema)
+        table.append([name, kept, memory / 2 ** 20, lookup * 10 ** 6])
+
+    console.print(
+        "[green]=== Snap history ({} blocks, {} values per snap) ===[/green]".format(
+            BLOCKS, schema.size
+        )
+    )
+    print(tabulate(table, headers=["store", "snaps kept", "MiB", "us / read"]))
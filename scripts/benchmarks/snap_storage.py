@@ -0,0 +1,81 @@
+import time
+import tracemalloc
+
+from tabulate import tabulate
+from rich.console import Console
+
+from helpers.snapshot.snap import Snap
+
+console = Console()
+
+ACCOUNT_COUNTS = [100, 1_000, 5_000]
+TOKENS = ["want", "sett", "aura", "auraBal", "bAuraBal", "graviAura"]
+SNAPS = 20
+LOOKUPS = 100_000
+
+
+class DictSnap:
+    """
+    Snap as it was before the compact layout
+    """
+
+    def __init__(self, data, block, entityKeys):
+        self.data = data
+        self.block = block
+        self.entityKeys = entityKeys
+
+    def balances(self, tokenKey, accountKey):
+        return self.data["balances." + tokenKey + "." + accountKey]
+
+    def get(self, key):
+        if key not in self.data.keys():
+            raise Exception("Key {} not found in snap data".format(key))
+        return self.data[key]
+
+
+def build_data(accounts, block):
+    data = {}
+    for token in TOKENS:
+        for account in accounts:
+            data["balances." + token + "." + account] = block * 10 ** 18
+    data["sett.balance"] = block * 10 ** 18
+    data["sett.getPricePerFullShare"] = 10 ** 18
+    return data
+
+
+def measure(cls, accounts):
+    """
+    Memory held by SNAPS snaps, and time per balances() lookup
+    """
+    tracemalloc.start()
+    snaps = []
+    for block in range(SNAPS):
+        data = build_data(accounts, block)
+        snaps.append(cls(data, block, accounts))
+        del data
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    snap = snaps[-1]
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        snap.balances(TOKENS[i % len(TOKENS)], accounts[i % len(accounts)])
+        snap.get("sett.balance")
+    elapsed = time.perf_counter() - start
+    return memory, elapsed / LOOKUPS
+
+
+def main():
+    """
+    Memory and lookup cost of dict-backed versus compact Snaps
+    Run with: brownie run benchmarks/snap_storage
+    """
+    table = []
+    for count in ACCOUNT_COUNTS:
+        accounts = ["account{}".format(i) for i in range(count)]
+        for name, cls in [("dict", DictSnap), ("compact", Snap)]:
+            memory, lookup = measure(cls, accounts)
+            table.append([count, name, memory / 2 ** 20, lookup * 10 ** 9])
+
+    console.print("[green]=== Snap storage ({} snaps) ===[/green]".format(SNAPS))
+    print(tabulate(table, headers=["accounts", "layout", "MiB", "ns / lookup"]))
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import time
+
+from brownie import accounts, chain, interface
+from tabulate import tabulate
+from rich.console import Console
+
+from _setup.config import WANT
+from helpers.multicall import Call, as_wei, func
+from helpers.multicall.constants import MAX_CONCURRENCY
+from helpers.snapshot.plan import SnapshotPlan
+from helpers.snapshot.sweep import SnapSeries, sweep
+
+console = Console()
+
+BLOCKS = 200
+ENTITIES = 50
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def build_plan(token, entities):
+    calls = [
+        Call(token, [func.erc20.balanceOf, entity], [["balances.want." + key, as_wei]])
+        for key, entity in entities.items()
+    ]
+    calls.append(Call(token, [func.erc20.totalSupply], [["want.totalSupply", as_wei]]))
+    return SnapshotPlan(calls, entities)
+
+
+def main():
+    """
+    Blocks per second of a historical sweep versus the number of workers, and the
+    cost of resuming an interrupted sweep
+    The local node's own mined blocks stand in for an archive node
+    Run with: brownie run benchmarks/snapshot_sweep
+    """
+    token = interface.IERC20Detailed(WANT).address
+    entities = {str(i): accounts.add().address for i in range(ENTITIES)}
+    plan = build_plan(token, entities)
+
+    start_block = chain.height + 1
+    chain.mine(BLOCKS)
+    blocks = range(start_block, start_block + BLOCKS)
+
+    table = []
+    for workers in WORKER_COUNTS:
+        series = SnapSeries(plan.schema.keys, list(entities))
+        start = time.perf_counter()
+        sweep(plan, blocks, series, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        table.append(["sweep", workers, len(series), elapsed, len(series) / elapsed])
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sweep.jsonl")
+
+        # Interrupted halfway through, then resumed from the file
+        series = SnapSeries(plan.schema.keys, list(entities), path)
+        sweep(plan, blocks[: BLOCKS // 2], series)
+        series.close()
+
+        series = SnapSeries(plan.schema.keys, list(entities), path)
+        start = time.perf_counter()
+        sweep(plan, blocks, series)
+        elapsed = time.perf_counter() - start
+        series.close()
+        table.append(["resume", MAX_CONCURRENCY, BLOCKS - BLOCKS // 2, elapsed, None])
+
+    console.print("[green]=== Snapshot sweep ===[/green]")
+    print(
+        tabulate(
+            table,
+            headers=["run", "workers", "blocks read", "seconds", "blocks / second"],
+        )
+    )
@@ -0,0 +1,33 @@
+import time
+
+from brownie import accounts
+from rich.console import Console
+
+from helpers.deploy import deploy_vault
+from helpers.vault_fuzz import VaultFuzzer
+
+console = Console()
+
+SCENARIOS = 1_000_000
+
+
+def main(count=SCENARIOS, seed=0):
+    """
+    Differential fuzzing of helpers/shares_math.py against a fresh TheVault
+    Run with: brownie run fuzz_shares_math main 1000000 0
+    """
+    governance, strategist, treasury = accounts[0], accounts[1], accounts[2]
+    vault, strategy = deploy_vault(governance, treasury=treasury, strategist=strategist)
+
+    fuzzer = VaultFuzzer(vault, strategy)
+    start = time.perf_counter()
+    report = fuzzer.fuzz(int(count), seed=int(seed))
+    seconds = time.perf_counter() - start
+
+    console.print(
+        "[green]=== shares_math vs TheVault ({:,.0f} scenarios / s) ===[/green]".format(
+            report.cases / seconds
+        )
+    )
+    print(report)
+    return report
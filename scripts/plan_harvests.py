@@ -0,0 +1,48 @@
+from rich.console import Console
+
+from helpers.aura_emissions import AuraEmissions
+from helpers.harvest_planner import (
+    load_gas_prices,
+    load_vault_inputs,
+    plan_harvests,
+    print_report,
+    write_report,
+)
+
+console = Console()
+
+## Gas prices are resampled hourly
+STEP = 3600
+
+
+def main(gas_csv, strategies, prices, compound_apr=0, output="harvest_plan.json"):
+    """
+    Harvest cadence of each strategy over a gas price history, written to output for the keeper
+      gas_csv: rows of (timestamp, gas price in gwei)
+      strategies: comma separated StrategyAuraStaking addresses
+      prices: ETH per bauraBAL and per graviAURA, comma separated
+    Run with: brownie run plan_harvests main prices.csv 0x..,0x.. 0.005,0.002
+    """
+    vaults = [load_vault_inputs(strategy) for strategy in strategies.split(",")]
+    gas_prices = load_gas_prices(gas_csv, STEP)
+    emissions = AuraEmissions()
+
+    rows, _ = plan_harvests(
+        vaults,
+        gas_prices,
+        STEP,
+        [float(price) for price in prices.split(",")],
+        emissions.total_supply(),
+        emissions.schedule(),
+        compound_apr=float(compound_apr),
+    )
+
+    console.print(
+        "[green]=== Harvest plan over {:.0f} days of gas prices ===[/green]".format(
+            len(gas_prices) * STEP / 86400
+        )
+    )
+    print_report(rows)
+    write_report(rows, output)
+    console.print("Written to {}".format(output))
+    return rows
@@ -1,11 +1,12 @@
 import pytest
 from brownie import (
-    StrategyAuraStaking,
-    TheVault,
     interface,
     accounts,
 )
 from helpers.constants import MaxUint256
+from helpers.deploy import deploy_vault
+from helpers.snapshot import lens
+from helpers import vault_fuzz
 from dotmap import DotMap
 from rich.console import Console
 
@@ -100,35 +101,17 @@ def deployed(
     """
     Deploys, vault and test strategy, mock token and wires them up.
     """
-    want = want
-
-    vault = TheVault.deploy({"from": deployer})
-    vault.initialize(
-        want,
-        governance,
-        keeper,
-        guardian,
-        governance,
-        strategist,
-        badgerTree,
-        "",
-        "",
-        [
-            PERFORMANCE_FEE_GOVERNANCE,
-            PERFORMANCE_FEE_STRATEGIST,
-            WITHDRAWAL_FEE,
-            MANAGEMENT_FEE,
-        ],
-        {"from": deployer},
+    vault, strategy = deploy_vault(
+        deployer,
+        governance=governance,
+        keeper=keeper,
+        guardian=guardian,
+        treasury=governance,
+        strategist=strategist,
+        badgerTree=badgerTree,
+        want=want,
     )
     vault.setStrategist(deployer, {"from": governance})
-    # NOTE: TheVault starts unpaused
-
-    strategy = StrategyAuraStaking.deploy({"from": deployer})
-    strategy.initialize(vault, PID)
-    # NOTE: Strategy starts unpaused
-
-    vault.setStrategy(strategy, {"from": governance})
 
     return DotMap(
         deployer=deployer,
@@ -191,6 +174,17 @@ def setup_share_math(deployer, vault, want, governance):
     return DotMap(depositAmount=depositAmount)
 
 
+## Runtime code injected with state overrides, no deployment needed
+@pytest.fixture(scope="session")
+def lens_code():
+    return lens.lens_code()
+
+
+@pytest.fixture(scope="session")
+def probe_code():
+    return vault_fuzz.probe_code()
+
+
 @pytest.fixture
 def topup_rewards(deployer, strategy):
     booster = interface.IBooster(strategy.BOOSTER())
@@ -0,0 +1,43 @@
+import pytest
+
+from helpers.aura_emissions import AuraSchedule
+from helpers.harvest_sim import HarvestSnapshot
+
+
+## AURA's mainnet constants
+@pytest.fixture
+def aura_schedule():
+    return AuraSchedule(
+        init_mint_amount=50 * 10 ** 24,
+        reduction_per_cliff=10 ** 23,
+        total_cliffs=500,
+        emissions_max_supply=50 * 10 ** 24,
+    )
+
+
+## Pools and vaults of a mainnet-like harvest, 1000 BAL and 3000 AURA pending
+@pytest.fixture
+def harvest_snapshot():
+    return HarvestSnapshot(
+        block=1,
+        bal=10 ** 21,
+        aura=3 * 10 ** 21,
+        bpt=0,
+        bal_eth_bal=4 * 10 ** 25,
+        bal_eth_bal_weight=0.8,
+        bal_eth_supply=15 * 10 ** 24,
+        bal_eth_swap_fee=0.01,
+        aurabal_pool_bpt=2 * 10 ** 24,
+        aurabal_pool_aurabal=1.5 * 10 ** 24,
+        aurabal_pool_amp=50,
+        aurabal_pool_swap_fee=0.0025,
+        baurabal_balance=10 ** 24,
+        baurabal_supply=9 * 10 ** 23,
+        baurabal_held=0,
+        graviaura_balance=2 * 10 ** 24,
+        graviaura_supply=10 ** 24,
+        graviaura_held=0,
+        min_out_bps=9500,
+        performance_fee_governance=1000,
+        performance_fee_strategist=500,
+    )
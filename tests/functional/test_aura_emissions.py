@@ -0,0 +1,92 @@
+import random
+
+import numpy as np
+from brownie import chain
+
+from helpers.aura_emissions import (
+    AURA,
+    AuraEmissions,
+    get_mintable_aura_rewards,
+    project_emissions,
+)
+
+
+def mintable(schedule, bal_amount, total_supply):
+    """
+    StrategyAuraStaking.getMintableAuraRewards, line by line
+    """
+    emissions_minted = total_supply - schedule.init_mint_amount
+    cliff = emissions_minted // schedule.reduction_per_cliff
+    if cliff >= schedule.total_cliffs:
+        return 0
+    reduction = (schedule.total_cliffs - cliff) * 5 // 2 + 700
+    amount = bal_amount * reduction // schedule.total_cliffs
+    return min(amount, schedule.emissions_max_supply - emissions_minted)
+
+
+def test_batch_matches_contract_math(aura_schedule):
+    rng = random.Random(3)
+    for amount in [10 ** 6, 10 ** 18, 10 ** 24]:
+        bal = [rng.randrange(0, amount) for _ in range(200)]
+        ## From the first cliff to past the last one
+        supply = [
+            aura_schedule.init_mint_amount + rng.randrange(0, 51 * 10 ** 24)
+            for _ in range(200)
+        ]
+        aura = get_mintable_aura_rewards(bal, supply, aura_schedule)
+        assert [int(value) for value in aura] == [
+            mintable(aura_schedule, b, s) for b, s in zip(bal, supply)
+        ]
+
+
+def test_broadcasts_bal_against_supply(aura_schedule):
+    supply = aura_schedule.init_mint_amount + 10 ** 24
+    aura = get_mintable_aura_rewards(np.arange(5) * 10 ** 18, supply, aura_schedule)
+    assert [int(value) for value in aura] == [
+        mintable(aura_schedule, b * 10 ** 18, supply) for b in range(5)
+    ]
+
+
+def test_list_inputs_above_uint64(aura_schedule):
+    ## Lists numpy alone would make float64 of, and realistic supplies
+    bal = [10 ** 19, 10 ** 18, 5 * 10 ** 18]
+    supply = [aura_schedule.init_mint_amount + 10 ** 25 + i for i in range(3)]
+    aura = get_mintable_aura_rewards(bal, supply, aura_schedule)
+    assert aura.tolist() == [mintable(aura_schedule, b, s) for b, s in zip(bal, supply)]
+
+    minted = project_emissions(bal, 3, aura_schedule.init_mint_amount, aura_schedule)
+    assert minted[0].tolist() == [
+        mintable(aura_schedule, b, aura_schedule.init_mint_amount) for b in bal
+    ]
+
+
+def test_capped_at_max_supply(aura_schedule):
+    ## One wei of emissions left in the last cliff
+    supply = aura_schedule.init_mint_amount + aura_schedule.emissions_max_supply - 1
+    assert int(get_mintable_aura_rewards(10 ** 24, supply, aura_schedule)) == 1
+    assert int(get_mintable_aura_rewards(10 ** 24, supply + 1, aura_schedule)) == 0
+
+
+def test_projection_follows_the_cliffs(aura_schedule):
+    bal = [10 ** 22, 10 ** 24]
+    minted = project_emissions(bal, 50, aura_schedule.init_mint_amount, aura_schedule)
+    assert minted.shape == (50, 2)
+
+    supply = aura_schedule.init_mint_amount
+    for period in range(50):
+        expected = mintable(aura_schedule, bal[1], supply)
+        assert int(minted[period][1]) == expected
+        supply += expected
+    ## Fewer AURA per BAL as cliffs are crossed
+    assert minted[-1][1] < minted[0][1]
+
+
+def test_mintable_keeps_scalars_scalar(monkeypatch, aura_schedule):
+    monkeypatch.setitem(AuraEmissions.schedules, (chain.id, AURA), aura_schedule)
+    supply = aura_schedule.init_mint_amount + 10 ** 24
+    emissions = AuraEmissions()
+
+    aura = emissions.mintable(10 ** 18, supply)
+    assert type(aura) is int
+    assert aura == mintable(aura_schedule, 10 ** 18, supply)
+    assert emissions.mintable([10 ** 18], supply).shape == (1,)
@@ -0,0 +1,120 @@
+import json
+
+import numpy as np
+import pytest
+
+from helpers.harvest_planner import (
+    VaultInputs,
+    gas_per_harvest,
+    plan_harvests,
+    write_report,
+)
+
+AURA_SUPPLY = 60 * 10 ** 24
+PRICES = (0.005, 0.002)
+HOUR = 3600
+
+
+def gas_history(gwei, hours=365 * 24, seed=0):
+    ## Hourly prices around gwei, with cheap hours
+    rng = np.random.default_rng(seed)
+    return gwei * 10 ** 9 * rng.lognormal(0, 0.5, hours)
+
+
+@pytest.fixture
+def make_vault(harvest_snapshot):
+    def make(name, bal_per_day, **snapshot):
+        return VaultInputs(
+            name=name,
+            snapshot=harvest_snapshot._replace(**snapshot),
+            bal_per_second=bal_per_day / 86400,
+            harvest_gas=1_200_000,
+            management_fee=50,
+            balance=10 ** 24,
+        )
+
+    return make
+
+
+@pytest.fixture
+def plan(aura_schedule):
+    def run(vaults, gas_prices, step=HOUR, **kwargs):
+        return plan_harvests(
+            vaults, gas_prices, step, PRICES, AURA_SUPPLY, aura_schedule, **kwargs
+        )
+
+    return run
+
+
+def test_higher_gas_means_rarer_harvests(make_vault, plan):
+    vaults = [make_vault("small", 10 ** 19), make_vault("large", 10 ** 21)]
+    cheap, _ = plan(vaults, gas_history(5))
+    expensive, _ = plan(vaults, gas_history(200))
+
+    for low, high in zip(cheap, expensive):
+        assert low.interval_hours <= high.interval_hours
+    ## More rewards pay for more frequent harvests
+    assert expensive[1].interval_hours <= expensive[0].interval_hours
+
+
+def test_threshold_only_uses_prices_seen_so_far():
+    prices = np.array([5, 1, 9, 9, 3, 9, 2, 9, 9, 9, 9, 9], dtype=np.float64)
+    total, thresholds, harvests = gas_per_harvest(prices, [4])
+    ## Right away in the first interval, then the first price at most the
+    ## median before (7, then 6), or the last one: not the 1 and 2 of hindsight
+    assert total[0].tolist() == [5 + 3 + 9, 5 + 3 + 9]
+    assert thresholds.tolist() == [9]
+    assert harvests.tolist() == [3]
+
+    total, _, _ = gas_per_harvest(prices[:8], [4])
+    assert total[0].tolist() == [5 + 3, 5 + 3]
+
+
+def test_threshold_beats_fixed_schedule(make_vault, plan):
+    _, net = plan([make_vault("vault", 10 ** 20)], gas_history(30))
+    ## Hourly harvests have no choice of price
+    assert net[0, 0, 1] == net[0, 0, 0]
+    assert np.all(net[0, 1:, 1] > net[0, 1:, 0])
+
+
+def test_rejects_intervals_the_history_cant_hold(make_vault, plan):
+    vaults = [make_vault("vault", 10 ** 20)]
+    ## Half an hour of prices, shorter than any interval
+    with pytest.raises(ValueError, match="No interval"):
+        plan(vaults, gas_history(30, 1), 1800)
+    ## 90 minute steps don't line up with a 2 hour interval
+    with pytest.raises(ValueError, match=r"\[2\] hours"):
+        plan(vaults, gas_history(30), 5400, interval_hours=(2, 3))
+
+
+def test_missed_compounding_shortens_the_interval(make_vault, plan):
+    vaults = [make_vault("vault", 10 ** 20)]
+    lazy, _ = plan(vaults, gas_history(30))
+    eager, _ = plan(vaults, gas_history(30), compound_apr=0.5)
+    assert eager[0].interval_hours <= lazy[0].interval_hours
+
+
+def test_harvests_reverting_on_min_out_are_excluded(make_vault, plan):
+    ## A month of rewards is too large a swap to get 99% out of the pool
+    rows, net = plan([make_vault("vault", 10 ** 23, min_out_bps=9900)], gas_history(1))
+    assert np.isneginf(net[0, -1]).all()
+    assert rows[0].feasible
+    assert rows[0].headroom_bps >= 0
+
+    ## Nor is any harvest with 99.9%
+    rows, _ = plan([make_vault("vault", 10 ** 23, min_out_bps=9990)], gas_history(1))
+    assert not rows[0].feasible
+
+
+def test_fleet_report(tmp_path, make_vault, plan):
+    vaults = [make_vault(str(i), 10 ** (18 + i % 5)) for i in range(20)]
+    ## A year of prices every 5 minutes
+    gas_prices = np.repeat(gas_history(30), 12)
+    rows, net = plan(vaults, gas_prices, 300)
+    assert net.shape[0] == 20 and len(rows) == 20
+
+    path = tmp_path / "plan.json"
+    write_report(rows, path)
+    report = json.loads(path.read_text())
+    assert [row["vault"] for row in report] == [str(i) for i in range(20)]
+    assert {row["policy"] for row in report} <= {"fixed", "threshold"}
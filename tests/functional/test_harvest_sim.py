@@ -0,0 +1,62 @@
+import numpy as np
+
+from helpers import balancer_math
+from helpers.harvest_sim import simulate
+
+
+def test_stable_swap_keeps_invariant():
+    balances = np.array([[2e24, 1e24], [1.5e24, 3e24]])
+    amount_in = np.array([1e20, 5e23])
+    out = balancer_math.stable_out_given_in(50, balances, 0, 1, amount_in, 0)
+
+    before = balancer_math.stable_invariant(50, balances)
+    after = balancer_math.stable_invariant(
+        50, [balances[0] + amount_in, balances[1] - out]
+    )
+    assert np.allclose(before, after, rtol=1e-12, atol=0)
+
+
+def test_weighted_join_matches_closed_form():
+    ## Without fees, BPT out is supply * ((1 + x / balance) ** weight - 1)
+    out = balancer_math.bpt_out_given_exact_token_in(4e25, 0.8, 1e21, 15e24, 0)
+    assert np.isclose(out, 15e24 * ((1 + 1e21 / 4e25) ** 0.8 - 1), rtol=1e-9)
+    assert (
+        balancer_math.bpt_out_given_exact_token_in(4e25, 0.8, 1e21, 15e24, 0.01) < out
+    )
+
+
+def test_batch_matches_one_by_one(harvest_snapshot):
+    bal = np.linspace(0, 1e24, 50)
+    aura = bal * 3
+    batch = simulate(harvest_snapshot._replace(bal=bal, aura=aura))
+
+    for i in range(len(bal)):
+        single = simulate(harvest_snapshot._replace(bal=bal[i], aura=aura[i]))
+        for key in ["aurabal_out", "headroom", "tree_baurabal", "tree_graviaura"]:
+            assert batch[key][i] == single[key]
+
+
+def test_harvest_outputs(harvest_snapshot):
+    result = simulate(harvest_snapshot)
+    assert not result.reverts
+    assert result.headroom_bps > 0
+    assert result.tree_baurabal == (
+        result.harvested_baurabal
+        - result.fee_governance_baurabal
+        - result.fee_strategist_baurabal
+    )
+    ## graviAURA is deposited at 2 AURA per share
+    assert result.harvested_graviaura == 3 * 10 ** 21 // 2
+
+    ## Nothing is swapped without BAL
+    empty = simulate(harvest_snapshot._replace(bal=0, aura=0))
+    assert empty.aurabal_out == 0 and empty.tree_graviaura == 0
+    assert not empty.reverts
+
+
+def test_min_out_reverts(harvest_snapshot):
+    result = simulate(
+        harvest_snapshot._replace(min_out_bps=np.array([0, 9500, 10_000]))
+    )
+    assert list(result.reverts) == [False, False, True]
+    assert list(result.headroom_bps > 0) == [True, True, False]
@@ -0,0 +1,86 @@
+import random
+
+import numpy as np
+import pytest
+
+from helpers import shares_math, shares_math_batch
+
+KEYS = ["shares_perf_treasury", "shares_management", "shares_perf_strategist"]
+
+
+def random_report(rng, amount):
+    gain = rng.randrange(0, amount)
+    return [
+        gain,
+        rng.randrange(0, 10_000),
+        rng.randrange(0, 10_000),
+        rng.randrange(0, 200),
+        rng.randrange(0, 365 * 86400),
+        rng.randrange(1, amount),
+        gain + rng.randrange(1, amount),
+    ]
+
+
+def test_batch_report_fees_match_scalar():
+    rng = random.Random(42)
+    ## From uint64 sized values up to the ones only the object path can hold
+    for amount in [10 ** 3, 10 ** 9, 10 ** 18, 10 ** 30, 2 ** 120]:
+        scenarios = [random_report(rng, amount) for _ in range(200)]
+        fees = shares_math_batch.get_report_fees(*zip(*scenarios))
+        for i, scenario in enumerate(scenarios):
+            expected = shares_math.get_report_fees(*scenario)
+            for key in KEYS:
+                assert int(fees[key][i]) == expected[key]
+
+
+def test_batch_withdrawal_fees_match_scalar():
+    rng = random.Random(7)
+    for amount in [10 ** 6, 10 ** 24]:
+        scenarios = [
+            [
+                rng.randrange(0, amount),
+                rng.randrange(10 ** 17, 2 * 10 ** 18),
+                rng.choice([6, 8, 18]),
+                rng.randrange(0, 200),
+                rng.randrange(1, amount),
+                rng.randrange(1, amount),
+            ]
+            for _ in range(200)
+        ]
+        shares = shares_math_batch.get_withdrawal_fees_in_shares(*zip(*scenarios))
+        assert [int(value) for value in shares] == [
+            shares_math.get_withdrawal_fees_in_shares(*scenario)
+            for scenario in scenarios
+        ]
+
+
+def test_to_array_keeps_large_ints_exact():
+    ## np.asarray makes float64 of these
+    array = shares_math_batch.to_array([10 ** 19, 10 ** 18])
+    assert array.dtype == np.uint64
+    assert array.tolist() == [10 ** 19, 10 ** 18]
+
+    array = shares_math_batch.to_array([2 ** 64, 2 ** 64 - 1])
+    assert array.dtype == object
+    assert array.tolist() == [2 ** 64, 2 ** 64 - 1]
+    with pytest.raises(TypeError):
+        shares_math_batch.to_array([1.5, 2])
+
+
+def test_batch_mixes_scalars_and_arrays():
+    gains = [10 ** 20, 2 * 10 ** 20, 2 ** 64 + 1]
+    fees = shares_math_batch.get_report_fees(
+        gains, 1000, 500, 50, 86400, 10 ** 24, 10 ** 24
+    )
+    for i, gain in enumerate(gains):
+        expected = shares_math.get_report_fees(
+            gain, 1000, 500, 50, 86400, 10 ** 24, 10 ** 24
+        )
+        for key in KEYS:
+            assert int(fees[key][i]) == expected[key]
+
+    ## Scalars above 2 ** 64 stay arrays through the object path
+    fees = shares_math_batch.get_report_fees(
+        10 ** 20, 1000, 500, 50, 86400, 10 ** 24, 10 ** 24
+    )
+    assert fees.shares_perf_treasury.shape == ()
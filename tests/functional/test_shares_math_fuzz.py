@@ -0,0 +1,50 @@
+import pytest
+
+from helpers.vault_fuzz import VaultFuzzer
+
+
+def fuzz(vault, strategy, code):
+    fuzzer = VaultFuzzer(vault, strategy, batch_size=100, max_workers=2, code=code)
+    return fuzzer.fuzz(1_000, seed=1)
+
+
+def assert_exact(report, *checks):
+    for name in checks:
+        assert report.checks[name]["compared"] > 0, name
+        assert report.mismatches(name) == 0, report
+
+
+def test_fuzz_deposit_and_performance_fee_match_vault(vault, strategy, probe_code):
+    report = fuzz(vault, strategy, probe_code)
+
+    assert report.cases == 1_000
+    ## Fees within the vault's bounds are always accepted
+    assert report.reverted["setup"] == 0
+    ## With the 50/50 split and no management fee, the shortcut is exact
+    assert_exact(report, "deposit shares", "performance fee shares (50/50)")
+
+
+@pytest.mark.xfail(
+    strict=True,
+    raises=AssertionError,
+    reason="TheVault mints the performance and management fees to the treasury "
+    "at once, shares_math in two steps, so the shares round differently",
+)
+def test_fuzz_harvest_fees_match_vault(vault, strategy, probe_code):
+    assert_exact(
+        fuzz(vault, strategy, probe_code),
+        "harvest treasury shares",
+        "harvest strategist shares",
+    )
+
+
+@pytest.mark.xfail(
+    strict=True,
+    raises=AssertionError,
+    reason="TheVault withdraws balance * shares / totalSupply, shares_math "
+    "goes through the rounded getPricePerFullShare",
+)
+def test_fuzz_withdraw_matches_vault(vault, strategy, probe_code):
+    assert_exact(
+        fuzz(vault, strategy, probe_code), "withdraw want", "withdraw fee shares"
+    )
@@ -0,0 +1,47 @@
+from eth_abi import encode_abi
+
+from helpers.multicall import Multicall
+from helpers.tokens import DEFAULT_DECIMALS, TokenRegistry
+
+AURA = "0xC0c293ce456fF0ED870ADd98a0828Dd4d2903DBF"
+MKR = "0x9f8F72aA9304c8B593d555F12eF6589cC3A579A2"
+
+## (decimals, symbol, name) outputs, MKR's bytes32 symbol and name don't decode as strings
+OUTPUTS = {
+    AURA: [
+        (True, encode_abi(["uint256"], [18])),
+        (True, encode_abi(["string"], ["AURA"])),
+        (True, encode_abi(["string"], ["Aura"])),
+    ],
+    MKR: [
+        (False, b""),
+        (True, b"MKR".ljust(32, b"\0")),
+        (True, b"Maker".ljust(32, b"\0")),
+    ],
+}
+
+
+def test_registry_reads_each_token_once(monkeypatch):
+    fetched = []
+
+    def fetch(multi, calls):
+        fetched.append([call.target for call in calls])
+        outputs = {target: iter(values) for target, values in OUTPUTS.items()}
+        return [next(outputs[call.target]) for call in calls]
+
+    monkeypatch.setattr(Multicall, "fetch", fetch)
+    registry = TokenRegistry()
+    registry.load([AURA, MKR.lower(), AURA])
+    assert fetched == [[AURA] * 3 + [MKR] * 3]
+
+    assert registry.decimals(AURA) == 18
+    assert registry.symbol(AURA) == "AURA"
+    assert AURA.lower() in registry
+    ## Failed calls fall back to the default decimals and the address
+    assert registry.get(MKR) == (MKR, DEFAULT_DECIMALS, MKR, MKR)
+
+    registry.load([AURA, MKR])
+    assert len(fetched) == 1
+    registry.clear()
+    assert registry.decimals(AURA) == 18
+    assert len(fetched) == 2
@@ -1,4 +1,5 @@
 import brownie
+import pytest
 from brownie import interface, chain, accounts
 from helpers.constants import MaxUint256
 from helpers.SnapshotManager import SnapshotManager
@@ -45,11 +46,17 @@ def test_deposit_withdraw_single_user_flow(deployer, vault, strategy, want, keep
     snap.settWithdraw(shares // 2 - 1, {"from": deployer})
 
 
+# Incremental snaps in strict mode are checked against a full snap after every tx
+@pytest.mark.parametrize(
+    "snapOptions",
+    [{}, {"incremental": True, "strict": True}],
+    ids=["full", "incremental"],
+)
 def test_single_user_harvest_flow(
-    deployer, vault, strategy, want, keeper, topup_rewards
+    deployer, vault, strategy, want, keeper, topup_rewards, snapOptions
 ):
     # Setup
-    snap = SnapshotManager(vault, strategy, "StrategySnapshot")
+    snap = SnapshotManager(vault, strategy, "StrategySnapshot", **snapOptions)
     randomUser = accounts[6]
     tendable = strategy.isTendable()
     startingBalance = want.balanceOf(deployer)
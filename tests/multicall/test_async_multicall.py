@@ -0,0 +1,130 @@
+import asyncio
+import json
+import socket
+from types import SimpleNamespace
+
+from aiohttp import web
+from brownie import chain
+from helpers.multicall import Call, Multicall, AsyncMulticall, ResultCache
+from helpers.multicall.async_multicall import connection
+from helpers.SnapshotManager import SnapshotManager
+
+TOKEN = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+BLOCK = 100
+
+
+def test_async_multicall_matches_sync(vault, strategy, deployer):
+    snap = SnapshotManager(vault, strategy, "StrategySnapshot")
+    entities = {**snap.entities, "user": deployer.address}
+    calls = snap.add_snap_calls(entities)
+    block = chain.height
+
+    expected = Multicall(calls, block_identifier=block)()
+
+    # Small batches so several run concurrently
+    multi = AsyncMulticall(calls, max_calls_per_batch=7, block_identifier=block)
+    assert asyncio.run(multi()) == expected
+    assert multi.round_trips > 1
+
+
+async def serve_block_number():
+    """
+    JSON-RPC endpoint answering eth_blockNumber, and its url
+    """
+
+    async def handle(request):
+        body = json.loads(await request.read())
+        return web.json_response(
+            {"jsonrpc": "2.0", "id": body["id"], "result": hex(BLOCK)}
+        )
+
+    app = web.Application()
+    app.router.add_post("/", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    await web.SockSite(runner, sock).start()
+    return runner, "http://127.0.0.1:{}/".format(sock.getsockname()[1])
+
+
+def test_connections_have_their_own_session():
+    async def main():
+        runner, url = await serve_block_number()
+        try:
+            async with connection(url) as a:
+                async with connection(url) as b:
+                    assert await asyncio.gather(
+                        a.eth.block_number, b.eth.block_number
+                    ) == [BLOCK, BLOCK]
+                ## b closing its session leaves a's open
+                return await a.eth.block_number
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(main()) == BLOCK
+
+
+class FakeEth:
+    def __init__(self):
+        self.block_numbers = 0
+
+    @property
+    async def chain_id(self):
+        return 1
+
+    @property
+    async def block_number(self):
+        self.block_numbers += 1
+        return BLOCK
+
+    async def get_block(self, block_identifier):
+        return {"hash": block_identifier.to_bytes(32, "big")}
+
+
+def balance_calls(count):
+    return [
+        Call(TOKEN, ["balanceOf(address)(uint256)", "0x{:040x}".format(i + 1)])
+        for i in range(count)
+    ]
+
+
+def fake_multicall(calls, max_calls, **kwargs):
+    """
+    AsyncMulticall whose aggregate runs out of gas above max_calls
+    """
+    w3 = SimpleNamespace(eth=FakeEth())
+    multi = AsyncMulticall(calls, w3=w3, **kwargs)
+    blocks = []
+
+    async def aggregate(address, batch, block_identifier):
+        blocks.append(block_identifier)
+        if len(batch) > max_calls:
+            raise ValueError("out of gas")
+        return block_identifier, [(True, b"") for call in batch]
+
+    multi.aggregate = aggregate
+    return multi, blocks
+
+
+def test_bisected_batch_reads_one_block():
+    ## A single batch, bisected once
+    multi, blocks = fake_multicall(balance_calls(4), max_calls=2)
+    outputs = asyncio.run(multi.read(lambda outputs: outputs))
+    assert outputs == [(True, b"")] * 4
+    assert blocks == [BLOCK] * 3
+    assert multi.w3.eth.block_numbers == 1
+    assert multi.metrics["block"] == BLOCK
+
+
+def test_async_cache_hit_makes_no_call():
+    calls = balance_calls(4)
+    cache = ResultCache()
+    multi, blocks = fake_multicall(calls, 4, block_identifier=BLOCK, cache=cache)
+    asyncio.run(multi.read(lambda outputs: outputs))
+
+    ## A second invocation is served from the shared cache
+    multi, blocks = fake_multicall(calls, 4, block_identifier=BLOCK, cache=cache)
+    assert asyncio.run(multi.read(lambda outputs: outputs)) == [(True, b"")] * 4
+    assert blocks == []
+    assert multi.metrics["unique_calls"] == 0
@@ -0,0 +1,78 @@
+import pytest
+
+from helpers.multicall import Call, CallFailure, Multicall
+from helpers.multicall.constants import (
+    MULTICALL_ADDRESSES,
+    MULTICALL3_ADDRESSES,
+    Network,
+)
+
+TOKEN = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+USER = "0x0000000000000000000000000000000000000001"
+
+
+def balance_of(account, returns=None):
+    return Call(TOKEN, ["balanceOf(address)(uint256)", account], returns)
+
+
+def test_call_failures_compare_by_call():
+    failure = balance_of(USER).failure()
+    assert not failure
+    assert failure == CallFailure(balance_of(USER))
+    assert hash(failure) == hash(CallFailure(balance_of(USER)))
+    assert len({failure, CallFailure(balance_of(USER))}) == 1
+
+    assert failure != CallFailure(balance_of(TOKEN))
+    assert failure != CallFailure(Call(TOKEN, ["totalSupply()(uint256)"]))
+    assert failure != 0
+
+    ## Named returns fail with the same CallFailure under each name
+    failures = balance_of(USER, [["balance", None]]).failure()
+    assert failures == {"balance": failure}
+
+
+def test_try_aggregate_uses_multicall3():
+    assert set(MULTICALL3_ADDRESSES.values()) == {
+        "0xcA11bde05977b3631167028862bE2a173976CA11"
+    }
+    calls = [balance_of(USER)]
+    assert (
+        Multicall(calls, require_success=False).address(Network.Mainnet)
+        == MULTICALL3_ADDRESSES[Network.Mainnet]
+    )
+    assert (
+        Multicall(calls).address(Network.Mainnet)
+        == MULTICALL_ADDRESSES[Network.Mainnet]
+    )
+
+
+def test_calls_are_immutable_and_hashable():
+    call = balance_of(USER, [["balance", None]])
+    with pytest.raises(AttributeError):
+        call.target = USER
+
+    ## Checksummed target, frozen arguments
+    assert Call(TOKEN.lower(), ["totalSupply()(uint256)"]).target == TOKEN
+    assert Call(TOKEN, ["f(uint256[])(uint256)", [1, 2]]).args == ((1, 2),)
+
+    same = balance_of(USER, [["balance", None]])
+    assert same == call
+    assert hash(same) == hash(call)
+    ## Identical calldata is encoded once and shared
+    assert same.data is call.data
+    assert balance_of(USER).key == call.key
+    ## Calls with other returns decode to other keys, they are not equal
+    assert balance_of(USER) != call
+    assert len({call, same, balance_of(USER)}) == 2
+
+
+def test_multicall_dedupes_calls():
+    calls = [
+        balance_of(USER, [["a", None]]),
+        balance_of(TOKEN, [["b", None]]),
+        balance_of(USER, [["c", None]]),
+        balance_of(USER, [["a", None]]),
+    ]
+    multi = Multicall(calls)
+    assert multi.unique == calls[:2]
+    assert multi.slots == [0, 1, 0, 0]
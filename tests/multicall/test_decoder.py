@@ -0,0 +1,86 @@
+import random
+
+import pytest
+from eth_abi import decode_abi, encode_abi
+from eth_abi.exceptions import InsufficientDataBytes, NonEmptyPaddingBytes
+
+from helpers.multicall import Call, CallFailure, Signature, as_wei
+from helpers.multicall.decoder import Decoder, decoder_for
+
+TOKEN = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+
+## Output types read straight from the words, then some left to eth_abi
+WORD_TYPES = ["uint256", "bool", "address"]
+OTHER_TYPES = ["uint8", "int256", "bytes32", "string", "address[]", "(uint256,bool)"]
+
+
+def random_value(rng, type_):
+    if type_ == "uint256":
+        return rng.randrange(2 ** 256)
+    if type_ == "uint8":
+        return rng.randrange(2 ** 8)
+    if type_ == "int256":
+        return rng.randrange(-(2 ** 255), 2 ** 255)
+    if type_ == "bool":
+        return rng.random() < 0.5
+    if type_ == "address":
+        return "0x" + bytes(rng.randrange(256) for _ in range(20)).hex()
+    if type_ == "bytes32":
+        return bytes(rng.randrange(256) for _ in range(32))
+    if type_ == "string":
+        return "aura" * rng.randrange(10)
+    if type_ == "address[]":
+        return [random_value(rng, "address") for _ in range(rng.randrange(4))]
+    return (random_value(rng, "uint256"), random_value(rng, "bool"))
+
+
+def test_decoders_match_eth_abi():
+    rng = random.Random(8)
+    for _ in range(200):
+        types = rng.choices(WORD_TYPES + OTHER_TYPES, k=rng.randrange(1, 5))
+        if rng.random() < 0.5:
+            ## Half of the outputs take the word decoder
+            types = rng.choices(WORD_TYPES, k=len(types))
+        signature = Signature("f()({})".format(",".join(types)))
+        output = encode_abi(types, [random_value(rng, type_) for type_ in types])
+        assert decoder_for(signature)(output) == decode_abi(types, output)
+
+
+def test_word_decoders_raise_like_eth_abi():
+    decode = decoder_for(Signature("f()(uint256,bool)"))
+    with pytest.raises(InsufficientDataBytes):
+        decode(bytes(63))
+    with pytest.raises(NonEmptyPaddingBytes):
+        decode(bytes(32) + (2).to_bytes(32, "big"))
+    with pytest.raises(NonEmptyPaddingBytes):
+        decoder_for(Signature("f()(address)"))(b"\x01" * 32)
+
+
+def test_decoder_layout():
+    supply = Call(TOKEN, ["totalSupply()(uint256)"], [["supply", as_wei]])
+    doubled = Call(TOKEN, ["totalSupply()(uint256)"], [["doubled", lambda x: 2 * x]])
+    reserves = Call(
+        TOKEN, ["getReserves()(uint256,uint256)"], [["r0", None], ["r1", None]]
+    )
+    name = Call(TOKEN, ["name()(string)"], [["name", None]])
+    decoder = Decoder([supply, doubled, reserves, name], [0, 0, 1, 2])
+    assert decoder.keys == ["supply", "doubled", "r0", "r1", "name"]
+
+    outputs = [
+        (True, encode_abi(["uint256"], [21])),
+        (True, encode_abi(["uint256", "uint256"], [1, 2])),
+        (False, b""),
+    ]
+    assert decoder(outputs, require_success=False) == {
+        "supply": 21,
+        "doubled": 42,
+        "r0": 1,
+        "r1": 2,
+        "name": CallFailure(name),
+    }
+
+    ## Success with an output too short to decode, e.g. a call to an EOA
+    outputs[2] = (True, b"")
+    assert decoder(outputs, require_success=False)["name"] == CallFailure(name)
+    with pytest.raises(InsufficientDataBytes):
+        decoder(outputs)
@@ -0,0 +1,157 @@
+from types import SimpleNamespace
+
+import pytest
+
+from brownie.network.state import _notify_registry
+
+from helpers.multicall import Call, Multicall, ResultCache, multicall
+from helpers.multicall.constants import AGGREGATE_TRANSPORT
+
+TOKEN = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+BLOCK = 100
+
+
+def balance_calls(count):
+    return [
+        Call(TOKEN, ["balanceOf(address)(uint256)", "0x{:040x}".format(i + 1)])
+        for i in range(count)
+    ]
+
+
+class FakeAggregate:
+    """
+    Stands in for Multicall.aggregate, runs out of gas above max_calls
+    """
+
+    def __init__(self, max_calls, reverts=()):
+        self.max_calls = max_calls
+        self.reverts = reverts
+        self.sizes = []
+        self.blocks = []
+
+    def __call__(self, calls, block_identifier):
+        self.sizes.append(len(calls))
+        self.blocks.append(block_identifier)
+        if len(calls) > self.max_calls or any(call in self.reverts for call in calls):
+            raise ValueError("out of gas")
+        return block_identifier or BLOCK, [(True, call.data) for call in calls]
+
+
+def test_chunks_respect_both_limits():
+    calls = balance_calls(10)
+    ## Each balanceOf calldata is 36 bytes
+    multi = Multicall(calls, max_calls_per_batch=4, max_calldata_bytes=36 * 3)
+    assert [len(batch) for batch in multi.chunks(calls)] == [3, 3, 3, 1]
+
+    multi = Multicall(calls, max_calls_per_batch=4)
+    assert [len(batch) for batch in multi.chunks(calls)] == [4, 4, 2]
+    assert [len(batch) for batch in multi.chunks(calls, 6)] == [6, 4]
+    assert [batch for batch in multi.chunks([])] == []
+
+
+def test_failed_batches_are_bisected():
+    calls = balance_calls(10)
+    multi = Multicall(calls, max_calls_per_batch=8)
+    send = FakeAggregate(max_calls=3)
+
+    outputs = multi.fetch_batches(send, calls, BLOCK)
+    assert outputs == [(True, call.data) for call in calls]
+    ## 8 and 4 fail, then the rest go in batches of 2
+    assert send.sizes == [8, 4, 2, 2, 2, 2, 2]
+    assert multi.block == BLOCK
+
+    ## The smaller size only lasts for the invocation
+    assert multi.max_calls_per_batch == 8
+    send.sizes.clear()
+    multi.fetch_batches(send, calls, BLOCK)
+    assert send.sizes[0] == 8
+
+
+def test_failing_call_is_isolated():
+    calls = balance_calls(4)
+    send = FakeAggregate(max_calls=4, reverts=calls[2:3])
+
+    multi = Multicall(calls, require_success=False)
+    outputs = multi.fetch_batches(send, calls, BLOCK)
+    assert outputs[2] == (False, b"")
+    assert [output for i, output in enumerate(outputs) if i != 2] == [
+        (True, call.data) for i, call in enumerate(calls) if i != 2
+    ]
+
+    multi = Multicall(calls)
+    with pytest.raises(ValueError):
+        multi.fetch_batches(send, calls, BLOCK)
+
+
+def test_batches_are_pinned_to_one_block(monkeypatch):
+    monkeypatch.setattr(
+        multicall, "web3", SimpleNamespace(eth=SimpleNamespace(block_number=BLOCK + 1))
+    )
+    calls = balance_calls(10)
+    multi = Multicall(calls, max_calls_per_batch=4)
+
+    ## A single batch reads latest, and reports the block it read
+    send = FakeAggregate(max_calls=10)
+    multi.fetch_batches(send, calls[:4], None)
+    assert send.blocks == [None]
+    assert multi.block == BLOCK
+
+    ## Several batches all read the block that was latest before the first
+    send = FakeAggregate(max_calls=10)
+    multi.fetch_batches(send, calls, None)
+    assert send.blocks == [BLOCK + 1] * 3
+    assert multi.block == BLOCK + 1
+
+
+def test_unpack_returns_the_block():
+    calls = balance_calls(2)
+    assert Multicall(calls).unpack((BLOCK, [b"\x01", b"\x02"])) == (
+        BLOCK,
+        [(True, b"\x01"), (True, b"\x02")],
+    )
+    outputs = [(True, b"\x01"), (False, b"")]
+    assert Multicall(calls, require_success=False).unpack(
+        (BLOCK, bytes(32), outputs)
+    ) == (BLOCK, outputs)
+
+
+class FakeEth:
+    """
+    Counts the round trips a cached read makes
+    """
+
+    def __init__(self):
+        self.get_blocks = 0
+
+    def get_block(self, block_identifier):
+        self.get_blocks += 1
+        return {"hash": block_identifier.to_bytes(32, "big")}
+
+
+def test_full_cache_hit_makes_no_round_trip(monkeypatch):
+    eth = FakeEth()
+    monkeypatch.setattr(multicall, "web3", SimpleNamespace(eth=eth))
+    calls = balance_calls(4)
+    cache = ResultCache()
+
+    def read():
+        multi = Multicall(
+            calls, block_identifier=BLOCK, cache=cache, transport=AGGREGATE_TRANSPORT
+        )
+        send = FakeAggregate(max_calls=10)
+        multi.aggregate = lambda address, calls, block: send(calls, block)
+        multi.start_metrics()
+        multi.fetch(calls)
+        return eth.get_blocks, len(send.sizes)
+
+    assert read() == (1, 1)
+    ## Neither the block hash nor the outputs are fetched again
+    assert read() == (1, 0)
+
+    ## After a revert below the block its number may be mined with another hash
+    _notify_registry(BLOCK - 1)
+    assert read() == (2, 0)
+    _notify_registry(BLOCK + 1)
+    assert read() == (2, 0)
+    _notify_registry()
+    assert read() == (3, 0)
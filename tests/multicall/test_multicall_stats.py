@@ -0,0 +1,82 @@
+import io
+import json
+
+import pytest
+
+from helpers.multicall import Call, Multicall, MulticallStats
+from helpers.multicall.stats import METRICS, new_metrics
+
+TOKEN = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+
+
+def metrics(label, **values):
+    record = new_metrics(label, "aggregate")
+    record.update(values)
+    return record
+
+
+def test_stats_totals_per_label():
+    sink = io.StringIO()
+    stats = MulticallStats(history=2, sink=sink)
+    stats.record(metrics("snap", calls=10, round_trips=1, block=100))
+    stats.record(metrics("snap", calls=5, round_trips=2, block=101))
+    stats.record(metrics("fleet", calls=7, round_trips=1, seconds=0.5))
+
+    assert stats.invocations == {"snap": 2, "fleet": 1}
+    assert stats.totals["snap"]["calls"] == 15
+    assert stats.totals["snap"]["round_trips"] == 3
+    assert stats.totals["fleet"]["seconds"] == 0.5
+
+    ## The sink gets every record, json_lines only the last history of them
+    streamed = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert [record["calls"] for record in streamed] == [10, 5, 7]
+    kept = [json.loads(line) for line in stats.json_lines().splitlines()]
+    assert [record["label"] for record in kept] == ["snap", "fleet"]
+    assert kept[1] == metrics("fleet", calls=7, round_trips=1, seconds=0.5)
+
+    stats.reset()
+    assert stats.json_lines() == ""
+    assert not stats.invocations
+
+
+def test_stats_prometheus():
+    stats = MulticallStats()
+    stats.record(metrics("snap", calls=10, rpc_seconds=0.25))
+    stats.record(metrics("snap", calls=5))
+    lines = stats.prometheus(prefix="mc").splitlines()
+
+    assert "# TYPE mc_invocations_total counter" in lines
+    assert 'mc_invocations_total{label="snap"} 2' in lines
+    assert 'mc_calls_total{label="snap"} 15' in lines
+    assert 'mc_rpc_seconds_total{label="snap"} 0.25' in lines
+    for name in METRICS:
+        assert "# TYPE mc_{}_total counter".format(name) in lines
+
+
+def test_failed_invocations_are_recorded():
+    stats = MulticallStats()
+    multi = Multicall(
+        [Call(TOKEN, ["totalSupply()(uint256)"])], label="failing", stats=stats
+    )
+
+    def fetch(calls):
+        raise ValueError("execution reverted")
+
+    multi.fetch = fetch
+    with pytest.raises(ValueError):
+        multi()
+    assert stats.invocations["failing"] == 1
+    assert stats.totals["failing"]["calls"] == 1
+
+
+def test_read_decodes_with_a_custom_layout():
+    stats = MulticallStats()
+    supply = Call(TOKEN, ["totalSupply()(uint256)"])
+    multi = Multicall([supply, supply], label="fleet", stats=stats)
+    multi.fetch = lambda calls: [(True, bytes(32))] * len(calls)
+
+    ## Identical calls are fetched once, decode gets the unique outputs
+    assert multi.read(lambda outputs: len(outputs)) == 1
+    assert stats.invocations["fleet"] == 1
+    assert stats.totals["fleet"]["calls"] == 2
+    assert stats.totals["fleet"]["unique_calls"] == 1
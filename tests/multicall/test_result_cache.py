@@ -0,0 +1,82 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from helpers.multicall.cache import ResultCache
+
+## Only the target and calldata of a call make its key
+FakeCall = namedtuple("FakeCall", ["target", "data"])
+
+CALLS = [FakeCall("0x{:040x}".format(i), bytes([i])) for i in range(4)]
+HASH = b"\x01" * 32
+
+
+def outputs(calls):
+    return [(True, call.data * 2) for call in calls]
+
+
+def test_cache_counts_hits_and_misses():
+    cache = ResultCache()
+    cached, missing = cache.lookup(1, HASH, CALLS)
+    assert cached == [None] * 4
+    assert missing == [0, 1, 2, 3]
+
+    cache.store(1, HASH, CALLS[:2], outputs(CALLS[:2]))
+    cached, missing = cache.lookup(1, HASH, CALLS)
+    assert cached == outputs(CALLS[:2]) + [None, None]
+    assert missing == [2, 3]
+    assert cache.stats() == {
+        "size": 2,
+        "maxsize": cache.maxsize,
+        "hits": 2,
+        "misses": 6,
+        "hit_rate": 0.25,
+    }
+
+
+def test_cache_keys_by_chain_and_block_hash():
+    cache = ResultCache()
+    cache.store(1, HASH, CALLS, outputs(CALLS))
+    ## The same block number mined again after a revert has another hash
+    assert cache.lookup(1, b"\x02" * 32, CALLS)[1] == [0, 1, 2, 3]
+    assert cache.lookup(5, HASH, CALLS)[1] == [0, 1, 2, 3]
+    assert cache.lookup(1, HASH, CALLS)[1] == []
+
+
+def test_cache_skips_failed_calls():
+    cache = ResultCache()
+    cache.store(1, HASH, CALLS[:2], [(True, b"\x01"), (False, b"")])
+    assert cache.lookup(1, HASH, CALLS[:2])[1] == [1]
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResultCache(maxsize=3)
+    cache.store(1, HASH, CALLS[:3], outputs(CALLS[:3]))
+    ## Reading the first call makes the second the least recently used
+    cache.lookup(1, HASH, CALLS[:1])
+    cache.store(1, HASH, CALLS[3:], outputs(CALLS[3:]))
+
+    assert len(cache) == 3
+    assert cache.lookup(1, HASH, CALLS)[1] == [1]
+
+
+def test_cache_only_pinned_blocks():
+    assert ResultCache.cacheable(100)
+    assert ResultCache.cacheable(0)
+    for block_identifier in [None, "latest", "pending", "earliest", True, False]:
+        assert not ResultCache.cacheable(block_identifier)
+
+
+def test_cache_shared_between_threads():
+    cache = ResultCache(maxsize=64)
+    calls = [FakeCall("0x{:040x}".format(i), bytes([i])) for i in range(128)]
+
+    def read(block):
+        block_hash = bytes([block % 8]) * 32
+        _, missing = cache.lookup(1, block_hash, calls)
+        missed = [calls[i] for i in missing]
+        cache.store(1, block_hash, missed, outputs(missed))
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(read, range(200)))
+    assert len(cache) == 64
+    assert cache.hits + cache.misses == 200 * 128
@@ -0,0 +1,159 @@
+import json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from threading import Thread
+from types import SimpleNamespace
+
+import pytest
+from web3 import HTTPProvider
+
+from helpers.multicall import Call, CallReverted, Multicall, multicall
+from helpers.multicall.constants import (
+    AGGREGATE_TRANSPORT,
+    MULTICALL_ADDRESSES,
+    RPC_BATCH_TRANSPORT,
+    Network,
+)
+from helpers.multicall.rpc_batch import eth_call_batch
+
+TOKEN = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+BLOCK = 100
+
+
+def balance_calls(count):
+    return [
+        Call(TOKEN, ["balanceOf(address)(uint256)", "0x{:040x}".format(i + 1)])
+        for i in range(count)
+    ]
+
+
+def reply(request, reverts):
+    """
+    Echoes the calldata of an eth_call, or reverts it
+    """
+    data = request["params"][0]["data"]
+    if data in reverts:
+        return {"jsonrpc": "2.0", "id": request["id"], "error": {"message": "revert"}}
+    return {"jsonrpc": "2.0", "id": request["id"], "result": data}
+
+
+class FakeNode(BaseHTTPRequestHandler):
+    batches = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.batches.append((dict(self.headers), body))
+        response = json.dumps([reply(request, ()) for request in body]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeIPCProvider:
+    """
+    A provider without HTTP, answers one request at a time
+    """
+
+    def __init__(self, reverts=()):
+        self.reverts = reverts
+        self.requests = []
+
+    def make_request(self, method, params):
+        self.requests.append((method, params))
+        return reply({"id": 0, "params": params}, self.reverts)
+
+
+@pytest.fixture
+def node():
+    server = HTTPServer(("127.0.0.1", 0), FakeNode)
+    Thread(target=server.serve_forever, daemon=True).start()
+    FakeNode.batches = []
+    yield "http://127.0.0.1:{}/".format(server.server_port)
+    server.shutdown()
+    server.server_close()
+
+
+def test_batch_goes_through_the_provider_settings(node):
+    calls = balance_calls(3)
+    provider = HTTPProvider(
+        node, request_kwargs={"headers": {"X-Api-Key": "key"}, "timeout": 5}
+    )
+    outputs = eth_call_batch(provider, calls, BLOCK)
+    assert outputs == [(True, call.data) for call in calls]
+
+    ## One request, with the provider's headers, pinned to the block
+    [(headers, body)] = FakeNode.batches
+    assert headers["X-Api-Key"] == "key"
+    assert [request["params"][1] for request in body] == [hex(BLOCK)] * 3
+
+
+def test_batch_falls_back_to_single_calls():
+    calls = balance_calls(3)
+    provider = FakeIPCProvider(reverts={"0x" + calls[1].data.hex()})
+    outputs = eth_call_batch(provider, calls, BLOCK, {TOKEN: {"balance": "0x1"}})
+    assert outputs == [(True, calls[0].data), (False, "revert"), (True, calls[2].data)]
+    assert [method for method, _ in provider.requests] == ["eth_call"] * 3
+    assert provider.requests[0][1][1:] == [hex(BLOCK), {TOKEN: {"balance": "0x1"}}]
+
+
+def fake_web3(monkeypatch, code=b"", provider=None):
+    eth = SimpleNamespace(block_number=BLOCK + 1, code_reads=[])
+
+    def get_code(address):
+        eth.code_reads.append(address)
+        return code
+
+    eth.get_code = get_code
+    monkeypatch.setattr(multicall, "web3", SimpleNamespace(eth=eth, provider=provider))
+    monkeypatch.setattr(Multicall, "deployed", {})
+    return eth
+
+
+def test_sender_picks_the_transport(monkeypatch):
+    eth = fake_web3(monkeypatch)
+    multi = Multicall(balance_calls(2))
+    multi.start_metrics()
+
+    ## No code at the multicall address, the calls are pinned to latest
+    send, block = multi.sender(Network.Mainnet, None)
+    assert send == multi.rpc_batch
+    assert block == BLOCK + 1
+    assert multi.metrics["transport"] == RPC_BATCH_TRANSPORT
+    assert not multi.has_aggregator(Network.Mainnet)
+    assert eth.code_reads == [MULTICALL_ADDRESSES[Network.Mainnet]]
+    ## No known address, nothing to read
+    assert not multi.has_aggregator(12345)
+    assert len(eth.code_reads) == 1
+
+    eth = fake_web3(monkeypatch, code=b"\x60")
+    send, block = multi.sender(Network.Mainnet, None)
+    assert send.func == multi.aggregate
+    assert block is None
+    assert multi.metrics["transport"] == AGGREGATE_TRANSPORT
+
+
+def test_revert_raises_without_bisecting(monkeypatch):
+    calls = balance_calls(4)
+    provider = FakeIPCProvider(reverts={"0x" + calls[2].data.hex()})
+    fake_web3(monkeypatch, provider=provider)
+
+    multi = Multicall(calls, transport=RPC_BATCH_TRANSPORT, block_identifier=BLOCK)
+    with pytest.raises(CallReverted):
+        multi()
+    assert multi.round_trips == 1
+    assert len(provider.requests) == 4
+
+    ## Without require_success the revert is a failed output
+    multi = Multicall(
+        calls,
+        transport=RPC_BATCH_TRANSPORT,
+        block_identifier=BLOCK,
+        require_success=False,
+    )
+    multi.start_metrics()
+    assert multi.fetch_batches(multi.rpc_batch, calls, BLOCK)[2] == (False, "revert")
+    assert multi.round_trips == 1
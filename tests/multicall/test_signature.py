@@ -0,0 +1,56 @@
+from eth_abi import decode_abi, encode_abi
+from eth_utils import function_signature_to_4byte_selector
+
+from helpers.multicall import Signature
+from helpers.multicall.signature import parse_signature
+
+USER = "0x00000000000000000000000000000000000000a1"
+
+
+def test_parse_signature():
+    assert parse_signature("balanceOf(address)(uint256)") == [
+        "balanceOf",
+        "(address)",
+        "(uint256)",
+    ]
+    assert parse_signature("getPoolTokens(bytes32)(address[],uint256[],uint256)") == [
+        "getPoolTokens",
+        "(bytes32)",
+        "(address[],uint256[],uint256)",
+    ]
+    assert parse_signature("balanceOfRewards()((address,uint256)[])") == [
+        "balanceOfRewards",
+        "()",
+        "((address,uint256)[])",
+    ]
+
+
+def test_signatures_are_interned():
+    signature = Signature("balanceOf(address)(uint256)")
+    assert Signature("balanceOf(address)(uint256)") is signature
+    assert Signature("balanceOf(address)(uint128)") is not signature
+
+
+def test_codecs_match_eth_abi():
+    signature = Signature("transfer(address,uint256)(bool)")
+    assert signature.function == "transfer(address,uint256)"
+    assert signature.fourbyte == function_signature_to_4byte_selector(
+        "transfer(address,uint256)"
+    )
+    assert signature.encode_data([USER, 5]) == signature.fourbyte + encode_abi(
+        ["address", "uint256"], [USER, 5]
+    )
+    assert signature.decode_data(encode_abi(["bool"], [True])) == (True,)
+
+    ## Without arguments the calldata is the selector
+    assert Signature("totalSupply()(uint256)").encode_data() == bytes.fromhex(
+        "18160ddd"
+    )
+
+    signature = Signature("balanceOfRewards()((address,uint256)[],string)")
+    output = encode_abi(
+        ["(address,uint256)[]", "string"], [[(USER, 1), (USER, 2)], "aura"]
+    )
+    assert signature.decode_data(output) == decode_abi(
+        ["(address,uint256)[]", "string"], output
+    )
@@ -0,0 +1,30 @@
+from brownie import chain
+from helpers.deploy import deploy_vault
+from helpers.FleetSnapshotManager import FleetSnapshotManager
+
+
+def test_fleet_snap_matches_single_vault_snaps(vault, strategy, deployer, governance):
+    ## A second vault of the same want, with its own strategy
+    otherVault, otherStrategy = deploy_vault(deployer, governance=governance)
+    fleet = FleetSnapshotManager.from_vaults(
+        {"first": (vault, strategy), "second": (otherVault, otherStrategy)}
+    )
+    fleet.addEntity("user", deployer.address)
+    block = chain.height
+
+    snaps = fleet.snap(block_identifier=block)
+
+    for key, manager in fleet.managers.items():
+        expected = manager.get_plan(manager.entities)(block)
+        assert dict(snaps[key].data.items()) == dict(expected.data.items())
+        assert snaps[key].block == block
+        assert manager.snaps[block].block == block
+
+    # Calls shared between the vaults (balances of the same token held by the
+    # same entities) are only read once
+    first, second = (
+        {call.key for call in manager.plan.calls} for manager in fleet.managers.values()
+    )
+    shared = first & second
+    assert shared and first != second
+    assert len(fleet.plan.multicall.unique) == len(first) + len(second) - len(shared)
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+from eth_utils import keccak
+
+from helpers.multicall import Call, CallFailure
+from helpers.snapshot.incremental import TRANSFER_TOPIC, Touched, compare_snaps
+from helpers.snapshot.snap import Snap
+
+WANT = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+VAULT = "0x37d9D2C6035b744849C15F1BFEE8F268a20fCBd8"
+STRATEGY = "0xBA485b556399123261a5F9c95d413B4f93107407"
+USER = "0x00000000000000000000000000000000000000A1"
+OTHER = "0x00000000000000000000000000000000000000B2"
+
+HARVESTED_TOPIC = keccak(text="Harvested(address,uint256,uint256,uint256)")
+
+
+def topic(address):
+    return bytes(12) + bytes.fromhex(address[2:])
+
+
+def transfer(token, sender, receiver):
+    return {
+        "address": token,
+        "topics": [TRANSFER_TOPIC, topic(sender), topic(receiver)],
+    }
+
+
+def balance_of(token, account):
+    return Call(token, ["balanceOf(address)(uint256)", account])
+
+
+## A deposit: want moves from the user to the vault, which mints shares and logs an event
+DEPOSIT = SimpleNamespace(
+    logs=[
+        transfer(WANT, USER, VAULT),
+        transfer(VAULT, "0x" + "00" * 20, USER),
+        {"address": STRATEGY, "topics": [HARVESTED_TOPIC]},
+    ]
+)
+
+
+def test_touched_reads_receipt_logs():
+    touched = Touched(DEPOSIT)
+    assert touched.emitters == {WANT.lower(), VAULT.lower(), STRATEGY.lower()}
+    assert (WANT.lower(), USER.lower()) in touched.transfers
+    assert (VAULT.lower(), USER.lower()) in touched.transfers
+    assert USER.lower() in touched.accounts
+
+
+def test_touched_grid_calls():
+    touched = Touched(DEPOSIT)
+    ## Balances are only dirty for the (token, account) pairs of a Transfer
+    assert touched.is_dirty(balance_of(WANT, USER), grid=True)
+    assert touched.is_dirty(balance_of(WANT, VAULT), grid=True)
+    assert touched.is_dirty(balance_of(VAULT, USER), grid=True)
+    assert not touched.is_dirty(balance_of(WANT, OTHER), grid=True)
+    assert not touched.is_dirty(balance_of(STRATEGY, USER), grid=True)
+
+
+def test_touched_other_calls():
+    touched = Touched(DEPOSIT)
+    ## Anything read from a contract that logged, or that received tokens
+    assert touched.is_dirty(Call(STRATEGY, ["balanceOf()(uint256)"]), grid=False)
+    assert touched.is_dirty(
+        Call(VAULT, ["getPricePerFullShare()(uint256)"]), grid=False
+    )
+    assert touched.is_dirty(Call(USER, ["nonce()(uint256)"]), grid=False)
+    assert not touched.is_dirty(Call(OTHER, ["totalSupply()(uint256)"]), grid=False)
+
+    assert not Touched(SimpleNamespace(logs=[])).is_dirty(
+        Call(VAULT, ["totalSupply()(uint256)"]), grid=False
+    )
+
+
+def test_compare_snaps():
+    failure = CallFailure(Call(VAULT, ["totalSupply()(uint256)"]))
+    data = {
+        "balances.want.user": 1,
+        "sett.totalSupply": failure,
+        "sett.getPricePerFullShare": 10 ** 18,
+    }
+    expected = Snap(data, 100, ["user"])
+    assert compare_snaps(expected, Snap(dict(data), 100, ["user"])) == []
+
+    stale = Snap(
+        dict(data, **{"sett.getPricePerFullShare": 10 ** 18 + 1}), 100, ["user"]
+    )
+    assert compare_snaps(expected, stale) == ["sett.getPricePerFullShare"]
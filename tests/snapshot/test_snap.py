@@ -0,0 +1,60 @@
+import pytest
+
+from helpers.snapshot.snap import MISSING, Snap, SnapSchema
+
+DATA = {
+    "balances.want.user": 1,
+    "balances.want.sett": 2,
+    "balances.bauraBal.user": 3,
+    "shares.want.user": 4,
+    "sett.getPricePerFullShare": 10 ** 18,
+    "strategy.balanceOf": 5,
+}
+
+
+def test_snap_accessors():
+    snap = Snap(dict(DATA), 100, ["user", "sett"])
+    assert snap.block == 100
+    assert snap.balances("want", "user") == 1
+    assert snap.balances("want", "sett") == 2
+    assert snap.balances("bauraBal", "user") == 3
+    assert snap.shares("want", "user") == 4
+    assert snap.get("sett.getPricePerFullShare") == 10 ** 18
+
+    ## Grid cells no call was made for, and unknown tokens or accounts
+    with pytest.raises(KeyError, match="shares.want.sett"):
+        snap.shares("want", "sett")
+    with pytest.raises(KeyError, match="balances.aura.user"):
+        snap.balances("aura", "user")
+    with pytest.raises(Exception, match="not found"):
+        snap.get("sett.balance")
+
+
+def test_snap_data_view():
+    snap = Snap(dict(DATA), 100, ["user", "sett"])
+    assert dict(snap.data.items()) == DATA
+    assert list(snap.data) == list(DATA)
+    assert len(snap.data) == len(DATA)
+
+    snap.set("strategy.balanceOf", 6)
+    assert snap.get("strategy.balanceOf") == 6
+    ## Keys outside the schema are kept aside
+    snap.set("sett.balance", 7)
+    assert snap.get("sett.balance") == 7
+    assert "sett.balance" in snap.data
+    assert len(snap.data) == len(DATA) + 1
+    del snap.data["sett.balance"]
+    assert "sett.balance" not in snap.data
+
+
+def test_schema_is_interned_and_packed():
+    snap = Snap(dict(DATA), 100, ["user", "sett"])
+    schema = SnapSchema.for_keys(DATA)
+    assert snap.schema is schema
+    ## 2 kinds x 2 tokens x 2 accounts, then the other metrics
+    assert schema.size == 2 * 2 * 2 + 2
+    assert snap.values.count(MISSING) == 4
+
+    ## Values already laid out by the schema are used as they are
+    copy = Snap(list(snap.values), 101, ["user", "sett"], schema=schema)
+    assert dict(copy.data.items()) == DATA
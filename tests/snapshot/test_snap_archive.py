@@ -0,0 +1,28 @@
+from helpers.snapshot.snap import Snap, MISSING
+from helpers.snapshot.archive import export_snaps, SnapArchive
+
+
+def test_archive_round_trip(tmp_path):
+    before = Snap(
+        {
+            "balances.want.sett": 2 ** 256 - 1,
+            "balances.want.user": 10 ** 18,
+            "sett.getPricePerFullShare": 10 ** 18,
+            "strategy.isTendable": False,
+            "strategy.getName": "StrategyAuraStaking",
+        },
+        100,
+        ["sett", "user"],
+    )
+    after = Snap({"balances.want.sett": 5, "balances.want.treasury": 7}, 101, ["sett"])
+
+    export_snaps([before, after], tmp_path)
+    archive = SnapArchive(tmp_path)
+
+    assert len(archive) == 2
+    assert dict(archive[0].data.items()) == {
+        **dict(before.data.items()),
+        "balances.want.treasury": MISSING,
+    }
+    assert archive.at_block(101).balances("want", "treasury") == 7
+    assert archive.column("balances.want.sett") == [2 ** 256 - 1, 5]
@@ -0,0 +1,82 @@
+from helpers.multicall import Call, CallFailure
+from helpers.snapshot.diff import SnapshotDiff
+from helpers.snapshot.snap import Snap
+
+VAULT = "0x37d9D2C6035b744849C15F1BFEE8F268a20fCBd8"
+FAILURE = CallFailure(Call(VAULT, ["totalSupply()(uint256)"]))
+
+BEFORE = {
+    "balances.want.user": 100,
+    "balances.want.sett": 0,
+    "balances.bauraBal.user": 5,
+    "sett.getPricePerFullShare": 10 ** 18,
+    "sett.totalSupply": FAILURE,
+    "strategy.name": "StrategyAuraStaking",
+}
+
+
+def snaps(changes=None):
+    after = dict(BEFORE, **(changes or {}))
+    return Snap(dict(BEFORE), 100, ["user"]), Snap(after, 101, ["user"])
+
+
+def test_diff_rows_and_delta():
+    before, after = snaps(
+        {
+            "balances.want.user": 40,
+            "balances.want.sett": 60,
+            "sett.totalSupply": 60,
+            "strategy.name": "StrategyAuraStaking v2",
+        }
+    )
+    diff = SnapshotDiff(before, after)
+    assert diff.keys() == [
+        "balances.want.user",
+        "balances.want.sett",
+        "sett.totalSupply",
+        "strategy.name",
+    ]
+    assert diff.delta("balances.want.user") == -60
+    assert diff.delta("balances.want.sett") == 60
+    ## Unchanged keys move by 0, non-integer values have no delta
+    assert diff.delta("balances.bauraBal.user") == 0
+    assert "balances.bauraBal.user" not in diff
+    assert diff.delta("sett.totalSupply") is None
+    assert diff.delta("strategy.name") is None
+    assert SnapshotDiff(*snaps()).rows == []
+
+
+def test_diff_filter():
+    before, after = snaps(
+        {
+            "balances.want.user": 40,
+            "balances.bauraBal.user": 6,
+            "sett.getPricePerFullShare": 10 ** 18 + 1,
+        }
+    )
+    diff = SnapshotDiff(before, after)
+
+    want = diff.filter("balances.want.")
+    assert want.keys() == ["balances.want.user"]
+    assert want.delta("balances.want.user") == -60
+    assert want.before is before and want.after is after
+
+    assert diff.filter("balances.").keys() == [
+        "balances.want.user",
+        "balances.bauraBal.user",
+    ]
+    assert diff.filter("sett.").delta("sett.getPricePerFullShare") == 1
+    assert len(diff.filter("strategy.")) == 0
+
+
+def test_diff_across_schemas():
+    before, after = snaps({"balances.want.user": 40})
+    ## A key set outside the schema, and an after snap with another schema
+    before.set("sett.balance", 1)
+    other = Snap(dict(after.data.items(), **{"sett.balance": 3}), 101, ["user"])
+
+    diff = SnapshotDiff(before, other)
+    assert diff.delta("balances.want.user") == -60
+    assert diff.delta("sett.balance") == 2
+    assert diff.keys() == ["balances.want.user", "sett.balance"]
+    assert "balances.want.user" in diff.render()
@@ -0,0 +1,51 @@
+from helpers.snapshot.snap import Snap
+from helpers.snapshot.history import SnapHistory
+
+KEYS = ["balances.want.sett", "balances.want.user", "sett.getPricePerFullShare"]
+
+
+def make_snap(block):
+    return Snap(dict(zip(KEYS, [block // 3, 7, 10 ** 18 + block])), block, ["user"])
+
+
+def test_history_reads_back_every_block():
+    history = SnapHistory(keyframe_interval=4)
+    for block in range(100, 120):
+        history[block] = make_snap(block)
+
+    for block in range(100, 120):
+        snap = history[block]
+        assert snap.block == block
+        assert dict(snap.data.items()) == dict(make_snap(block).data.items())
+    assert history.latest().block == 119
+
+
+def test_history_retention():
+    by_count = SnapHistory(max_snaps=5, keyframe_interval=4)
+    by_age = SnapHistory(max_age=5, keyframe_interval=4)
+    for block in range(100, 120, 2):
+        by_count[block] = make_snap(block)
+        by_age[block] = make_snap(block)
+
+    assert list(by_count) == [110, 112, 114, 116, 118]
+    assert list(by_age) == [114, 116, 118]
+    # The keyframe of an evicted segment still backs the snaps that remain
+    assert by_count[110].get("sett.getPricePerFullShare") == 10 ** 18 + 110
+
+
+def test_history_out_of_order():
+    history = SnapHistory(max_snaps=3, keyframe_interval=4)
+    for block in [110, 104, 112, 100, 108]:
+        history[block] = make_snap(block)
+
+    # The oldest blocks are evicted, not the first inserted
+    assert list(history) == [108, 110, 112]
+    assert history.latest().block == 112
+    for block in history:
+        assert dict(history[block].data.items()) == dict(make_snap(block).data.items())
+
+    by_age = SnapHistory(max_age=5, keyframe_interval=4)
+    for block in [110, 104, 100, 108]:
+        by_age[block] = make_snap(block)
+    assert list(by_age) == [108, 110]
+    assert by_age.latest().block == 110
@@ -0,0 +1,45 @@
+from helpers.snapshot.snap import Snap
+from helpers.snapshot.sweep import SnapSeries, sweep
+
+KEYS = ["balances.want.user", "sett.getPricePerFullShare"]
+
+
+class CountingPlan:
+    def __init__(self):
+        self.reads = []
+
+    def at_block(self, block):
+        self.reads.append(block)
+        return Snap(dict(zip(KEYS, [block, 10 ** 18 + block])), block, ["user"])
+
+
+def test_sweep_resumes_from_file(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    plan = CountingPlan()
+
+    series = SnapSeries(KEYS, ["user"], path)
+    sweep(plan, range(100, 110, 2), series)
+    series.close()
+    # Interrupted while writing the next row
+    with open(path, "a") as f:
+        f.write("[110, [11")
+
+    series = SnapSeries(KEYS, ["user"], path)
+    assert series.blocks == [100, 102, 104, 106, 108]
+    sweep(plan, range(100, 120, 2), series)
+    series.close()
+
+    assert sorted(plan.reads) == list(range(100, 120, 2))
+    assert series.column("balances.want.user") == [(b, b) for b in range(100, 120, 2)]
+    assert series.at_block(118).get("sett.getPricePerFullShare") == 10 ** 18 + 118
+
+
+def test_sweep_starts_over_an_empty_file(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    path.touch()
+
+    series = SnapSeries(KEYS, ["user"], path)
+    sweep(CountingPlan(), range(100, 104), series)
+    series.close()
+
+    assert SnapSeries(KEYS, ["user"], path).blocks == [100, 101, 102, 103]
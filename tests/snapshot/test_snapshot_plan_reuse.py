@@ -0,0 +1,76 @@
+import helpers.SnapshotManager as snapshot_manager
+from helpers.multicall import Call
+from helpers.SnapshotManager import SnapshotManager
+from helpers.snapshot.plan import SnapshotPlan
+
+TOKEN = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+USER = "0x0000000000000000000000000000000000000001"
+OTHER = "0x0000000000000000000000000000000000000002"
+
+
+def balance_calls(entities):
+    return [
+        Call(
+            TOKEN,
+            ["balanceOf(address)(uint256)", address],
+            [["balances.want." + key, None]],
+        )
+        for key, address in entities.items()
+    ]
+
+
+def offline_manager(monkeypatch):
+    """
+    A SnapshotManager without a chain, and the entities of every plan it builds
+    """
+    built = []
+
+    class CountingPlan(SnapshotPlan):
+        def __init__(self, calls, entities, **kwargs):
+            built.append(dict(entities))
+            super().__init__(calls, entities, **kwargs)
+
+    monkeypatch.setattr(snapshot_manager, "SnapshotPlan", CountingPlan)
+    manager = SnapshotManager.__new__(SnapshotManager)
+    manager.key = "vault"
+    manager.cache = None
+    manager.plan = None
+    manager.units = {}
+    manager.add_snap_calls = balance_calls
+    manager.get_units = lambda plan: {"built": len(built)}
+    return manager, built
+
+
+def test_plan_is_reused_for_the_same_entities(monkeypatch):
+    manager, built = offline_manager(monkeypatch)
+    entities = {"user": USER}
+
+    plan = manager.get_plan(entities)
+    assert manager.get_plan(entities) is plan
+    ## Equal entities in another dict are the same plan
+    assert manager.get_plan(dict(entities)) is plan
+    assert built == [{"user": USER}]
+    assert manager.units == {"built": 1}
+
+
+def test_plan_is_rebuilt_when_entities_change(monkeypatch):
+    manager, built = offline_manager(monkeypatch)
+    entities = {"user": USER}
+    plan = manager.get_plan(entities)
+
+    ## A new entity, then another address for the same key
+    entities["other"] = OTHER
+    added = manager.get_plan(entities)
+    assert added is not plan
+    assert len(added.calls) == 2
+    assert manager.get_plan(entities) is added
+
+    moved = manager.get_plan({"user": OTHER, "other": OTHER})
+    assert moved is not added
+    assert built == [
+        {"user": USER},
+        {"user": USER, "other": OTHER},
+        {"user": OTHER, "other": OTHER},
+    ]
+    ## Units follow the plan
+    assert manager.units == {"built": 3}
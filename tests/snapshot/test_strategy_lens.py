@@ -0,0 +1,31 @@
+from brownie import StrategyLens, chain
+from helpers.SnapshotManager import SnapshotManager
+from helpers.snapshot.lens import StrategyLensReader
+
+
+def test_lens_matches_snapshot(vault, strategy, deployer, setup_share_math, lens_code):
+    lens = StrategyLens.deploy({"from": deployer})
+    block = chain.height
+
+    snap = SnapshotManager(vault, strategy, "StrategySnapshot").snap(
+        block_identifier=block
+    )
+    lensSnap = StrategyLensReader([strategy], lens=lens.address)(block)[
+        strategy.address
+    ]
+
+    assert lensSnap.block == block
+    assert lensSnap.get("strategy.vault") == vault.address
+    for key in snap.data:
+        if key.startswith("sett.") or key.startswith("strategy."):
+            assert lensSnap.get(key) == snap.get(key), key
+
+    rewards = dict(strategy.balanceOfRewards())
+    assert lensSnap.get("strategy.rewards.bal") == rewards[strategy.BAL()]
+    assert lensSnap.get("strategy.rewards.aura") == rewards[strategy.AURA()]
+
+    ## Deployless, the same code injected with a state override
+    deployless = StrategyLensReader([strategy], code=lens_code)(block)
+    assert dict(deployless[strategy.address].data.items()) == dict(
+        lensSnap.data.items()
+    )
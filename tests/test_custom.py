@@ -4,6 +4,8 @@ import time
 from brownie import interface, chain, accounts, StrategyAuraStaking
 from helpers.constants import AddressZero, MaxUint256
 from helpers.time import days
+from helpers.harvest_sim import load_harvest_snapshot, simulate
+from helpers.aura_emissions import AuraEmissions
 from rich.console import Console
 from _setup.config import PID
 from helpers.utils import (
@@ -48,6 +50,11 @@ def test_expected_aura_rewards_match_minted(
 
     # Check that aura amount calculating function matches the result
     assert aura_amount == strategy.getMintableAuraRewards(bal_amount)
+    # And so does the Python port, for any amount
+    emissions = AuraEmissions(strategy.AURA())
+    assert emissions.mintable(bal_amount) == aura_amount
+    for amount in [0, 1, 10 ** 18, bal_amount * 1_000]:
+        assert emissions.mintable(amount) == strategy.getMintableAuraRewards(amount)
 
     # First Transfer event from harvest() function is emitted by aura._mint()
     tx = strategy.harvest({"from": keeper})
@@ -134,3 +141,20 @@ def test_initialize_wrong_pid(vault, deployer):
 def test_sweep_pid(strategy, governance):
     with brownie.reverts("token mismatch"):
         strategy.setPid(PID - 1, {"from": governance})
+
+
+def test_simulated_harvest_matches_harvest(
+    deployer, vault, strategy, want, keeper, topup_rewards
+):
+    state_setup(deployer, vault, want, keeper, topup_rewards)
+
+    result = simulate(load_harvest_snapshot(strategy))
+    assert not result.reverts
+    assert result.headroom > 0
+
+    tx = strategy.harvest({"from": keeper})
+    events = tx.events["TreeDistribution"]
+
+    # Rewards keep accruing until the harvest's block, hence the approximation
+    assert approx(events[0]["amount"], int(result.tree_baurabal), 1)
+    assert approx(events[1]["amount"], int(result.tree_graviaura), 1)